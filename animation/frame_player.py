@@ -0,0 +1,423 @@
+"""
+Pre-decoded frame playback with dirty-rectangle repaints for Milk Mocha Pet
+"""
+import math
+from collections import OrderedDict
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QApplication
+from PyQt5.QtGui import QImage, QImageReader, QPainter
+from PyQt5.QtCore import Qt, QObject, QRect, QRectF, QSize, QTimer, QBuffer, QIODevice, pyqtSignal
+
+from utils.clock import system_clock
+
+# Delay used when a GIF frame does not specify one (matches QMovie)
+DEFAULT_FRAME_DELAY = 100
+
+# Bytes touched per blended pixel (ARGB32 premultiplied)
+BYTES_PER_PIXEL = 4
+
+# Decoded frames kept in memory; least recently shown animations go first
+FRAME_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _pixels(image):
+    """The visible pixels of an ARGB32 image as a (height, width) uint32 array, without copying"""
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    rows = np.frombuffer(bits, dtype=np.uint32).reshape(image.height(), image.bytesPerLine() // BYTES_PER_PIXEL)
+    return rows[:, :image.width()]
+
+
+def changed_rect(previous, current):
+    """Bounding rectangle of the pixels that differ between two frames"""
+    if previous.size() != current.size():
+        return current.rect()
+
+    changed = _pixels(previous) != _pixels(current)
+    rows = np.flatnonzero(changed.any(axis=1))
+    if not rows.size:
+        return QRect()
+    columns = np.flatnonzero(changed.any(axis=0))
+    return QRect(int(columns[0]), int(rows[0]),
+                 int(columns[-1] - columns[0]) + 1, int(rows[-1] - rows[0]) + 1)
+
+
+def compute_dirty_rects(images):
+    """Per-frame changed regions; frame 0 is diffed against the last frame for looping"""
+    if len(images) < 2:
+        return [QRect() for _ in images]
+    return [changed_rect(images[i - 1], images[i]) for i in range(len(images))]
+
+
+def to_logical_rect(rect, device_ratio):
+    """Map a device-pixel rectangle to the logical pixels that cover it"""
+    if rect.isEmpty() or device_ratio == 1.0:
+        return QRect(rect)
+    left = math.floor(rect.x() / device_ratio)
+    top = math.floor(rect.y() / device_ratio)
+    right = math.ceil((rect.x() + rect.width()) / device_ratio)
+    bottom = math.ceil((rect.y() + rect.height()) / device_ratio)
+    return QRect(left, top, right - left, bottom - top)
+
+
+def device_size(logical_size, device_ratio):
+    """Pixel size of a logical size on a display with the given device pixel ratio"""
+    return QSize(round(logical_size.width() * device_ratio),
+                 round(logical_size.height() * device_ratio))
+
+
+def decode_gif(path, size, data=None, limit=None):
+    """Decode every frame of a GIF (or the first limit frames) at the given pixel size
+
+    With data, the encoded bytes are decoded from memory and path only names them.
+    """
+    if data is not None:
+        buffer = QBuffer()
+        buffer.setData(data)
+        buffer.open(QIODevice.ReadOnly)
+        reader = QImageReader(buffer)
+    else:
+        reader = QImageReader(path)
+    reader.setScaledSize(size)
+    images, delays = [], []
+    while limit is None or len(images) < limit:
+        image = reader.read()
+        if image.isNull():
+            break
+        images.append(image.convertToFormat(QImage.Format_ARGB32_Premultiplied))
+        delay = reader.nextImageDelay()
+        delays.append(delay if delay > 0 else DEFAULT_FRAME_DELAY)
+    if not images:
+        print(f"⚠️ Could not decode animation: {path} ({reader.errorString()})")
+    return images, delays
+
+
+class AnimationFrames:
+    """Frames of one animation at one device resolution, plus their dirty rectangles"""
+
+    def __init__(self, path, images, delays, device_ratio=1.0, dirty_rects=None):
+        self.path = path
+        self.images = images
+        self.delays = delays
+        self.device_ratio = device_ratio
+        for image in images:
+            image.setDevicePixelRatio(device_ratio)
+        if images:
+            pixels = images[0].size()
+            self.size = QSize(round(pixels.width() / device_ratio), round(pixels.height() / device_ratio))
+        else:
+            self.size = QSize()
+        # Dirty rectangles are kept in logical pixels, ready for QWidget.update()
+        if dirty_rects is None:
+            dirty_rects = [to_logical_rect(r, device_ratio) for r in compute_dirty_rects(images)]
+        self.dirty_rects = dirty_rects
+
+    @property
+    def frame_count(self):
+        return len(self.images)
+
+    def loop_duration(self):
+        """Length of one loop in milliseconds"""
+        return sum(self.delays)
+
+    def bytes_blended_per_second(self, partial=True):
+        """Pixel bytes blended per second of playback, full-frame or dirty-rect"""
+        duration = self.loop_duration()
+        if not duration or self.frame_count < 2:
+            return 0.0
+        if partial:
+            pixels = sum(r.width() * r.height() for r in self.dirty_rects)
+        else:
+            pixels = self.size.width() * self.size.height() * self.frame_count
+        pixels *= self.device_ratio * self.device_ratio
+        return pixels * BYTES_PER_PIXEL * 1000.0 / duration
+
+
+class FrameCache(QObject):
+    """Frames cached per (animation, logical size, devicePixelRatio)
+
+    Each GIF is decoded once per logical size, at the highest device pixel ratio
+    of any connected screen. Other ratios are downscaled from that master copy,
+    so moving the pet between monitors never re-decodes the source file.
+
+    Animations are evicted least recently used first once the decoded pixels
+    pass max_bytes, except the ones a player has pinned.
+    """
+
+    # (key, token, frames, master) from a background decode, delivered on the GUI thread
+    decoded = pyqtSignal(object, object, object, object)
+
+    def __init__(self, max_bytes=FRAME_CACHE_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.entries = {}
+        self.masters = {}
+        self.recent = OrderedDict()  # (path, width, height) of everything cached, least recently used first
+        self.pinned = {}  # Owner -> paths it needs kept, e.g. the current and revert animations
+        self.sources = {}  # Path -> callable returning encoded bytes, for files inside archives
+        self.pending = {}  # Key -> (token, callbacks) for decodes running in the background
+        self.workers = []  # Their threads, joined by shutdown()
+        self.decoded.connect(self._on_decoded)
+
+    @staticmethod
+    def max_device_ratio():
+        """Highest devicePixelRatio among the connected screens"""
+        app = QApplication.instance()
+        screens = app.screens() if app else []
+        return max([screen.devicePixelRatio() for screen in screens] or [1.0])
+
+    @staticmethod
+    def _key(path, logical_size, device_ratio):
+        return (path, logical_size.width(), logical_size.height(), device_ratio)
+
+    def get(self, path, logical_size, device_ratio=1.0):
+        """Get frames for an animation at an exact device resolution"""
+        key = self._key(path, logical_size, device_ratio)
+        frames = self.entries.get(key)
+        if frames is None:
+            master = self._master(path, logical_size, device_ratio)
+            frames = _frames_from_master(path, logical_size, device_ratio, master)
+            self.entries[key] = frames
+            self._touch(key)
+            self._evict()
+        else:
+            self._touch(key)
+        return frames
+
+    def request(self, path, logical_size, device_ratio, on_ready, run_in_background=system_clock.run_in_background):
+        """Get frames without blocking on a decode
+
+        Cached frames come straight back. Otherwise the first frame is decoded
+        alone and returned as a still, the whole animation is decoded and diffed
+        in the background, and on_ready(frames) is called on the GUI thread once
+        it is cached.
+        """
+        key = self._key(path, logical_size, device_ratio)
+        frames = self.entries.get(key)
+        if frames is not None:
+            self._touch(key)
+            return frames
+        self.warm(path, logical_size, device_ratio, on_ready, run_in_background)
+        # A clock that runs background work inline has already finished it
+        frames = self.entries.get(key)
+        return frames or self._still(path, logical_size, device_ratio)
+
+    def warm(self, path, logical_size, device_ratio, on_ready=None, run_in_background=system_clock.run_in_background):
+        """Decode an animation in the background unless it is cached or already on its way"""
+        key = self._key(path, logical_size, device_ratio)
+        if key in self.entries:
+            return
+        if key in self.pending:
+            if on_ready:
+                self.pending[key][1].append(on_ready)
+            return
+        token = object()
+        self.pending[key] = (token, [on_ready] if on_ready else [])
+        master = self._usable_master(path, logical_size, device_ratio)
+        data = None
+        if master is None:
+            read = self.sources.get(path)
+            data = read() if read else None  # Archives are read here; only decoding moves off the GUI thread
+        self.workers = [worker for worker in self.workers if worker.is_alive()]
+        self.workers.append(run_in_background(self._decode_in_background, key, token, path, logical_size,
+                                              device_ratio, master, max(device_ratio, self.max_device_ratio()),
+                                              data))
+
+    def _still(self, path, logical_size, device_ratio):
+        """The first frame alone, shown while the rest decodes"""
+        read = self.sources.get(path)
+        images, delays = decode_gif(path, device_size(logical_size, device_ratio), read() if read else None, limit=1)
+        return AnimationFrames(path, images, delays, device_ratio)
+
+    def _decode_in_background(self, key, token, path, logical_size, device_ratio, master, master_ratio, data):
+        if master is None:
+            images, delays = decode_gif(path, device_size(logical_size, master_ratio), data)
+            master = (images, delays, master_ratio)
+        frames = _frames_from_master(path, logical_size, device_ratio, master)
+        self.decoded.emit(key, token, frames, master)
+
+    def _on_decoded(self, key, token, frames, master):
+        pending = self.pending.get(key)
+        if pending is None or pending[0] is not token:
+            return  # Invalidated while decoding
+        del self.pending[key]
+        self.entries[key] = frames
+        master_key = key[:3]
+        current = self.masters.get(master_key)
+        if current is None or current[2] < master[2]:
+            self.masters[master_key] = master
+        self._touch(key)
+        self._evict()
+        for on_ready in pending[1]:
+            on_ready(frames)
+
+    def _usable_master(self, path, logical_size, device_ratio):
+        master = self.masters.get((path, logical_size.width(), logical_size.height()))
+        return master if master is not None and master[2] >= device_ratio else None
+
+    def _master(self, path, logical_size, device_ratio):
+        """Decode a GIF once per logical size at the largest ratio needed so far"""
+        master = self._usable_master(path, logical_size, device_ratio)
+        if master is None:
+            master_ratio = max(device_ratio, self.max_device_ratio())
+            read = self.sources.get(path)
+            images, delays = decode_gif(path, device_size(logical_size, master_ratio),
+                                        read() if read else None)
+            master = (images, delays, master_ratio)
+            self.masters[(path, logical_size.width(), logical_size.height())] = master
+        return master
+
+    def store(self, path, logical_size, device_ratio, frames):
+        """Add frames that were prepared elsewhere (e.g. restored from a snapshot)"""
+        key = self._key(path, logical_size, device_ratio)
+        self.entries[key] = frames
+        self._touch(key)
+        self._evict()
+
+    def pin(self, owner, paths):
+        """Keep these animations cached for owner, replacing what it pinned before"""
+        self.pinned[owner] = set(paths)
+
+    def _touch(self, key):
+        group = key[:3]
+        self.recent[group] = None
+        self.recent.move_to_end(group)
+
+    def _group_images(self, group):
+        """Distinct images held for one animation at one logical size, master and all ratios"""
+        images = {}
+        master = self.masters.get(group)
+        if master:
+            images.update((image.cacheKey(), image) for image in master[0])
+        for key, frames in self.entries.items():
+            if key[:3] == group:
+                images.update((image.cacheKey(), image) for image in frames.images)
+        return images.values()
+
+    def _group_bytes(self, group):
+        return sum(image.sizeInBytes() for image in self._group_images(group))
+
+    def decoded_bytes(self):
+        """Pixel bytes held by every cached animation"""
+        return sum(self._group_bytes(group) for group in self.recent)
+
+    def _evict(self):
+        """Drop least recently used animations until the decoded pixels fit max_bytes"""
+        total = self.decoded_bytes()
+        pinned = set().union(*self.pinned.values())
+        for group in list(self.recent):
+            if total <= self.max_bytes:
+                break
+            if group[0] in pinned:
+                continue
+            total -= self._group_bytes(group)
+            del self.recent[group]
+            self.masters.pop(group, None)
+            for key in [key for key in self.entries if key[:3] == group]:
+                del self.entries[key]
+
+    def invalidate(self, path):
+        """Drop every cached size of one animation, e.g. after its file changed"""
+        for cache in (self.entries, self.masters, self.pending, self.recent):
+            for key in [key for key in cache if key[0] == path]:
+                del cache[key]
+
+    def add_source(self, path, read):
+        """Decode path from read() instead of the filesystem"""
+        self.sources[path] = read
+
+    def remove_sources(self, prefix):
+        """Forget every source under prefix and drop their decoded frames"""
+        for path in [path for path in self.sources if path.startswith(prefix)]:
+            del self.sources[path]
+            self.invalidate(path)
+
+    def shutdown(self, timeout=5.0):
+        """Wait for background decodes before exit, so none delivers to a deleted cache"""
+        for worker in self.workers:
+            worker.join(timeout)
+        self.workers.clear()
+        self.pending.clear()
+
+    def clear(self):
+        """Drop every cached frame"""
+        self.entries.clear()
+        self.masters.clear()
+        self.pending.clear()
+        self.recent.clear()
+
+
+def _frames_from_master(path, logical_size, device_ratio, master):
+    """Frames at one device ratio, downscaled from a master decoded at that ratio or higher"""
+    images, delays, master_ratio = master
+    if device_ratio != master_ratio:
+        target = device_size(logical_size, device_ratio)
+        images = [image.scaled(target, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+                  for image in images]
+    return AnimationFrames(path, images, delays, device_ratio)
+
+
+# Shared by the pet and the milk bottle so each GIF is decoded once per process
+frame_cache = FrameCache()
+
+
+class FramePlayer(QWidget):
+    """Widget that plays AnimationFrames, repainting only each frame's changed region"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.frames = None
+        self.frame_index = 0
+        self.speed = 100  # Percent, like QMovie.setSpeed
+
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.timeout.connect(self.next_frame)
+
+    def set_frames(self, frames, frame_index=0):
+        """Show a new animation at normal speed, from its first frame unless told otherwise"""
+        self.frame_timer.stop()
+        if not self.frames or frames.path != self.frames.path:
+            self.speed = 100  # Same animation at another size or ratio keeps its pace
+        self.frames = frames
+        self.frame_index = frame_index % frames.frame_count if frames.frame_count else 0
+        self.update()
+        self.start()
+
+    def start(self):
+        """Start or resume playback"""
+        if self.frames and self.frames.frame_count > 1:
+            self.frame_timer.start(self._scaled_delay())
+
+    def stop(self):
+        """Pause playback on the current frame"""
+        self.frame_timer.stop()
+
+    def set_speed(self, percent):
+        """Set playback speed as a percentage of the GIF's own timing"""
+        self.speed = max(1, int(percent))
+
+    def _scaled_delay(self):
+        return max(1, self.frames.delays[self.frame_index] * 100 // self.speed)
+
+    def next_frame(self):
+        """Advance one frame and schedule a repaint of just what changed"""
+        if not self.frames or self.frames.frame_count < 2:
+            return
+        self.frame_index = (self.frame_index + 1) % self.frames.frame_count
+        dirty = self.frames.dirty_rects[self.frame_index]
+        if not dirty.isEmpty():
+            self.update(dirty)
+        self.frame_timer.start(self._scaled_delay())
+
+    def paintEvent(self, event):
+        """Blit only the exposed part of the current frame"""
+        if not self.frames or not self.frames.images:
+            return
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        rect = QRectF(event.rect())
+        ratio = self.frames.device_ratio
+        source = QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+        painter.drawImage(rect, self.frames.images[self.frame_index], source)
+        painter.end()
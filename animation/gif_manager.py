@@ -1,70 +1,151 @@
 """
 GIF and animation management for Milk Mocha Pet
 """
-import os
-import random
-from PyQt5.QtGui import QMovie
-from PyQt5.QtCore import QSize, QTimer
+from PyQt5.QtCore import QSize
+
+from animation.frame_player import frame_cache
+from utils.assets import assets
+from utils.clock import system_clock
+from animation.skins import skins
 
 
 class GifManager:
     """Manages GIF animations and transitions"""
     
-    def __init__(self, pet_widget):
+    def __init__(self, pet_widget, pet_size=150, skin="", clock=system_clock):
         self.pet_widget = pet_widget
-        self.current_gif = "assets/mocha_gifs/idle.gif"
+        self.clock = clock  # Times the return from timed animations
+        self.current_key = "idle"
+        self.revert_key = None  # Animation to return to when a timed one ends
         self.animation_timer = None
+        self.pet_label = None
+        self.gif_size = QSize(pet_size, pet_size)  # Logical pixels
+        self.change_listeners = []  # Called with the animation key on every switch
         
-        # 1️⃣ Organize GIF file paths with exact names and clear mapping
-        self.gif_paths = {
-            "idle": "assets/mocha_gifs/idle.gif",
-            "drinking": "assets/mocha_gifs/drinking.gif",
-            "sleeping": "assets/mocha_gifs/tierd.gif",
-            "playing": "assets/mocha_gifs/playing_guitar.gif",
-            "greeting": "assets/mocha_gifs/says_hi.gif",
-            "excited": "assets/mocha_gifs/excited.gif",
-            "dancing": "assets/mocha_gifs/dance1.gif",
-            "dancing2": "assets/mocha_gifs/dance2.gif",
-            "crying": "assets/mocha_gifs/crying.gif",
-            "laugh": "assets/mocha_gifs/laugh.gif",
-            "heartthrow": "assets/mocha_gifs/heartThrow.gif",
-            "sitting": "assets/mocha_gifs/Sitting.gif",
-            "watching": "assets/mocha_gifs/watching_mobile.gif",
-            "running": "assets/mocha_gifs/running.gif",
-            "says_yes": "assets/mocha_gifs/says_yes.gif",
-            "doubtful": "assets/mocha_gifs/looking_doubtfuly.gif",
-            "angry": "assets/mocha_gifs/Angry.gif",
-            "pleasing": "assets/mocha_gifs/pleaseing.gif"
+        # 1️⃣ Organize GIFs with exact names and clear mapping (asset handles, not paths)
+        self.default_gifs = {
+            "idle": assets.get("mocha_gifs/idle.gif"),
+            "drinking": assets.get("mocha_gifs/drinking.gif"),
+            "sleeping": assets.get("mocha_gifs/tierd.gif"),
+            "playing": assets.get("mocha_gifs/playing_guitar.gif"),
+            "greeting": assets.get("mocha_gifs/says_hi.gif"),
+            "excited": assets.get("mocha_gifs/excited.gif"),
+            "dancing": assets.get("mocha_gifs/dance1.gif"),
+            "dancing2": assets.get("mocha_gifs/dance2.gif"),
+            "crying": assets.get("mocha_gifs/crying.gif"),
+            "laugh": assets.get("mocha_gifs/laugh.gif"),
+            "heartthrow": assets.get("mocha_gifs/heartThrow.gif"),
+            "sitting": assets.get("mocha_gifs/Sitting.gif"),
+            "watching": assets.get("mocha_gifs/watching_mobile.gif"),
+            "running": assets.get("mocha_gifs/running.gif"),
+            "says_yes": assets.get("mocha_gifs/says_yes.gif"),
+            "doubtful": assets.get("mocha_gifs/looking_doubtfuly.gif"),
+            "angry": assets.get("mocha_gifs/Angry.gif"),
+            "pleasing": assets.get("mocha_gifs/pleaseing.gif")
         }
+        self.gifs = dict(self.default_gifs)  # The default character overlaid with the skin, if any
+        self.skin = None
+        self.current_gif = self.gifs["idle"]
+        assets.add_listener(self.on_asset_changed)
+        if skin:
+            self.set_skin(skin)
+    
+    def device_ratio(self):
+        """Device pixel ratio of the screen the pet is currently on"""
+        if self.pet_widget is None:
+            return 1.0
+        return self.pet_widget.devicePixelRatioF()
+    
+    def get_frames(self, gif):
+        """Get frames for a GIF asset at the pet's size and current screen resolution
+
+        An animation shown for the first time starts as its first frame while the
+        rest decodes in the background; _on_frames_ready swaps the full one in.
+        """
+        return frame_cache.request(gif.path, self.gif_size, self.device_ratio(),
+                                   self._on_frames_ready, self.clock.run_in_background)
+    
+    def _on_frames_ready(self, frames):
+        """Play freshly decoded frames if their animation is still the one on show"""
+        label = self.pet_label
+        if (label and label.frames is not frames and frames.path == self.current_gif.path
+                and frames.size == self.gif_size and frames.device_ratio == self.device_ratio()):
+            label.set_frames(frames)
+    
+    def watch_screen_changes(self):
+        """Swap to frames for the new resolution when the pet moves between screens"""
+        window = self.pet_widget.windowHandle() if self.pet_widget else None
+        if window:
+            window.screenChanged.connect(self.refresh_frames)
+    
+    def refresh_frames(self, *args):
+        """Re-fetch the current animation's frames for the current size and screen"""
+        if self.pet_label:
+            frame_index = self.pet_label.frame_index
+            self.pet_label.set_frames(self.get_frames(self.current_gif), frame_index)
+    
+    def set_pet_size(self, pet_size):
+        """Resize the pet, keeping the current animation playing"""
+        self.gif_size = QSize(pet_size, pet_size)
+        if self.pet_label:
+            self.pet_label.setFixedSize(self.gif_size)
+            self.pet_widget.setFixedSize(self.gif_size)
+            self.refresh_frames()
+    
+    def set_skin(self, name):
+        """Swap the character to a skin pack ("" for the default), keeping the current animation"""
+        self.skin = skins.select(name)
+        self._apply_skin()
+    
+    def _apply_skin(self):
+        # Animations the pack leaves out keep the default character's GIF
+        self.gifs = dict(self.default_gifs)
+        if self.skin:
+            self.gifs.update(self.skin.gifs)
+        gif = self.gifs.get(self.current_key, self.gifs["idle"])
+        if self.pet_label:
+            self.change_gif(gif, self.pet_label)
+        else:
+            self.current_gif = gif
+    
+    def on_asset_changed(self, asset):
+        """Drop stale frames for a GIF edited on disk, reloading it if it is playing"""
+        if self.skin and asset is self.skin.asset:
+            self.skin = skins.reload()
+            self._apply_skin()
+            return
+        frame_cache.invalidate(asset.path)
+        if asset is self.current_gif and asset.exists:
+            self.refresh_frames()
     
     def setup_pet_animation(self, pet_label):
         """Set up the pet GIF animation"""
-        if os.path.exists(self.current_gif):
-            self.movie = QMovie(self.current_gif)
+        if self.current_gif.exists:
+            self.pet_label = pet_label
             
-            # Scale the movie to desired size
-            gif_size = QSize(150, 150)
-            self.movie.setScaledSize(gif_size)
-            
-            # Set up the label
-            pet_label.setMovie(self.movie)
-            pet_label.setFixedSize(gif_size)
-            self.pet_widget.setFixedSize(gif_size)
+            # Set up the label at the desired size
+            pet_label.setFixedSize(self.gif_size)
+            self.pet_widget.setFixedSize(self.gif_size)
             
             # Start the animation
-            self.movie.start()
+            self.pin_frames()
+            pet_label.set_frames(self.get_frames(self.current_gif))
         else:
-            print(f"GIF file not found: {self.current_gif}")
+            print(f"GIF file not found: {self.current_gif.path}")
     
-    def change_gif(self, gif_path, pet_label):
+    def change_gif(self, gif, pet_label):
         """Change the current GIF animation"""
-        if os.path.exists(gif_path):
-            self.current_gif = gif_path
-            self.movie.stop()
-            self.movie = QMovie(gif_path)
-            self.movie.setScaledSize(QSize(150, 150))
-            pet_label.setMovie(self.movie)
-            self.movie.start()
+        if gif.exists:
+            self.current_gif = gif
+            self.pin_frames()
+            pet_label.set_frames(self.get_frames(gif))
+    
+    def pin_frames(self):
+        """Keep the current animation and the one it reverts to out of frame cache eviction"""
+        paths = {self.current_gif.path}
+        if self.revert_key:
+            paths.add(self.gifs.get(self.revert_key, self.gifs["idle"]).path)
+        frame_cache.pin(self, paths)
     
     def switch_gif(self, gif_key, pet_label, duration=None, revert_to="idle"):
         """Switch to a specific GIF animation with optional duration and revert"""
@@ -73,23 +154,31 @@ class GifManager:
             self.animation_timer.stop()
             self.animation_timer = None
         
-        gif_path = self.gif_paths.get(gif_key, self.gif_paths["idle"])
-        self.change_gif(gif_path, pet_label)
+        gif = self.gifs.get(gif_key, self.gifs["idle"])
+        self.current_key = gif_key if gif_key in self.gifs else "idle"
+        self.revert_key = revert_to if duration else None
+        self.change_gif(gif, pet_label)
+        for listener in self.change_listeners:
+            listener(gif_key)
         
         if duration:
             # Create new animation timer
-            self.animation_timer = QTimer()
+            self.animation_timer = self.clock.timer()
             self.animation_timer.setSingleShot(True)
             self.animation_timer.timeout.connect(lambda: self.switch_gif(revert_to, pet_label))
             self.animation_timer.start(duration)
     
+    def add_change_listener(self, listener):
+        """Register a callback for animation switches"""
+        self.change_listeners.append(listener)
+    
     def get_random_action(self):
         """Get a random action animation name"""
         actions = [
             "dancing", "laugh", "excited", "heartthrow", 
             "playing", "greeting", "says_yes", "doubtful"
         ]
-        return random.choice(actions)
+        return self.clock.random.choice(actions)
     
     def stop_timers(self):
         """Stop all animation timers"""
@@ -97,5 +186,5 @@ class GifManager:
             self.animation_timer.stop()
             self.animation_timer = None
         
-        if hasattr(self, 'movie'):
-            self.movie.stop()
+        if self.pet_label:
+            self.pet_label.stop()
@@ -0,0 +1,175 @@
+"""
+Fixed-timestep motion engine for moving the pet and other entities
+"""
+import math
+import time
+from PyQt5.QtCore import Qt, QTimer
+
+# Simulation step and the timer interval that drives it
+STEP_SECONDS = 1.0 / 120
+TICK_MS = 16
+
+# Never simulate more than this many steps per tick (e.g. after a stall)
+MAX_STEPS_PER_TICK = 12
+
+DEFAULT_SPEED = 400.0         # Cruise speed in pixels per second
+DEFAULT_ACCELERATION = 2400.0  # Pixels per second squared, for start-up and braking
+
+
+class MotionBody:
+    """A moving entity: position, velocity and current target
+
+    Bodies are reused for their whole life; retargeting only rewrites fields.
+    """
+
+    __slots__ = ("x", "y", "target_x", "target_y", "speed", "velocity",
+                 "acceleration", "moving", "on_move", "on_arrive")
+
+    def __init__(self, x=0.0, y=0.0, on_move=None, on_arrive=None):
+        self.x = float(x)
+        self.y = float(y)
+        self.target_x = self.x
+        self.target_y = self.y
+        self.speed = DEFAULT_SPEED
+        self.velocity = 0.0  # Current speed along the path, pixels per second
+        self.acceleration = DEFAULT_ACCELERATION
+        self.moving = False
+        self.on_move = on_move      # Called with (body) after each tick that moved it
+        self.on_arrive = on_arrive  # Called with (body) once it reaches its target
+
+    def place(self, x, y):
+        """Teleport the body and stop it"""
+        self.x = self.target_x = float(x)
+        self.y = self.target_y = float(y)
+        self.velocity = 0.0
+        self.moving = False
+
+    def retarget(self, x, y, speed=None):
+        """Point the body at a new target without resetting its velocity"""
+        self.target_x = float(x)
+        self.target_y = float(y)
+        if speed:
+            self.speed = float(speed)
+        self.moving = True
+
+    def remaining_distance(self):
+        return math.hypot(self.target_x - self.x, self.target_y - self.y)
+
+    def estimated_duration(self):
+        """Seconds to reach the target at cruise speed (ignores acceleration)"""
+        return self.remaining_distance() / self.speed if self.speed else 0.0
+
+    def step(self, dt):
+        """Integrate one fixed step; returns True when the target is reached"""
+        dx = self.target_x - self.x
+        dy = self.target_y - self.y
+        distance = math.hypot(dx, dy)
+
+        # Cruise, but never faster than we can brake from before the target
+        desired = min(self.speed, math.sqrt(2.0 * self.acceleration * distance))
+        change = self.acceleration * dt
+        if self.velocity < desired:
+            self.velocity = min(desired, self.velocity + change)
+        else:
+            self.velocity = max(desired, self.velocity - change)
+
+        travel = self.velocity * dt
+        if travel >= distance or distance < 0.5:
+            self.x = self.target_x
+            self.y = self.target_y
+            self.velocity = 0.0
+            self.moving = False
+            return True
+
+        self.x += dx / distance * travel
+        self.y += dy / distance * travel
+        return False
+
+
+class MotionEngine:
+    """Integrates every moving body at a fixed timestep
+
+    The engine's clock only runs while at least one body is moving, so an idle
+    pet costs nothing. advance() can also be called directly for headless use.
+    """
+
+    def __init__(self, step_seconds=STEP_SECONDS, clock=time.perf_counter, timer_factory=QTimer):
+        self.step_seconds = step_seconds
+        self.clock = clock
+        self.timer_factory = timer_factory
+        self.bodies = []
+        self.accumulator = 0.0
+        self.last_tick = None
+        self.timer = None
+
+    def add_body(self, x=0.0, y=0.0, on_move=None, on_arrive=None):
+        """Create and register a body"""
+        body = MotionBody(x, y, on_move, on_arrive)
+        self.bodies.append(body)
+        return body
+
+    def remove_body(self, body):
+        if body in self.bodies:
+            self.bodies.remove(body)
+
+    def move_to(self, body, x, y, speed=None):
+        """Send a body toward a target, retargeting it if it is already moving"""
+        body.retarget(x, y, speed)
+        self._ensure_running()
+
+    def stop(self, body=None):
+        """Stop one body where it is, or every body and the clock"""
+        if body is not None:
+            body.place(body.x, body.y)
+            return
+        for each in self.bodies:
+            each.place(each.x, each.y)
+        if self.timer:
+            self.timer.stop()
+        self.last_tick = None
+
+    def _ensure_running(self):
+        if self.timer is None:
+            self.timer = self.timer_factory()
+            self.timer.setTimerType(Qt.PreciseTimer)
+            self.timer.timeout.connect(self._tick)
+        if not self.timer.isActive():
+            self.last_tick = self.clock()
+            self.accumulator = 0.0
+            self.timer.start(TICK_MS)
+
+    def _tick(self):
+        now = self.clock()
+        elapsed = now - self.last_tick
+        self.last_tick = now
+        if not self.advance(elapsed):
+            self.timer.stop()
+            self.last_tick = None
+
+    def advance(self, elapsed):
+        """Run as many fixed steps as fit in elapsed seconds; returns True while anything moves"""
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.step_seconds)
+        if steps > MAX_STEPS_PER_TICK:
+            steps = MAX_STEPS_PER_TICK
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step_seconds
+
+        any_moving = False
+        for body in self.bodies:
+            if not body.moving:
+                continue
+            arrived = False
+            for _ in range(steps):
+                if body.step(self.step_seconds):
+                    arrived = True
+                    break
+            if steps and body.on_move:
+                body.on_move(body)
+            if arrived:
+                if body.on_arrive:
+                    body.on_arrive(body)
+            else:
+                any_moving = True
+        return any_moving or any(body.moving for body in self.bodies)
@@ -0,0 +1,145 @@
+"""
+Skin packs: alternative characters shipped as single zip archives
+"""
+import os
+import json
+import zipfile
+
+from animation.frame_player import frame_cache
+from utils.assets import assets
+
+# Skin packs live in assets/skins/<name>.zip
+SKINS_DIR = "skins"
+SKIN_SUFFIX = ".zip"
+
+# Archive member that maps animation keys to GIF members:
+# {"name": "Milk", "animations": {"idle": "idle.gif", "sleeping": "tired.gif"}}
+MANIFEST = "skin.json"
+
+
+class SkinError(Exception):
+    """A skin pack that cannot be used"""
+
+
+class SkinMember:
+    """Handle to one GIF inside a skin pack, usable wherever an Asset is
+
+    Its path is virtual ("<archive>/<member>"); the frame cache reads the
+    bytes from the open archive the first time the animation is played.
+    """
+
+    __slots__ = ("pack", "member", "path")
+
+    exists = True
+
+    def __init__(self, pack, member):
+        self.pack = pack
+        self.member = member
+        self.path = f"{pack.asset.path}/{member}"
+
+    @property
+    def stamp(self):
+        return self.pack.asset.stamp
+
+    def read(self):
+        return self.pack.archive.read(self.member)
+
+    def __repr__(self):
+        return f"SkinMember({self.pack.name!r}, {self.member!r})"
+
+
+class SkinPack:
+    """An open skin archive
+
+    Opening reads only the zip central directory and the small manifest;
+    no image is decoded until its animation is first shown.
+    """
+
+    def __init__(self, asset):
+        self.asset = asset
+        self.name = os.path.splitext(os.path.basename(asset.name))[0]
+        try:
+            self.archive = zipfile.ZipFile(asset.path)
+        except (OSError, zipfile.BadZipFile) as e:
+            raise SkinError(f"{asset.name}: {e}") from e
+        try:
+            manifest = json.loads(self.archive.read(MANIFEST))
+            animations = manifest["animations"]
+        except (KeyError, ValueError, TypeError) as e:
+            self.archive.close()
+            raise SkinError(f"{asset.name}: bad or missing {MANIFEST} ({e})") from e
+        self.title = manifest.get("name", self.name)
+
+        members = set(self.archive.namelist())
+        self.gifs = {}
+        for key, member in animations.items():
+            if member in members:
+                self.gifs[key] = SkinMember(self, member)
+            else:
+                print(f"⚠️ Skin {self.name}: {member} not in archive, using the default {key}")
+
+    def install(self, cache=frame_cache):
+        """Let the frame cache decode this pack's members"""
+        for gif in self.gifs.values():
+            cache.add_source(gif.path, gif.read)
+
+    def release(self, cache=frame_cache):
+        """Drop every decoded frame of this pack and close the archive"""
+        cache.remove_sources(self.asset.path + "/")
+        self.archive.close()
+
+
+class SkinLibrary:
+    """The skin packs on disk and the one in use
+
+    Available skins are listed from the asset registry without opening them;
+    only the selected pack is ever open.
+    """
+
+    def __init__(self, registry=assets, cache=frame_cache):
+        self.registry = registry
+        self.cache = cache
+        self.active = None
+
+    def available(self):
+        """Names of the installed skin packs"""
+        return [os.path.splitext(os.path.basename(asset.name))[0]
+                for asset in self.registry.children(SKINS_DIR, SKIN_SUFFIX)]
+
+    def select(self, name):
+        """Open a skin pack by name and release the previous one; "" for the default
+
+        Returns the open SkinPack, or None for the default character.
+        """
+        if self.active and self.active.name == name:
+            return self.active
+        pack = None
+        if name:
+            asset = self.registry.get(f"{SKINS_DIR}/{name}{SKIN_SUFFIX}")
+            if not asset.exists:
+                print(f"⚠️ Skin not found: {name}")
+            else:
+                try:
+                    pack = SkinPack(asset)
+                except SkinError as e:
+                    print(f"⚠️ Could not open skin: {e}")
+        if self.active:
+            self.active.release(self.cache)
+        self.active = pack
+        if pack:
+            pack.install(self.cache)
+            print(f"🎨 Skin: {pack.title}")
+        return pack
+
+    def reload(self):
+        """Re-open the active pack, e.g. after its archive changed on disk"""
+        if not self.active:
+            return None
+        name = self.active.name
+        self.active.release(self.cache)
+        self.active = None
+        return self.select(name)
+
+
+# Shared by the pet and the tray menu so only one pack is ever open
+skins = SkinLibrary()
@@ -0,0 +1,4 @@
+"""
+Headless benchmarks for Milk Mocha Pet
+Run from the repository root, e.g. python -m benchmarks.frame_damage
+"""
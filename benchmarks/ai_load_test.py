@@ -0,0 +1,119 @@
+"""
+Load test for the AI request path against the local stub Gemini server
+
+Starts benchmarks.stub_gemini_server in-process, points GeminiService at it
+through GEMINI_API_BASE_URL and fires concurrent requests through
+SafeGeminiService, the same entry points the pet uses. Reports throughput,
+latency percentiles, timeout and fallback rates, and how many threads are
+alive over time (timed-out worker threads are abandoned, not cancelled).
+
+Usage:
+    python -m benchmarks.ai_load_test --workers 8 --duration 20 --mode get \
+        --latency lognormal:0.8,0.6 --error-rate 0.05 --hang-rate 0.05 --hang-seconds 30
+"""
+import os
+import time
+import argparse
+import threading
+
+from benchmarks.stub_gemini_server import (
+    STUB_PREFIX, StubGeminiServer, add_behavior_arguments, behavior_from_args
+)
+
+CONTEXTS = ["motivational", "wellness", "random", "humorous"]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LoadTest:
+    """Closed-loop load: each worker sends its next request when the last one returns"""
+
+    def __init__(self, service, workers, duration, mode):
+        self.service = service
+        self.workers = workers
+        self.duration = duration
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.results = []          # (latency, ai_text, timed_out)
+        self.thread_samples = []   # (elapsed, active threads)
+
+    def request(self, context):
+        if self.mode == "stream":
+            return self.service.stream_message_with_timeout(context)
+        return self.service.get_message_with_timeout(context)
+
+    def worker(self, index, deadline):
+        count = 0
+        while time.perf_counter() < deadline:
+            context = CONTEXTS[(index + count) % len(CONTEXTS)]
+            started = time.perf_counter()
+            text = self.request(context)
+            latency = time.perf_counter() - started
+            timed_out = latency >= self.service.timeout_seconds
+            with self.lock:
+                self.results.append((latency, text.startswith(STUB_PREFIX), timed_out))
+            count += 1
+
+    def run(self):
+        started = time.perf_counter()
+        deadline = started + self.duration
+        threads = [threading.Thread(target=self.worker, args=(i, deadline), daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            self.thread_samples.append((time.perf_counter() - started, threading.active_count()))
+            time.sleep(0.5)
+        self.elapsed = time.perf_counter() - started
+        self.thread_samples.append((self.elapsed, threading.active_count()))
+
+    def report(self):
+        latencies = [r[0] for r in self.results]
+        total = len(self.results) or 1
+        fallbacks = sum(1 for r in self.results if not r[1])
+        timeouts = sum(1 for r in self.results if r[2])
+        print(f"Requests:    {len(self.results)} in {self.elapsed:.1f}s "
+              f"({len(self.results) / self.elapsed:.1f}/s, {self.workers} workers, {self.mode})")
+        print(f"Latency:     p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+              f"p90 {percentile(latencies, 0.9) * 1000:.0f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:.0f} ms, "
+              f"max {max(latencies, default=0) * 1000:.0f} ms")
+        print(f"Timeouts:    {timeouts} ({timeouts / total:.1%})")
+        print(f"Fallbacks:   {fallbacks} ({fallbacks / total:.1%})")
+        print("Threads alive over time:")
+        step = max(1, len(self.thread_samples) // 12)
+        for elapsed, count in self.thread_samples[::step] + self.thread_samples[-1:]:
+            print(f"  {elapsed:6.1f}s  {count:4d}  {'#' * count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load")
+    parser.add_argument("--mode", choices=("get", "stream"), default="get")
+    parser.add_argument("--timeout", type=float, default=None, help="override SafeGeminiService timeout")
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    with StubGeminiServer(behavior_from_args(args)) as server:
+        os.environ["GEMINI_API_BASE_URL"] = server.base_url
+        os.environ.pop("MILK_MOCHA_GEMINI_STUB", None)
+        from utils.safe_gemini import SafeGeminiService
+
+        # No batching and an effectively unlimited quota: every call reaches the server
+        service = SafeGeminiService(batch_size=1, requests_per_minute=10 ** 6, requests_per_day=10 ** 9)
+        if args.timeout:
+            service.timeout_seconds = args.timeout
+        test = LoadTest(service, args.workers, args.duration, args.mode)
+        test.run()
+        test.report()
+        print(f"Server saw:  {server.behavior.counts}")
+
+
+if __name__ == "__main__":
+    main()
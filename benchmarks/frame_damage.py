@@ -0,0 +1,37 @@
+"""
+Bytes blended per second: full-frame repaint vs dirty-rectangle repaint
+
+Usage: python -m benchmarks.frame_damage
+"""
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from animation.gif_manager import GifManager
+from animation.frame_player import frame_cache
+
+
+def main():
+    app = QApplication(sys.argv)  # noqa: F841 - keeps Qt alive while decoding
+    manager = GifManager(None)
+
+    print(f"{'animation':<12}{'frames':>8}{'full KB/s':>12}{'dirty KB/s':>12}{'saved':>8}")
+    total_full = total_dirty = 0.0
+    for key, gif in manager.gifs.items():
+        frames = frame_cache.get(gif.path, manager.gif_size, 1.0)  # Whole animation, decoded here
+        full = frames.bytes_blended_per_second(partial=False)
+        dirty = frames.bytes_blended_per_second(partial=True)
+        total_full += full
+        total_dirty += dirty
+        saved = f"{100 - dirty * 100 / full:.0f}%" if full else "-"
+        print(f"{key:<12}{frames.frame_count:>8}{full / 1024:>12.1f}{dirty / 1024:>12.1f}{saved:>8}")
+    saved = f"{100 - total_dirty * 100 / total_full:.0f}%" if total_full else "-"
+    print(f"{'total':<12}{'':>8}{total_full / 1024:>12.1f}{total_dirty / 1024:>12.1f}{saved:>8}")
+    frame_cache.shutdown()
+
+
+if __name__ == "__main__":
+    main()
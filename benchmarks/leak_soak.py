@@ -0,0 +1,99 @@
+"""
+Headless soak test: drive the pet for a long session and fail on leaks
+
+Runs the pet offscreen against the local stub Gemini model and replays a
+cycle of interactions (animations, feeding, bottles, speech, Gemini
+requests) over and over. After a warm-up that fills the caches, the leak
+detector samples live QObjects, threads and allocation sites after every
+round; the run exits with status 1 if any of them kept growing.
+
+Usage: python -m benchmarks.leak_soak [rounds] [cycles per round]
+"""
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["MILK_MOCHA_GEMINI_STUB"] = "1"
+os.environ.setdefault("MILK_MOCHA_STUB_FIRST_DELAY", "0.01")
+os.environ.setdefault("MILK_MOCHA_STUB_CHUNK_DELAY", "0.005")
+
+# Keep the soak's settings and caches (analytics, message bags, snapshot) out of the real ones,
+# and start without anything an earlier session left behind
+SOAK_DIR = tempfile.mkdtemp(prefix="milk-mocha-soak-")
+os.environ["MILK_MOCHA_CACHE_DIR"] = os.path.join(SOAK_DIR, "cache")
+os.environ["MILK_MOCHA_SETTINGS_FILE"] = os.path.join(SOAK_DIR, "settings.json")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer, QEventLoop
+
+from utils.leak_detector import LeakDetector
+
+# Rounds run before the baseline, so caches and pools reach their working size
+WARMUP_ROUNDS = 3
+
+# Time given to each step of a cycle, so timers, bubbles and workers get to run
+STEP_MS = 40
+
+
+def cycle(pet):
+    """One pass over the interactions of a normal session"""
+    return [
+        pet.show_dancing,
+        pet.show_playing,
+        pet.show_says_yes,
+        lambda: pet.show_speech_bubble("Soak test says hi!"),
+        pet.hide_speech_bubble,
+        pet.spawn_milk_bottle,
+        lambda: [bottle.collide_with_pet() for bottle in list(pet.active_bottles)],
+        pet.show_drinking,
+        pet._finish_drinking,
+        pet.request_contextual_message,
+        pet.hide_speech_bubble,
+        pet.run_to_random_location,
+        lambda: pet.gif_manager.switch_gif("idle", pet.pet_label),
+    ]
+
+
+def run_round(pet, cycles):
+    loop = QEventLoop()
+    steps = cycle(pet) * cycles
+    for index, step in enumerate(steps):
+        QTimer.singleShot(index * STEP_MS, step)
+    QTimer.singleShot(len(steps) * STEP_MS + 200, loop.quit)
+    loop.exec_()
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    app = QApplication(sys.argv)  # noqa: F841 - runs the pet's timers
+
+    from core.pet import MilkMochaPet
+    pet = MilkMochaPet()
+    pet.speech_queue.min_display_ms = STEP_MS
+
+    detector = LeakDetector()  # Traces allocations from here, so warm-up ones count in the baseline
+    for _ in range(WARMUP_ROUNDS):
+        run_round(pet, cycles)
+    detector.sample()
+    for index in range(rounds):
+        run_round(pet, cycles)
+        growing = detector.sample()
+        print(f"🧯 round {index + 1}/{rounds}: {len(growing)} growing categories")
+
+    print(detector.report())
+    growing = detector.growing()
+    detector.stop()
+    try:
+        pet.quit_application(snapshot=False)
+    except SystemExit:
+        pass  # The verdict below decides the exit status
+    if growing:
+        print(f"❌ {len(growing)} categories grew every round: {', '.join(sorted(growing))}")
+        sys.exit(1)
+    print("✅ No category kept growing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Offline generator: cold/warm load time, time per message, variety
+
+Usage: python -m benchmarks.local_generator
+"""
+import os
+import time
+
+from utils.config import cache_path
+from utils.gemini_service import GeminiHandler
+from utils.local_generator import MODEL_FILE
+
+SAMPLES = 2000
+
+
+def load_time(handler):
+    started = time.perf_counter()
+    handler.local_generator.generate("random")
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    path = cache_path(MODEL_FILE)
+    if os.path.exists(path):
+        os.remove(path)
+    cold = load_time(GeminiHandler())
+    handler = GeminiHandler()
+    warm = load_time(handler)
+    print(f"Model file:  {os.path.getsize(path)} bytes")
+    print(f"First call:  {cold:.1f} ms training, {warm:.1f} ms from the binary")
+
+    corpus = handler.message_store.corpus()
+    print(f"{'context':>13}{'sources':>9}{'us/msg':>8}{'distinct':>10}{'fallbacks':>11}")
+    for context in sorted(corpus):
+        generated = []
+        started = time.perf_counter()
+        for _ in range(SAMPLES):
+            generated.append(handler.local_generator.generate(context))
+        per_message = (time.perf_counter() - started) / SAMPLES * 1e6
+        misses = generated.count(None)
+        distinct = len(set(generated) - {None})
+        print(f"{context:>13}{len(corpus[context]):>9}{per_message:>8.1f}"
+              f"{distinct / SAMPLES:>10.0%}{misses / SAMPLES:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Requests per hour and cost per delivered message, single vs batched generation
+
+Simulates one hour of the speaking system against the local stub model,
+delivering one message per speaking interval across a rotation of
+contexts, both as whole answers and streamed into the bubble. Cost is
+estimated at ~4 characters per token, prompt plus response.
+
+Usage: python -m benchmarks.message_batching
+"""
+import os
+
+os.environ["MILK_MOCHA_GEMINI_STUB"] = "1"
+os.environ["MILK_MOCHA_STUB_FIRST_DELAY"] = "0"
+os.environ["MILK_MOCHA_STUB_CHUNK_DELAY"] = "0"
+
+from utils.safe_gemini import SafeGeminiService
+
+CONTEXTS = ["motivational", "wellness", "random", "humorous"]
+CHARS_PER_TOKEN = 4
+
+
+def simulate_hour(batch_size, interval_minutes, stream=False):
+    service = SafeGeminiService(batch_size)
+    delivered = 60 // interval_minutes
+    for i in range(delivered):
+        if stream:
+            service.stream_message_with_timeout(CONTEXTS[i % len(CONTEXTS)], on_text=lambda text: None)
+        else:
+            service.get_message_with_timeout(CONTEXTS[i % len(CONTEXTS)])
+    usage = service.original_service.usage
+    tokens = (usage["prompt_chars"] + usage["response_chars"]) / CHARS_PER_TOKEN
+    return usage["requests"], delivered, tokens / delivered
+
+
+def main():
+    print(f"{'mode':>7}{'interval':>9}{'batch':>7}{'msgs/h':>8}{'requests/h':>12}{'tokens/msg':>12}")
+    for stream in (False, True):
+        mode = "stream" if stream else "whole"
+        for interval in (1, 5, 15):
+            for batch_size in (1, 5, 10):
+                requests, delivered, tokens = simulate_hour(batch_size, interval, stream)
+                print(f"{mode:>7}{interval:>8}m{batch_size:>7}{delivered:>8}{requests:>12}{tokens:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
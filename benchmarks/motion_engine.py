@@ -0,0 +1,38 @@
+"""
+Motion engine throughput: entities integrated per millisecond, headless
+
+Usage: python -m benchmarks.motion_engine
+"""
+import random
+import time
+
+from animation.motion import MotionEngine, STEP_SECONDS
+
+
+def run(entity_count, ticks=200, seed=1):
+    """Advance entity_count bodies for a number of one-step ticks, retargeting as they arrive"""
+    rng = random.Random(seed)
+    engine = MotionEngine()
+
+    def retarget(body):
+        body.retarget(rng.uniform(0, 3840), rng.uniform(0, 2160))
+
+    for _ in range(entity_count):
+        body = engine.add_body(rng.uniform(0, 3840), rng.uniform(0, 2160), on_arrive=retarget)
+        retarget(body)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        engine.advance(STEP_SECONDS)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return entity_count * ticks / elapsed_ms
+
+
+def main():
+    print(f"{'entities':>10}{'updates/ms':>14}")
+    for count in (1, 10, 100, 1000):
+        print(f"{count:>10}{run(count):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Overhead of the sampling profiler on busy threads
+
+Runs the same CPU-bound work on the main thread and two workers with the
+profiler off and on, and reports the slowdown.
+
+Usage: python -m benchmarks.profiler_overhead [seconds of work]
+"""
+import sys
+import time
+import tempfile
+import threading
+
+from utils import profiler as profiler_module
+from utils.profiler import SamplingProfiler
+
+
+def work(iterations):
+    total = 0
+    for index in range(iterations):
+        total += index % 7
+    return total
+
+
+def run(iterations):
+    workers = [threading.Thread(target=work, args=(iterations,)) for _ in range(2)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    work(iterations)
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    iterations = 100000
+    while run(iterations) < seconds:
+        iterations *= 2
+
+    baseline = min(run(iterations) for _ in range(3))
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the benchmark's profiles out of the app's cache
+        profiler_module.cache_path = lambda filename: f"{directory}/{filename}"
+        profiled = []
+        for _ in range(3):
+            profiler = SamplingProfiler()
+            profiler.start()
+            profiled.append(run(iterations))
+            profiler.stop("overhead")
+        profiled = min(profiled)
+
+    print(f"without profiler: {baseline:.3f} s")
+    print(f"with profiler:    {profiled:.3f} s  ({(profiled / baseline - 1) * 100:+.1f}%, "
+          f"{profiler.sample_count} samples, {len(profiler.samples)} distinct stacks)")
+
+
+if __name__ == "__main__":
+    main()
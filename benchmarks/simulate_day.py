@@ -0,0 +1,130 @@
+"""
+Simulated day: replay hours of pet behavior in seconds, reproducibly from a seed
+
+Runs the pet offscreen on a VirtualClock, against the stub Gemini model with
+no delays and in a fresh cache and config directory. Every behavior timer
+fires in order as virtual time advances as fast as the callbacks run, and a
+seeded user pokes the pet during working hours (clicks, petting, G presses,
+stories, dragging bottles over). Prints what happened and a digest of the
+event log; the same seed and length always give the same digest.
+
+Usage: python -m benchmarks.simulate_day [hours] [seed]
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["MILK_MOCHA_GEMINI_STUB"] = "1"
+os.environ["MILK_MOCHA_STUB_FIRST_DELAY"] = "0"
+os.environ["MILK_MOCHA_STUB_CHUNK_DELAY"] = "0"
+
+# A fresh cache, so no snapshot, message bags or trained model from earlier runs leak in,
+# and settings of its own, kept out of the real config directory
+SIMULATION_DIR = tempfile.mkdtemp(prefix="milk-mocha-sim-")
+os.environ["MILK_MOCHA_CACHE_DIR"] = os.path.join(SIMULATION_DIR, "cache")
+os.environ["MILK_MOCHA_SETTINGS_FILE"] = os.path.join(SIMULATION_DIR, "settings.json")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEvent
+
+from utils.clock import VirtualClock
+
+# Virtual time advanced between passes of the Qt event loop (deferred deletes, window events)
+SLICE_SECONDS = 1.0
+
+# The simulated user is around 9:00-18:00 and does something every ~10 minutes on average
+WORK_HOURS = range(9, 18)
+MEAN_SECONDS_BETWEEN_ACTIONS = 600
+
+# Settings for the run; the stall watchdog measures real time, so it stays off
+SETTINGS = {"stall_watchdog_enabled": False, "leak_detector_enabled": False, "analytics_enabled": True,
+            "last_position": [500, 250]}  # Off the spot where bottles appear
+
+
+class SimulatedUser:
+    """Acts on the pet at random moments drawn from the clock's seeded generator"""
+
+    def __init__(self, pet):
+        self.pet = pet
+        self.clock = pet.clock
+        self.actions = {
+            "click": lambda: pet.behavior.handle_click(None),
+            "pet": lambda: pet.behavior.pet_pet(None),
+            "ask": pet.request_contextual_message,
+            "story": pet.tell_funny_story,
+            "feed": self.drag_bottle_to_pet,
+        }
+        self.counts = dict.fromkeys(self.actions, 0)
+        self._schedule()
+
+    def _schedule(self):
+        delay = self.clock.random.expovariate(1.0 / MEAN_SECONDS_BETWEEN_ACTIONS)
+        self.clock.single_shot(int(delay * 1000), self._act)
+
+    def _act(self):
+        if self.clock.now().hour in WORK_HOURS and not self.pet.is_angry:
+            name = self.clock.random.choice(sorted(self.actions))
+            self.counts[name] += 1
+            self.actions[name]()
+        self._schedule()
+
+    def drag_bottle_to_pet(self):
+        for bottle in list(self.pet.active_bottles):
+            bottle.move(self.pet.x(), self.pet.y())
+
+
+def digest(rows):
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 24.0
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    app = QApplication(sys.argv)
+
+    with open(os.environ["MILK_MOCHA_SETTINGS_FILE"], "w") as f:
+        json.dump(SETTINGS, f)
+
+    from core.pet import MilkMochaPet
+    clock = VirtualClock(seed)
+    pet = MilkMochaPet(clock)
+    animations = []
+    pet.gif_manager.add_change_listener(lambda key: animations.append((round(clock.elapsed, 3), key)))
+    user = SimulatedUser(pet)
+
+    started = time.perf_counter()
+    end = hours * 3600
+    while clock.elapsed < end:
+        clock.advance(min(SLICE_SECONDS, end - clock.elapsed))
+        app.processEvents()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+    wall = time.perf_counter() - started
+
+    pet.analytics.flush()
+    events = [(round(ts - clock.start, 3), kind, detail)
+              for ts, kind, detail in reversed(pet.analytics.recent(limit=10 ** 7))]
+    totals = pet.analytics.totals()
+    position = (pet.x(), pet.y())
+    try:
+        pet.quit_application(snapshot=False)
+    except SystemExit:
+        pass  # Report below
+
+    print(f"\nSimulated {hours:g} h (seed {seed}) in {wall:.1f} s: {hours * 3600 / wall:,.0f}x real time, "
+          f"{clock.fired:,} timer callbacks")
+    print("User actions: " + ", ".join(f"{name} {count}" for name, count in sorted(user.counts.items())))
+    print("Events: " + ", ".join(f"{kind}{'/' + detail if detail else ''} {count}"
+                                 for (kind, detail), count in sorted(totals.items())))
+    switches = {}
+    for _, key in animations:
+        switches[key] = switches.get(key, 0) + 1
+    print("Animations: " + ", ".join(f"{key} {count}" for key, count in sorted(switches.items())))
+    print(f"Digest: {digest([events, animations, position])}")
+
+
+if __name__ == "__main__":
+    main()
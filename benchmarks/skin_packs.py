@@ -0,0 +1,83 @@
+"""
+Cost of installed skin packs: listing, opening, first use and release
+
+Builds N skin packs from the default GIFs in a temporary directory, then
+times listing them, opening one (central directory and manifest only), the
+first decode of its idle animation and switching to another pack.
+
+Usage: python -m benchmarks.skin_packs [packs]
+"""
+import os
+import sys
+import json
+import time
+import zipfile
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QSize
+
+from animation.frame_player import FrameCache
+from animation.gif_manager import GifManager
+from animation.skins import SkinLibrary, MANIFEST, SKINS_DIR, SKIN_SUFFIX
+from utils.assets import AssetRegistry
+
+
+def build_packs(root, count):
+    """Write count skin packs, each holding every default animation"""
+    gifs = GifManager(None).default_gifs
+    os.makedirs(os.path.join(root, SKINS_DIR))
+    for index in range(count):
+        path = os.path.join(root, SKINS_DIR, f"skin{index}{SKIN_SUFFIX}")
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+            archive.writestr(MANIFEST, json.dumps({
+                "name": f"Skin {index}",
+                "animations": {key: os.path.basename(gif.path) for key, gif in gifs.items()},
+            }))
+            for gif in gifs.values():
+                archive.write(gif.path, os.path.basename(gif.path))
+    return os.path.getsize(path)
+
+
+def decoded_bytes(cache):
+    return sum(image.sizeInBytes() for frames in cache.entries.values() for image in frames.images)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    app = QApplication(sys.argv)  # noqa: F841 - keeps Qt alive while decoding
+    size = QSize(150, 150)
+
+    with tempfile.TemporaryDirectory() as root:
+        pack_size = build_packs(root, count)
+        cache = FrameCache()
+        library = SkinLibrary(AssetRegistry(root), cache)
+
+        names, list_ms = timed(library.available)
+        print(f"{count} packs of {pack_size / 1024:.0f} KB each")
+        print(f"list installed packs:   {list_ms:8.2f} ms  ({len(names)} found, none opened)")
+
+        pack, open_ms = timed(library.select, names[0])
+        print(f"open one pack:          {open_ms:8.2f} ms  ({len(pack.gifs)} animations indexed, "
+              f"{decoded_bytes(cache)} bytes decoded)")
+
+        _, decode_ms = timed(cache.get, pack.gifs["idle"].path, size)
+        print(f"first idle frames:      {decode_ms:8.2f} ms  ({decoded_bytes(cache) / 1024:.0f} KB decoded)")
+
+        _, hit_ms = timed(cache.get, pack.gifs["idle"].path, size)
+        print(f"idle frames again:      {hit_ms:8.3f} ms")
+
+        _, switch_ms = timed(library.select, names[-1])
+        print(f"switch to another pack: {switch_ms:8.2f} ms  ({decoded_bytes(cache)} bytes still decoded)")
+
+
+if __name__ == "__main__":
+    main()
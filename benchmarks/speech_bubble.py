@@ -0,0 +1,82 @@
+"""
+Cost of showing a speech bubble: stylesheet QLabel vs custom-painted bubble
+
+Creates and renders a bubble for each message of a small rotating set, the
+way the pet repeats fallback and prefetched messages, and reports the time
+per bubble for both implementations.
+
+Usage: python -m benchmarks.speech_bubble [bubbles]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QWidget, QLabel
+from PyQt5.QtCore import Qt
+
+from ui.speech_bubble import SpeechBubble, layout_cache
+from utils.gemini_service import GeminiHandler
+
+STYLESHEET = """
+    QLabel {
+        background-color: rgba(255, 255, 255, 250);
+        border: 3px solid #4CAF50;
+        border-radius: 20px;
+        padding: 15px;
+        font-family: Arial, sans-serif;
+        font-size: 14px;
+        color: #000;
+        font-weight: bold;
+    }
+"""
+
+
+class StylesheetBubble(QWidget):
+    """The previous bubble: a styled QLabel measured twice per message"""
+
+    def __init__(self, message):
+        super().__init__(None)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.label = QLabel(self)
+        self.label.setText(message)
+        self.label.setWordWrap(True)
+        self.label.setAlignment(Qt.AlignCenter)
+        self.label.setStyleSheet(STYLESHEET)
+        font_metrics = self.label.fontMetrics()
+        width = min(max(font_metrics.boundingRect(message).width() + 60, 200), 300)
+        text_rect = font_metrics.boundingRect(0, 0, width - 40, 1000, Qt.TextWordWrap, message)
+        height = max(text_rect.height() + 50, 80)
+        self.setFixedSize(width, height)
+        self.label.setFixedSize(width, height)
+
+
+def messages(count):
+    corpus = [text for items in GeminiHandler().message_store.corpus().values() for text in items][:20]
+    return [corpus[index % len(corpus)] for index in range(count)]
+
+
+def time_bubbles(make, texts):
+    start = time.perf_counter()
+    for text in texts:
+        bubble = make(text)
+        bubble.grab()  # Polish, lay out and paint once, as showing it would
+        bubble.deleteLater()
+    QApplication.processEvents()
+    return (time.perf_counter() - start) * 1000 / len(texts)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    app = QApplication(sys.argv)  # noqa: F841 - keeps Qt alive while painting
+    texts = messages(count)
+
+    print(f"{count} bubbles, {len(set(texts))} distinct messages")
+    print(f"stylesheet label:  {time_bubbles(StylesheetBubble, texts):7.3f} ms per bubble")
+    print(f"painted bubble:    {time_bubbles(SpeechBubble, texts):7.3f} ms per bubble  "
+          f"(layouts: {layout_cache.misses} built, {layout_cache.hits} reused)")
+
+
+if __name__ == "__main__":
+    main()
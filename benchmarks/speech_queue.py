@@ -0,0 +1,110 @@
+"""
+Speech bubble churn: replace-immediately vs the priority speech queue
+
+Replays a burst of speech requests (startup greeting, background speaking,
+repeated G presses, a story, error messages) and reports, for each policy,
+how many bubbles were built, how many messages were on screen too briefly
+to read, and how many distinct messages were never readable.
+
+Usage: python -m benchmarks.speech_queue
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer, QEventLoop
+
+from ui.speech_queue import SpeechQueue
+from utils.quota import PRIORITY_USER, PRIORITY_STARTUP, PRIORITY_BACKGROUND
+
+# Shorter than the app's minimum so the replay finishes quickly; times scale with it
+MIN_DISPLAY_MS = 400
+
+# (at ms, text, priority, tag, is placeholder)
+SCRIPT = [
+    (0, "Good morning!", PRIORITY_STARTUP, 0, False),
+    (60, "Asking Gemini...", PRIORITY_BACKGROUND, 1, True),
+    (90, "Asking Gemini...", PRIORITY_USER, 2, True),
+    (150, "Asking Gemini...", PRIORITY_USER, 3, True),
+    (500, "Time for a stretch?", PRIORITY_BACKGROUND, 1, False),
+    (650, "You've been coding a while!", PRIORITY_USER, 2, False),
+    (700, "You've been coding a while!", PRIORITY_USER, 3, False),
+    (800, "Let me think of a story...", PRIORITY_USER, 4, True),
+    (1200, "Once upon a time, a cursor...", PRIORITY_USER, 4, False),
+    (1250, "Gemini is being shy!", PRIORITY_USER, 0, False),
+    (1270, "Gemini is being shy!", PRIORITY_USER, 0, False),
+]
+
+
+class Screen:
+    """Records what a bubble shows and for how long"""
+
+    def __init__(self):
+        self.built = 0
+        self.visible = False
+        self.history = []  # [text, shown at, hidden at]
+
+    def show(self, text):
+        if not self.visible:
+            self.built += 1
+            self.visible = True
+        self._switch(text)
+
+    def update(self, text):
+        self.history[-1][0] = text
+
+    def _switch(self, text):
+        now = time.monotonic()
+        if self.history:
+            self.history[-1][2] = now
+        self.history.append([text, now, None])
+
+    def finish(self):
+        if self.history:
+            self.history[-1][2] = self.history[-1][1] + 15.0  # The last one stays up in full
+
+
+def replay(post):
+    loop = QEventLoop()
+    for at, text, priority, tag, placeholder in SCRIPT:
+        QTimer.singleShot(at, lambda args=(text, priority, tag, placeholder): post(*args))
+    QTimer.singleShot(SCRIPT[-1][0] + MIN_DISPLAY_MS * (len(SCRIPT) + 1), loop.quit)
+    loop.exec_()
+
+
+def report(name, screen):
+    screen.finish()
+    minimum = MIN_DISPLAY_MS / 1000 * 0.95
+    brief = [text for text, shown, hidden in screen.history if hidden - shown < minimum]
+    readable = {text for text, shown, hidden in screen.history if hidden - shown >= minimum}
+    wanted = {text for _, text, _, _, placeholder in SCRIPT if not placeholder}
+    print(f"{name:<18}{screen.built:>8}{len(screen.history):>8}{len(brief):>8}{len(wanted - readable):>8}")
+
+
+def main():
+    app = QApplication(sys.argv)  # noqa: F841 - runs the timers
+
+    print(f"{'policy':<18}{'built':>8}{'shown':>8}{'brief':>8}{'unread':>8}")
+
+    # Before: every request destroyed the visible bubble and built a new one
+    screen = Screen()
+
+    def replace_immediately(text, priority, tag, placeholder):
+        screen.visible = False
+        screen.show(text)
+
+    replay(replace_immediately)
+    report("replace at once", screen)
+
+    screen = Screen()
+    queue = SpeechQueue(screen.show, screen.update, min_display_ms=MIN_DISPLAY_MS)
+    replay(queue.post)
+    report("speech queue", screen)
+    print(", ".join(f"{key} {value}" for key, value in queue.stats.items()))
+
+
+if __name__ == "__main__":
+    main()
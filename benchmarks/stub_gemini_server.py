@@ -0,0 +1,215 @@
+"""
+Local stand-in for the Gemini generateContent REST API
+
+Serves POST /v1beta/models/<model>:generateContent and
+:streamGenerateContent?alt=sse with injected latency, errors, hangs and
+slow streaming. Point the app at it with GEMINI_API_BASE_URL.
+
+Usage:
+    python -m benchmarks.stub_gemini_server --port 8765 \
+        --latency lognormal:0.8,0.5 --error-rate 0.05 --hang-rate 0.02 --chunk-delay 0.2
+    GEMINI_API_BASE_URL=http://127.0.0.1:8765 python main.py
+
+Latency specs: fixed:S, uniform:LO,HI, lognormal:MEDIAN,SIGMA, exponential:MEAN (seconds).
+"""
+import re
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+STUB_PREFIX = "🧪"
+ROUTE = re.compile(r"^/v1beta/models/([^/:]+):(generateContent|streamGenerateContent)")
+
+
+def parse_latency(spec):
+    """Turn a latency spec string into a zero-argument sampler (seconds)"""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: random.lognormvariate(math.log(median), sigma)
+    if kind == "exponential":
+        return lambda: random.expovariate(1.0 / values[0])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+class StubBehavior:
+    """Knobs for the stub server, shared by all request handlers"""
+
+    def __init__(self, latency="fixed:0.2", error_rate=0.0, hang_rate=0.0, hang_seconds=120.0,
+                 chunk_delay=0.05, chunk_words=3, seed=None):
+        self.latency_spec = latency
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.chunk_delay = chunk_delay
+        self.chunk_words = chunk_words
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "errors": 0, "hangs": 0, "streams": 0}
+
+    def roll(self):
+        """Decide what happens to a request: 'error', 'hang' or 'ok'"""
+        with self.lock:
+            self.counts["requests"] += 1
+            value = self.random.random()
+            if value < self.error_rate:
+                self.counts["errors"] += 1
+                return "error"
+            if value < self.error_rate + self.hang_rate:
+                self.counts["hangs"] += 1
+                return "hang"
+            return "ok"
+
+    @staticmethod
+    def answer(prompt):
+        """Deterministic-looking reply; batch prompts get a JSON array"""
+        match = re.search(r"exactly (\d+) different messages", prompt)
+        base = f"{STUB_PREFIX} Milk Mocha (stub) says: you are doing great, keep it up! ✨"
+        if match:
+            return json.dumps([f"{base} #{i + 1}" for i in range(int(match.group(1)))], ensure_ascii=False)
+        return base
+
+
+def make_handler(behavior):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass  # Keep load tests quiet
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        @staticmethod
+        def _candidate(text):
+            return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+        def do_POST(self):
+            match = ROUTE.match(self.path)
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not match:
+                self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+                return
+            try:
+                prompt = request["contents"][-1]["parts"][0]["text"]
+            except (KeyError, IndexError, TypeError):
+                self._send_json(400, {"error": {"code": 400, "message": "Bad request"}})
+                return
+
+            outcome = behavior.roll()
+            time.sleep(behavior.sample_latency())
+            if outcome == "hang":
+                time.sleep(behavior.hang_seconds)
+            if outcome == "error":
+                self._send_json(503, {"error": {"code": 503, "message": "Stub overloaded"}})
+                return
+
+            text = behavior.answer(prompt)
+            if match.group(2) == "generateContent":
+                self._send_json(200, self._candidate(text))
+                return
+
+            with behavior.lock:
+                behavior.counts["streams"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            words = text.split(" ")
+            size = behavior.chunk_words
+            for i in range(0, len(words), size):
+                if i:
+                    time.sleep(behavior.chunk_delay)
+                piece = " ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+                event = json.dumps(self._candidate(piece), ensure_ascii=False)
+                try:
+                    self.wfile.write(f"data: {event}\r\n\r\n".encode("utf-8"))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+            self.close_connection = True
+
+    return StubHandler
+
+
+class StubGeminiServer:
+    """Runs the stub on a background thread; use as a context manager in tests"""
+
+    def __init__(self, behavior=None, host="127.0.0.1", port=0):
+        self.behavior = behavior or StubBehavior()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.behavior))
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_behavior_arguments(parser):
+    parser.add_argument("--latency", default="fixed:0.2", help="latency spec, e.g. lognormal:0.8,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="seconds between stream chunks")
+    parser.add_argument("--chunk-words", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def behavior_from_args(args):
+    return StubBehavior(args.latency, args.error_rate, args.hang_rate, args.hang_seconds,
+                        args.chunk_delay, args.chunk_words, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubGeminiServer(behavior_from_args(args), args.host, args.port)
+    print(f"🧪 Stub Gemini server on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Served: {server.behavior.counts}")
+
+
+if __name__ == "__main__":
+    main()
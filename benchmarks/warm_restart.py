@@ -0,0 +1,83 @@
+"""
+Time to first frame: cold start vs warm restart from a snapshot
+
+Launches the pet in fresh interpreters (offscreen) and measures the time from
+process launch to the first painted animation frame, with and without the
+snapshot written by the previous run, in a temporary cache directory.
+
+The time is split into the part before the pet is constructed (interpreter,
+imports, QApplication) and the pet's own setup up to the first frame. Only the
+second part can be shortened by a snapshot, and it is the smaller one.
+
+Usage: python -m benchmarks.warm_restart [runs]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import statistics
+import subprocess
+
+# Snapshots go to a scratch cache (inherited by the child processes), never the real one
+os.environ["MILK_MOCHA_CACHE_DIR"] = tempfile.mkdtemp(prefix="milk-mocha-restart-")
+
+from utils.config import cache_path
+from core.snapshot import SNAPSHOT_FILE
+
+CHILD = """
+import sys, time, json
+launched = float(sys.argv[1])
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+app = QApplication([])
+from animation.frame_player import FramePlayer
+from core.snapshot import save_snapshot
+marks = {}
+paint = FramePlayer.paintEvent
+def first_paint(self, event):
+    marks.setdefault("first_frame", time.time())
+    paint(self, event)
+FramePlayer.paintEvent = first_paint
+from core.pet import MilkMochaPet
+marks["constructing"] = time.time()
+pet = MilkMochaPet()
+def finish():
+    save_snapshot(pet)
+    print("RESULT " + json.dumps({"total": marks["first_frame"] - launched,
+                                  "startup": marks["constructing"] - launched,
+                                  "construct": marks["first_frame"] - marks["constructing"]}))
+    app.exit(0)
+QTimer.singleShot(300, finish)
+app.exec_()
+"""
+
+
+def run_once():
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    output = subprocess.run([sys.executable, "-c", CHILD, repr(time.time())], env=env,
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    for line in output.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[7:])
+    raise RuntimeError(output.stderr[-2000:])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    snapshot = cache_path(SNAPSHOT_FILE)
+    cold, warm = [], []
+    for _ in range(runs):
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+        cold.append(run_once())
+        warm.append(run_once())  # Reads the snapshot the cold run just wrote
+    for name, results in (("cold start", cold), ("warm restart", warm)):
+        total, startup, construct = (statistics.median(r[part] for r in results) * 1000
+                                     for part in ("total", "startup", "construct"))
+        print(f"{name:>13}: first frame {total:6.0f} ms after launch "
+              f"({startup:5.0f} ms interpreter/imports/QApplication, {construct:5.0f} ms in pet setup)")
+
+
+if __name__ == "__main__":
+    main()
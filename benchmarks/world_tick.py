@@ -0,0 +1,45 @@
+"""
+World collision checks per second at 10, 100 and 1000 entities
+
+Each tick moves the pet, as a run step does, then runs the all-pairs
+overlap test plus the pet/food pair query.
+
+Usage: python -m benchmarks.world_tick
+"""
+import time
+
+import numpy as np
+
+from core import world as world_kinds
+from core.world import World
+
+
+def build(entity_count, seed=1):
+    rng = np.random.default_rng(seed)
+    world = World()
+    for i in range(entity_count):
+        kind = world_kinds.PET if i == 0 else world_kinds.FOOD
+        world.add(kind, rng.uniform(0, 4000), rng.uniform(0, 1000), 50, 50)
+    return world
+
+
+def run(entity_count, seconds=1.0):
+    world = build(entity_count)
+    ticks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        world.set_position(0, ticks % 4000, 500)
+        world.overlaps()
+        world.overlapping_pairs(world_kinds.PET, world_kinds.FOOD)
+        ticks += 1
+    return ticks / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'entities':>10}{'ticks/s':>12}")
+    for count in (10, 100, 1000):
+        print(f"{count:>10}{run(count):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
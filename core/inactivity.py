@@ -0,0 +1,116 @@
+"""
+Event-driven inactivity detection for the pet
+"""
+import time
+from PyQt5.QtCore import QObject, QEvent, QTimer, pyqtSignal
+
+# Events that count as the user doing something with the pet
+INPUT_EVENTS = frozenset({
+    QEvent.MouseButtonPress, QEvent.MouseButtonDblClick, QEvent.MouseMove,
+    QEvent.KeyPress, QEvent.Wheel, QEvent.TouchBegin,
+})
+
+
+class InactivityMonitor(QObject):
+    """Fires each idle stage once, from a single timer armed to the next deadline
+
+    Stages are (name, seconds, callback), e.g. sleep after 60 s and cry after
+    300 s. Input only records a timestamp; the timer re-checks when it fires
+    and re-arms for whatever time is left. After the last stage nothing runs
+    until the user comes back.
+
+    Only the pet's own windows are watched (see watch()), so other
+    applications' input never reaches the filter.
+    """
+
+    # Waking up from a stage touches the timer, so it is always handled on the monitor's thread
+    woke = pyqtSignal(bool)
+
+    def __init__(self, clock=time.monotonic, parent=None, timer_factory=QTimer):
+        super().__init__(parent)
+        self.clock = clock
+        self.stages = []       # (seconds, name, callback), sorted by seconds
+        self.stage = 0         # Number of stages already fired since the last activity
+        self.last_activity = clock()
+        self.on_resume = None  # Called when input arrives after a stage has fired
+        self.transitions = 0
+        self.running = False
+        self.woke.connect(self._wake)
+
+        self.timer = timer_factory(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_deadline)
+
+    def add_stage(self, name, seconds, callback):
+        self.stages.append((float(seconds), name, callback))
+        self.stages.sort(key=lambda stage: stage[0])
+
+    def set_stage_seconds(self, name, seconds):
+        """Change a stage's delay, e.g. after the settings were edited"""
+        self.stages = sorted(((float(seconds) if stage_name == name else delay, stage_name, callback)
+                              for delay, stage_name, callback in self.stages), key=lambda stage: stage[0])
+        if self.running:
+            self._arm()
+
+    def watch(self, widget):
+        """Count input delivered to widget (and children that pass it up) as activity"""
+        widget.installEventFilter(self)
+
+    def start(self):
+        self.running = True
+        self._arm()
+
+    def stop(self):
+        self.running = False
+        self.timer.stop()
+
+    def eventFilter(self, obj, event):
+        if self.running and event.type() in INPUT_EVENTS:
+            self.touch(resume=True)
+        return False
+
+    def idle_seconds(self):
+        return self.clock() - self.last_activity
+
+    def set_idle_seconds(self, seconds):
+        """Count the user as idle for this long already, e.g. carried over from the last session"""
+        self.last_activity = self.clock() - seconds
+        if self.running:
+            self._arm()
+
+    def current_stage(self):
+        """Name of the last stage fired, or None while active"""
+        return self.stages[self.stage - 1][1] if self.stage else None
+
+    def touch(self, resume=False):
+        """Record activity from any thread; only does more than store a timestamp when waking up"""
+        self.last_activity = self.clock()
+        if self.stage:
+            self.woke.emit(resume)  # Queued when called from a worker thread
+
+    def _wake(self, resume):
+        if not self.stage:
+            return  # Another touch already woke it
+        self.stage = 0
+        if resume and self.on_resume:
+            self.on_resume()
+        if self.running:
+            self._arm()
+
+    def _arm(self):
+        if self.stage >= len(self.stages):
+            self.timer.stop()
+            return
+        remaining = self.stages[self.stage][0] - self.idle_seconds()
+        self.timer.start(max(0, int(remaining * 1000) + 1))
+
+    def _on_deadline(self):
+        if self.stage >= len(self.stages):
+            return
+        seconds, name, callback = self.stages[self.stage]
+        if self.idle_seconds() >= seconds:
+            self.stage += 1
+            self.transitions += 1
+            print(f"💤 Idle for {seconds:.0f}s: {name}")
+            callback()
+        self._arm()
@@ -3,34 +3,68 @@ Main Milk Mocha Pet class - refactored and modular
 """
 import sys
 import time
+import itertools
 import threading
-from PyQt5.QtWidgets import QWidget, QLabel, QMenu, QApplication
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt, QTimer, QPoint, QPropertyAnimation, QEasingCurve, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QMenu, QApplication
+from PyQt5.QtGui import QPixmap, QKeySequence
+from PyQt5.QtCore import Qt, QPoint, pyqtSignal
 
 # Import our modular components
 from utils.config import ConfigManager
+from utils.clock import system_clock
+from utils.config_watcher import ConfigWatcher
+from utils.assets import assets
 from utils.user_activity import UserActivityDetector
+from utils.screen_geometry import ScreenGeometry
 from animation.gif_manager import GifManager
+from animation.frame_player import FramePlayer, frame_cache
+from animation.motion import MotionEngine
 from ui.speech_bubble import SpeechBubble
+from ui.speech_queue import SpeechQueue
 from ui.milk_bottle import MilkBottle
 from ui.system_tray import SystemTrayManager
 from core.pet_behavior import PetBehavior
+from core import world as world_kinds
+from core.world import World
+from core.snapshot import load_snapshot, save_snapshot, restore_state, prewarm_frames
 from utils.safe_gemini import SafeGeminiService
+from utils.analytics import AnalyticsStore
+from utils.quota import PRIORITY_USER
+from utils.profiler import SamplingProfiler
+from utils.stall_watchdog import StallWatchdog
+from utils.leak_detector import LeakDetector
 
 # Import settings window
 from ui.settings_window import SettingsWindow
 
+# Streaming text is pushed into the bubble at most this often
+STREAM_REPAINT_INTERVAL_MS = 100
+
+# Keys with a keyboard shortcut (see keyPressEvent); only these are recorded in analytics
+SHORTCUT_KEYS = frozenset({
+    Qt.Key_F9, Qt.Key_Space, Qt.Key_S, Qt.Key_P, Qt.Key_Y, Qt.Key_R,
+    Qt.Key_H, Qt.Key_T, Qt.Key_G, Qt.Key_Escape,
+})
+
 
 class MilkMochaPet(QWidget):
     """Main Milk Mocha Pet widget - now modular and organized"""
     
-    # Signal for thread-safe speech bubble display
-    show_speech_signal = pyqtSignal(str)
+    # Signal for thread-safe speech bubble display: (text, priority, tag, is placeholder)
+    show_speech_signal = pyqtSignal(str, int, int, bool)
+    
+    # Signal for thread-safe streaming text updates: (text so far, is final, tag, priority)
+    speech_stream_signal = pyqtSignal(str, bool, int, int)
     
-    def __init__(self):
+    # Signal for the laugh that goes with a story told from a worker thread
+    laugh_signal = pyqtSignal()
+    
+    def __init__(self, clock=None):
         super().__init__()
         
+        # Source of time, timers and randomness for every subsystem (a VirtualClock simulates)
+        self.clock = clock or system_clock
+        
         # Set up window properties for transparency
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
@@ -41,19 +75,47 @@ class MilkMochaPet(QWidget):
         
         # Connect signal to slot for thread-safe speech bubble handling
         self.show_speech_signal.connect(self._show_speech_bubble_safe)
+        self.speech_stream_signal.connect(self._on_speech_stream)
+        self.laugh_signal.connect(self.show_laugh)
         
         # Initialize core systems
         self.config = ConfigManager()
-        self.gif_manager = GifManager(self)
+        
+        # State and frames saved by the last session, for a warm start
+        snapshot = load_snapshot()
+        if snapshot:
+            snapshot.install_frames()
+        self.resumed = bool(snapshot and snapshot.is_fresh(self.clock.time()))
+        self.prewarm_timer = None
+        self.gif_manager = GifManager(self, self.config.settings.pet_size, self.config.settings.skin, self.clock)
+        self.screens = ScreenGeometry(self.clock.random)
+        
+        # Geometry of the pet and bottles lives in one vectorized world
+        self.world = World()
+        self.world_slot = self.world.add(world_kinds.PET, 0, 0, 0, 0, self)
+        self.world_timer = self.clock.timer()
+        self.world_timer.timeout.connect(self.update_world)
         
         # Initialize variables
         self.drag_start_position = None
         self.active_bottles = []
-        self.animation = None  # Track current position animation
+        self.motion = MotionEngine(clock=self.clock.perf_counter,
+                                   timer_factory=self.clock.timer)  # Moves the pet when it runs
         self.speech_bubble = None  # Track speech bubble
         self.bubble_timer = None  # Track bubble auto-hide timer
         self.bubble_follow_timer = None  # Track bubble following timer
         
+        # Decides which message the bubble shows next; tags tie answers to placeholders
+        self.speech_queue = SpeechQueue(self._display_speech, self._update_speech,
+                                        clock=self.clock.monotonic, timer_factory=self.clock.timer)
+        self.speech_tags = itertools.count(1)
+        
+        # Streaming (text, tag, priority, is final) waiting to be shown, flushed at a throttled rate
+        self.pending_stream = None
+        self.stream_flush_timer = self.clock.timer()
+        self.stream_flush_timer.setSingleShot(True)
+        self.stream_flush_timer.timeout.connect(self._flush_speech_stream)
+        
         # Drinking state management
         self.is_drinking = False
         self.drinking_timer = None
@@ -62,17 +124,37 @@ class MilkMochaPet(QWidget):
         self.is_angry = False
         self.angry_timer = None
         
+        # Usage events, written to SQLite in the background
+        settings = self.config.settings
+        self.analytics = AnalyticsStore(clock=self.clock.time) if settings.analytics_enabled else None
+        
         # Initialize services
-        self.gemini_service = SafeGeminiService()
-        self.user_activity = UserActivityDetector()
+        self.gemini_service = SafeGeminiService(
+            settings.message_batch_size,
+            settings.gemini_requests_per_minute,
+            settings.gemini_requests_per_day,
+            analytics=self.analytics,
+            clock=self.clock
+        )
+        self.user_activity = UserActivityDetector(self.clock)
         self.last_message_time = None
         
         # Initialize settings window reference
         self.settings_window = None
         
+        # Sampling profiler, only while profiling is switched on (F9 or the tray)
+        self.profiler = None
+        
+        # Watches for blocking work on the GUI thread
+        self.stall_watchdog = None
+        self._apply_stall_watchdog(settings)
+        
+        # Periodically counts live QObjects, threads and allocations
+        self.leak_detector = None
+        self._apply_leak_detector(settings)
+        
         # Create the main label for the pet
-        self.pet_label = QLabel(self)
-        self.pet_label.setAlignment(Qt.AlignCenter)
+        self.pet_label = FramePlayer(self)
         
         # Set up the pet animation using gif manager
         self.gif_manager.setup_pet_animation(self.pet_label)
@@ -91,26 +173,100 @@ class MilkMochaPet(QWidget):
         self.customContextMenuRequested.connect(self.show_context_menu)
         
         # Start bottle spawning if enabled
-        if self.config.get("auto_spawn", True):
-            self.spawn_timer = QTimer()
-            self.spawn_timer.timeout.connect(self.spawn_milk_bottle)
-            self.spawn_timer.start(self.config.get("spawn_interval", 10000))
+        self.spawn_timer = self.clock.timer()
+        self.spawn_timer.timeout.connect(self.spawn_milk_bottle)
+        self._apply_spawning(settings)
+        
+        # Apply settings changes live, from the dialog or from edits to the file
+        self.subscribe_to_settings()
+        self.config_watcher = ConfigWatcher(self.config)
         
-        # 3️⃣ Startup greeting sequence
-        QTimer.singleShot(1000, self.show_greeting)
+        # Reload animations whose files change on disk
+        assets.watch()
+        
+        # 3️⃣ Startup greeting sequence, or pick up where the last session stopped
+        if self.resumed:
+            restore_state(self, snapshot.state)
+        else:
+            self.clock.single_shot(1000, self.show_greeting)
         
         self.show()
+        
+        # Follow the pet across screens with different scale factors
+        self.gif_manager.watch_screen_changes()
+        
+        # Decode the rest of last session's animations in the background
+        if snapshot:
+            self.prewarm_timer = prewarm_frames(snapshot.state.get("warm_frames", []), self.clock)
     
     def apply_config_settings(self):
         """Apply settings from configuration"""
         # Set position from config
-        last_pos = self.config.get("last_position", [300, 300])
-        self.move(last_pos[0], last_pos[1])
-        
-        # Set transparency (with minimum limit)
-        transparency = self.config.get("transparency", 255)
-        transparency = max(100, min(255, transparency))  # Ensure range 100-255
-        self.setWindowOpacity(transparency / 255.0)
+        x, y = self.config.settings.last_position
+        self.move(*self.screens.clamp(x, y, self.width(), self.height()))
+        
+        # Set transparency (validated to 100-255)
+        self._apply_transparency(self.config.settings)
+    
+    def subscribe_to_settings(self):
+        """Reconfigure only the subsystems whose settings changed"""
+        config = self.config
+        config.subscribe(("auto_spawn", "spawn_interval"), self._apply_spawning)
+        config.subscribe(("transparency",), self._apply_transparency)
+        config.subscribe(("pet_size",), lambda settings: self.gif_manager.set_pet_size(settings.pet_size))
+        config.subscribe(("skin",), lambda settings: self.gif_manager.set_skin(settings.skin))
+        config.subscribe(("last_position",), self._apply_position)
+        config.subscribe(("message_batch_size",), self._apply_batch_size)
+        config.subscribe(("gemini_requests_per_minute", "gemini_requests_per_day"), self._apply_quota)
+        config.subscribe(("analytics_enabled",), self._apply_analytics)
+        config.subscribe(("stall_watchdog_enabled",), self._apply_stall_watchdog)
+        config.subscribe(("leak_detector_enabled",), self._apply_leak_detector)
+        self.behavior.subscribe_to_settings(config)
+        self.system_tray.subscribe_to_settings(config)
+    
+    def _apply_spawning(self, settings):
+        if settings.auto_spawn:
+            self.spawn_timer.start(settings.spawn_interval)
+        else:
+            self.spawn_timer.stop()
+    
+    def _apply_transparency(self, settings):
+        self.setWindowOpacity(settings.transparency / 255.0)
+    
+    def _apply_position(self, settings):
+        x, y = settings.last_position
+        if (x, y) != (self.x(), self.y()):
+            self.move(*self.screens.clamp(x, y, self.width(), self.height()))
+    
+    def _apply_batch_size(self, settings):
+        self.gemini_service.batch_cache.batch_size = settings.message_batch_size
+    
+    def _apply_quota(self, settings):
+        self.gemini_service.quota.set_limits(settings.gemini_requests_per_minute, settings.gemini_requests_per_day)
+    
+    def _apply_analytics(self, settings):
+        if settings.analytics_enabled and not self.analytics:
+            self.analytics = AnalyticsStore(clock=self.clock.time)
+        elif not settings.analytics_enabled and self.analytics:
+            self.analytics.close()
+            self.analytics = None
+        self.gemini_service.analytics = self.analytics
+    
+    def _apply_stall_watchdog(self, settings):
+        if settings.stall_watchdog_enabled and not self.stall_watchdog:
+            self.stall_watchdog = StallWatchdog(on_stall=lambda stall: self.record_event("stall", stall.culprit))
+            self.stall_watchdog.start()
+        elif not settings.stall_watchdog_enabled and self.stall_watchdog:
+            self.stall_watchdog.stop()
+            self.stall_watchdog = None
+    
+    def _apply_leak_detector(self, settings):
+        if settings.leak_detector_enabled and not self.leak_detector:
+            self.leak_detector = LeakDetector()
+            self.leak_detector.start()
+        elif not settings.leak_detector_enabled and self.leak_detector:
+            self.leak_detector.stop()
+            self.leak_detector = None
     
     # Animation methods that delegate to gif_manager
     def show_idle(self):
@@ -120,6 +276,7 @@ class MilkMochaPet(QWidget):
     def show_drinking(self):
         """Show drinking animation for 10 seconds and return to idle"""
         self._update_interaction_time()
+        self.record_event("feed")
         print("🥛 Pet is drinking for 10 seconds!")
         
         # Set drinking state
@@ -132,7 +289,7 @@ class MilkMochaPet(QWidget):
         if self.drinking_timer:
             self.drinking_timer.stop()
         
-        self.drinking_timer = QTimer()
+        self.drinking_timer = self.clock.timer()
         self.drinking_timer.timeout.connect(self._finish_drinking)
         self.drinking_timer.start(10000)  # 10 seconds
         
@@ -149,6 +306,7 @@ class MilkMochaPet(QWidget):
     def _handle_drinking_disturbance(self):
         """Handle disturbance while drinking - show angry for 1 minute"""
         print("😡 Pet was disturbed while drinking! Showing angry for 1 minute...")
+        self.record_event("disturbed")
         
         # Stop drinking immediately
         self.is_drinking = False
@@ -166,7 +324,7 @@ class MilkMochaPet(QWidget):
         if self.angry_timer:
             self.angry_timer.stop()
         
-        self.angry_timer = QTimer()
+        self.angry_timer = self.clock.timer()
         self.angry_timer.timeout.connect(self._finish_angry_state)
         self.angry_timer.start(60000)  # 1 minute
         
@@ -215,13 +373,12 @@ class MilkMochaPet(QWidget):
     def show_dancing(self):
         """Show dancing animation and return to idle"""
         self._update_interaction_time()
-        import random
-        dance_gif = random.choice(["dancing", "dancing2"])
+        dance_gif = self.clock.random.choice(["dancing", "dancing2"])
         self.gif_manager.switch_gif(dance_gif, self.pet_label, duration=8000)
     
-    def show_crying(self):
+    def show_crying(self, revert_to="idle"):
         """Show crying animation"""
-        self.gif_manager.switch_gif("crying", self.pet_label, duration=6000)
+        self.gif_manager.switch_gif("crying", self.pet_label, duration=6000, revert_to=revert_to)
     
     def show_doubtful(self):
         """Show doubtful animation and return to idle"""
@@ -260,65 +417,103 @@ class MilkMochaPet(QWidget):
         """Tell a short funny story"""
         self.behavior.tell_funny_story()
     
-    def show_speech_bubble(self, message):
+    def new_speech_tag(self):
+        """Tag for one request, so its answer replaces its placeholder message"""
+        return next(self.speech_tags)
+    
+    def show_speech_bubble(self, message, priority=PRIORITY_USER, tag=0, placeholder=False):
         """Thread-safe entry point for displaying speech bubble"""
         print(f"💬 show_speech_bubble called with: {message}")
         
         # Always use signal to ensure we're on the main thread
-        self.show_speech_signal.emit(message)
+        self.show_speech_signal.emit(message, priority, tag, placeholder)
+    
+    def _show_speech_bubble_safe(self, message, priority=PRIORITY_USER, tag=0, placeholder=False):
+        """Queue a message for the speech bubble - MAIN THREAD ONLY"""
+        self.speech_queue.post(message, priority, tag, placeholder)
     
-    def _show_speech_bubble_safe(self, message):
-        """Display speech bubble with message above Milk Mocha - MAIN THREAD ONLY"""
-        print(f"💬 _show_speech_bubble_safe called with: {message}")
-        print(f"💬 Creating speech bubble: {message}")
+    def _display_speech(self, message):
+        """Put a new message up, reusing the visible bubble if there is one - MAIN THREAD ONLY"""
+        print(f"💬 Showing speech bubble: {message}")
+        self.record_event("message")
         
-        # Hide existing speech bubble if any
-        if self.speech_bubble:
-            try:
-                print("   Hiding existing speech bubble...")
-                # Stop any existing bubble timer
-                if hasattr(self, 'bubble_timer') and self.bubble_timer:
-                    self.bubble_timer.stop()
-                    self.bubble_timer = None
-                # Stop bubble following timer
-                if hasattr(self, 'bubble_follow_timer') and self.bubble_follow_timer:
-                    self.bubble_follow_timer.stop()
-                    self.bubble_follow_timer = None
-                self.speech_bubble.hide()
-                self.speech_bubble.deleteLater()
-            except RuntimeError:
-                # Object already deleted
-                print("   Previous speech bubble already deleted")
-            finally:
-                self.speech_bubble = None
+        try:
+            if self.speech_bubble and not self.speech_bubble.isHidden():
+                self._update_speech(message)
+                return
+        except RuntimeError:
+            # Object already deleted
+            self.speech_bubble = None
         
         # Create new speech bubble with this pet as parent for communication
         self.speech_bubble = SpeechBubble(message, self)
-        print(f"   Speech bubble created successfully")
+        self._watch_input(self.speech_bubble)
         
         # Position the bubble initially
         self.position_speech_bubble()
-        print(f"   Speech bubble positioned")
         
         self.speech_bubble.show()
         self.speech_bubble.raise_()  # Bring to front
-        print(f"   Speech bubble shown and raised")
         
         # Start bubble following timer (update position every 50ms for smooth following)
-        self.bubble_follow_timer = QTimer()
+        self.bubble_follow_timer = self.clock.timer()
         self.bubble_follow_timer.timeout.connect(self.position_speech_bubble)
         self.bubble_follow_timer.start(50)  # 20 FPS for smooth following
-        print(f"   Following timer started")
         
         # Auto-hide after 15 seconds
-        self.bubble_timer = QTimer()
+        self.bubble_timer = self.clock.timer()
         self.bubble_timer.setSingleShot(True)
         self.bubble_timer.timeout.connect(self.hide_speech_bubble)
         self.bubble_timer.start(15000)
-        print(f"   Auto-hide timer started")
         
         print("✅ Speech bubble displayed and following enabled!")
     
+    def _update_speech(self, message):
+        """Change the text of the visible bubble in place - MAIN THREAD ONLY"""
+        try:
+            if self.speech_bubble and not self.speech_bubble.isHidden():
+                self.speech_bubble.set_message(message)
+                self.position_speech_bubble()
+                # Keep the bubble up for the full time after the latest text
+                if self.bubble_timer:
+                    self.bubble_timer.start(15000)
+        except RuntimeError:
+            self.speech_bubble = None
+    
+    def show_speech_stream(self, text, final=False, tag=0, priority=PRIORITY_USER):
+        """Thread-safe entry point for a streaming message; text is everything so far"""
+        self.speech_stream_signal.emit(text, final, tag, priority)
+    
+    def _on_speech_stream(self, text, final, tag=0, priority=PRIORITY_USER):
+        """Queue streamed text and flush it at a throttled rate - MAIN THREAD ONLY"""
+        if self.pending_stream and self.pending_stream[1] != tag:
+            # A different request started streaming: don't lose the other one's text
+            self._flush_speech_stream()
+        self.pending_stream = (text, tag, priority, final)
+        if final:
+            self.stream_flush_timer.stop()
+            self._flush_speech_stream()
+        elif not self.stream_flush_timer.isActive():
+            self.stream_flush_timer.start(STREAM_REPAINT_INTERVAL_MS)
+    
+    def _flush_speech_stream(self):
+        """Pass the latest streamed text to the queue - MAIN THREAD ONLY"""
+        pending, self.pending_stream = self.pending_stream, None
+        if pending and pending[0]:
+            text, tag, priority, final = pending
+            self.speech_queue.post(text, priority, tag, streaming=not final)
+    
+    def record_event(self, kind, detail=""):
+        """Log a usage event for analytics (no-op when disabled)"""
+        if self.analytics:
+            self.analytics.record(kind, detail)
+    
+    def _watch_input(self, widget):
+        """Count input on one of the pet's windows as activity"""
+        behavior = getattr(self, 'behavior', None)
+        if behavior:
+            behavior.inactivity.watch(widget)
+    
     def _update_interaction_time(self):
         """Safely update interaction time"""
         if hasattr(self, 'behavior') and self.behavior:
@@ -330,24 +525,24 @@ class MilkMochaPet(QWidget):
             if not self.speech_bubble or self.speech_bubble.isHidden():
                 return
             
-            # Get screen dimensions
-            screen = QApplication.primaryScreen().availableGeometry()
-            
-            # Calculate bubble position - above and centered on pet
+            # Get bounds of the screen the pet is on
             pet_center_x = self.x() + self.width() // 2
             pet_top_y = self.y()
+            screen_top = self.screens.bounds_at(pet_center_x, self.y() + self.height() // 2)[1]
             
+            # Calculate bubble position - above and centered on pet
             bubble_x = pet_center_x - self.speech_bubble.width() // 2
             bubble_y = pet_top_y - self.speech_bubble.height() - 20  # 20px gap above pet
             
-            # Keep bubble within screen bounds with safe margins
-            bubble_x = max(10, min(bubble_x, screen.width() - self.speech_bubble.width() - 10))
-            bubble_y = max(10, min(bubble_y, screen.height() - self.speech_bubble.height() - 10))
-            
             # If bubble would be above screen, put it below pet instead
-            if bubble_y < 10:
+            if bubble_y < screen_top + 10:
                 bubble_y = self.y() + self.height() + 20
             
+            # Keep bubble within the pet's screen with safe margins
+            bubble_x, bubble_y = self.screens.clamp(
+                bubble_x, bubble_y, self.speech_bubble.width(), self.speech_bubble.height(), margin=10
+            )
+            
             # Move bubble to new position
             self.speech_bubble.move(bubble_x, bubble_y)
             
@@ -401,6 +596,9 @@ class MilkMochaPet(QWidget):
                 self.speech_bubble = None
             except:
                 pass
+        
+        # Anything that was waiting gets its turn now
+        self.speech_queue.on_hidden()
     
     def feed_pet(self):
         """Switch to drinking animation, then return to idle"""
@@ -411,7 +609,10 @@ class MilkMochaPet(QWidget):
         if not self.active_bottles:
             print("🍼 Spawning milk bottle!")  # Debug message
             bottle = MilkBottle(self)
+            self._watch_input(bottle)
             self.active_bottles.append(bottle)
+            if not self.world_timer.isActive():
+                self.world_timer.start(100)  # Check collisions every 100ms
     
     def remove_bottle(self, bottle):
         """Remove bottle from active list"""
@@ -420,10 +621,40 @@ class MilkMochaPet(QWidget):
     
     def get_position_bbox(self):
         """Get bounding box for collision detection"""
-        return (self.x(), self.y(), self.x() + self.width(), self.y() + self.height())
+        return self.world.bbox(self.world_slot)
+    
+    def moveEvent(self, event):
+        """Mirror the widget position into the world model"""
+        self.world.set_position(self.world_slot, self.x(), self.y())
+        super().moveEvent(event)
+    
+    def resizeEvent(self, event):
+        """Mirror the widget size into the world model"""
+        self.world.set_size(self.world_slot, self.width(), self.height())
+        super().resizeEvent(event)
+    
+    def update_world(self):
+        """Feed the pet any bottle it touches"""
+        for _, food_slot in self.world.overlapping_pairs(world_kinds.PET, world_kinds.FOOD):
+            bottle = self.world.widgets[food_slot]
+            if bottle is not None:
+                bottle.collide_with_pet()
+        
+        # Nothing left to collide with - stop checking until something spawns
+        if not self.world.count(world_kinds.FOOD):
+            self.world_timer.stop()
     
     def keyPressEvent(self, event):
         """Handle keyboard events"""
+        # Shortcut usage only; other typing is never recorded
+        if event.key() in SHORTCUT_KEYS:
+            self.record_event("key", QKeySequence(event.key()).toString())
+        
+        # Diagnostics work whatever mood the pet is in
+        if event.key() == Qt.Key_F9:
+            self.toggle_profiling()
+            return
+        
         # Check if pet is angry - completely block all keyboard interactions
         if self.is_angry:
             print("😡 Pet is angry! Cannot use keyboard shortcuts for 1 minute!")
@@ -462,6 +693,19 @@ class MilkMochaPet(QWidget):
             self.quit_application()
         super().keyPressEvent(event)
     
+    def toggle_profiling(self):
+        """Start sampling every thread's stacks, or stop and write the profile"""
+        if self.profiler is None:
+            self.profiler = SamplingProfiler()
+            self.profiler.start()
+            self.show_speech_bubble("📈 Profiling on. Press F9 again to save the profile.")
+        else:
+            collapsed_path, _ = self.profiler.stop()
+            self.profiler = None
+            self.show_speech_bubble(f"📈 Profile saved to {collapsed_path}")
+        if hasattr(self, 'system_tray'):
+            self.system_tray.apply_profiling(self.profiler is not None)
+    
     def show_context_menu(self, position):
         """Show right-click context menu"""
         context_menu = QMenu(self)
@@ -505,16 +749,17 @@ class MilkMochaPet(QWidget):
         """Open settings window"""
         if self.settings_window is None or not self.settings_window.isVisible():
             self.settings_window = SettingsWindow()
-            self.settings_window.show_with_config(self.config)
+            self.settings_window.show_with_config(self.config, self.gemini_service.quota)
         else:
             self.settings_window.raise_()
             self.settings_window.activateWindow()
     
     def restart_app(self):
-        """Restart the application"""
+        """Restart the application, resuming this session in the new process"""
         import subprocess
+        save_snapshot(self)
         subprocess.Popen([sys.executable] + sys.argv)
-        QApplication.quit()
+        self.quit_application(snapshot=False)
     
     def mousePressEvent(self, event):
         """Handle mouse press for dragging and interactions"""
@@ -580,10 +825,8 @@ class MilkMochaPet(QWidget):
             self._update_interaction_time()
             new_pos = event.globalPos() - self.drag_start_position
             
-            # Keep within screen bounds
-            screen = QApplication.primaryScreen().availableGeometry()
-            new_x = max(0, min(new_pos.x(), screen.width() - self.width()))
-            new_y = max(0, min(new_pos.y(), screen.height() - self.height()))
+            # Keep within the bounds of whichever screen the pet is over
+            new_x, new_y = self.screens.clamp(new_pos.x(), new_pos.y(), self.width(), self.height())
             
             self.move(new_x, new_y)
     
@@ -611,16 +854,21 @@ class MilkMochaPet(QWidget):
             self.quit_application()
             super().closeEvent(event)
     
-    def quit_application(self):
+    def quit_application(self, snapshot=True):
         """Completely quit the application"""
         print("🚪 Exiting Milk Mocha Pet...")
         
+        # Remember moods, timers and warmed frames for the next launch
+        if snapshot:
+            save_snapshot(self)
+        
         # Hide system tray icon
         if hasattr(self, 'system_tray'):
             self.system_tray.hide()
         
         # Save current state before quitting
         self.config.update_position(self.x(), self.y())
+        self.gemini_service.handler.message_store.flush()
         
         # Close all active bottles
         for bottle in self.active_bottles[:]:
@@ -636,25 +884,60 @@ class MilkMochaPet(QWidget):
         if hasattr(self, 'spawn_timer'):
             self.spawn_timer.stop()
         
+        if hasattr(self, 'config_watcher'):
+            self.config_watcher.stop()
+        assets.stop_watching()
+        
+        if hasattr(self, 'world_timer'):
+            self.world_timer.stop()
+        
         if hasattr(self, 'bubble_timer') and self.bubble_timer:
             self.bubble_timer.stop()
         
         if hasattr(self, 'bubble_follow_timer') and self.bubble_follow_timer:
             self.bubble_follow_timer.stop()
         
-        # Stop animations
-        if hasattr(self, 'animation') and self.animation:
-            try:
-                self.animation.finished.disconnect()
-                self.animation.stop()
-            except:
-                pass
+        if hasattr(self, 'stream_flush_timer'):
+            self.stream_flush_timer.stop()
+        
+        if self.prewarm_timer:
+            self.prewarm_timer.stop()
+        
+        # Stop movement
+        if hasattr(self, 'motion'):
+            self.motion.stop()
+        
+        # Keep a profile that was still recording
+        if self.profiler:
+            self.profiler.stop()
+        
+        # Say where the GUI thread got stuck, if it did
+        if self.stall_watchdog:
+            self.stall_watchdog.stop()
+            report_path = self.stall_watchdog.write_report()
+            if report_path:
+                print(f"🐢 Stall report: {report_path}")
+        
+        # Show what grew over the session
+        if self.leak_detector:
+            self.leak_detector.sample()
+            self.leak_detector.stop()
+            print(self.leak_detector.report())
+        
+        # Write any buffered usage events
+        if self.analytics:
+            self.analytics.close()
+        
+        # Let animations still decoding in the background finish
+        frame_cache.shutdown()
         
         # Close settings window if open
         if self.settings_window and self.settings_window.isVisible():
             self.settings_window.close()
         
         # Hide speech bubble if showing
+        if hasattr(self, 'speech_queue'):
+            self.speech_queue.stop()
         if self.speech_bubble:
             try:
                 self.speech_bubble.hide()
@@ -1,11 +1,12 @@
 """
 Pet behavior and interaction handlers
 """
-import time
-import random
-import threading
-from PyQt5.QtCore import QTimer, QPropertyAnimation, QPoint, QEasingCurve
-from PyQt5.QtWidgets import QApplication
+from core.inactivity import InactivityMonitor
+from utils.quota import PRIORITY_USER, PRIORITY_STARTUP, PRIORITY_BACKGROUND
+
+# Running speed in pixels per second, and the speed at which running.gif plays at 100%
+RUN_SPEED = 400.0
+RUN_GIF_REFERENCE_SPEED = 400.0
 
 
 class PetBehavior:
@@ -13,14 +14,28 @@ class PetBehavior:
     
     def __init__(self, pet_instance):
         self.pet = pet_instance
-        self.last_interaction_time = time.time()
+        self.clock = pet_instance.clock  # Time, timers, randomness and worker threads
+        self.last_interaction_time = self.clock.time()
         self.click_count = 0
+        self.acting_alone = False  # The pet's own runs and antics are not user activity
         
         # Initialize timers
         self.running_timer = None
         self.action_timer = None
         self.speaking_check_timer = None
         
+        # Sleep, then cry, after the user has left the pet alone for a while
+        self.inactivity = InactivityMonitor(self.clock.monotonic, timer_factory=self.clock.timer)
+        settings = self.pet.config.settings
+        self.inactivity.add_stage("sleeping", settings.sleep_after_seconds, self._on_idle_sleep)
+        self.inactivity.add_stage("crying", settings.sad_after_seconds, self._on_idle_sad)
+        self.inactivity.on_resume = self._on_idle_resume
+        
+        # Motion body that carries the pet when it runs
+        self.run_body = self.pet.motion.add_body(
+            self.pet.x(), self.pet.y(), on_move=self._on_run_step, on_arrive=self._on_run_arrived
+        )
+        
         # Initialize behavior systems
         self.start_behavior_timers()
     
@@ -33,18 +48,34 @@ class PetBehavior:
         self.start_random_actions()
         
         # 🤖 Start enhanced Gemini speaking system
-        if self.pet.config.get("milk_mocha_speaking", True):
+        if self.pet.config.settings.milk_mocha_speaking:
             self.start_smart_speaking_system()
         
-        # 5️⃣ Start inactivity checking
-        self.check_inactivity()
+        # 5️⃣ Start inactivity detection
+        self.inactivity.watch(self.pet)
+        self.inactivity.start()
     
     def start_random_running(self):
         """Start the random running timer"""
-        self.running_timer = QTimer()
-        self.running_timer.timeout.connect(self.run_to_random_location)
+        self.running_timer = self.clock.timer()
+        self.running_timer.timeout.connect(self.run_on_its_own)
         self.running_timer.start(30000)  # Run every 30 seconds
     
+    def run_on_its_own(self):
+        """Random run from the timer; a sleeping pet stays where it is"""
+        if self.inactivity.current_stage():
+            print("💤 Pet is asleep - skipping random run")
+            return
+        self._act_alone(self.run_to_random_location)
+    
+    def _act_alone(self, action):
+        """Run an action the pet chose itself without resetting the inactivity stages"""
+        self.acting_alone = True
+        try:
+            action()
+        finally:
+            self.acting_alone = False
+    
     def run_to_random_location(self):
         """Run to a random location on screen"""
         # Don't run if pet is drinking or angry
@@ -56,12 +87,8 @@ class PetBehavior:
             print("😡 Pet is angry - skipping random run")
             return
         
-        # Get screen dimensions
-        screen = QApplication.primaryScreen().availableGeometry()
-        
-        # Calculate random position (keeping pet within screen bounds)
-        random_x = random.randint(0, screen.width() - self.pet.width())
-        random_y = random.randint(0, screen.height() - self.pet.height())
+        # Calculate random position on any screen (keeping pet within its bounds)
+        random_x, random_y = self.pet.screens.random_position(self.pet.width(), self.pet.height())
         
         # Show running animation
         self.show_running(random_x, random_y)
@@ -73,32 +100,29 @@ class PetBehavior:
         # Show running GIF (will loop until we stop it)
         self.pet.gif_manager.switch_gif("running", self.pet.pet_label)
         
-        # If target coordinates provided, animate smoothly to target
+        # If target coordinates provided, run to target at a constant speed
         if target_x is not None and target_y is not None:
-            # Stop and cleanup any existing animation
-            if hasattr(self.pet, 'animation') and self.pet.animation:
-                try:
-                    self.pet.animation.finished.disconnect()
-                    self.pet.animation.stop()
-                except:
-                    pass  # Ignore if already disconnected
-            
-            # Create smooth animation to target position
-            self.pet.animation = QPropertyAnimation(self.pet, b"pos")
-            self.pet.animation.setDuration(2000)  # 2 seconds for smooth movement
-            self.pet.animation.setStartValue(QPoint(self.pet.x(), self.pet.y()))
-            self.pet.animation.setEndValue(QPoint(target_x, target_y))
-            self.pet.animation.setEasingCurve(QEasingCurve.OutQuad)  # Smooth deceleration
-            
-            # When animation finishes, stop running and return to idle
-            self.pet.animation.finished.connect(self.finish_running)
-            
-            # Start the smooth animation
-            self.pet.animation.start()
-            print(f"🏃 Pet running smoothly to ({target_x}, {target_y})")
+            # Start from where the pet is now unless already mid-run (then just retarget)
+            if not self.run_body.moving:
+                self.run_body.place(self.pet.x(), self.pet.y())
+            self.pet.motion.move_to(self.run_body, target_x, target_y, RUN_SPEED)
+            print(f"🏃 Pet running to ({target_x}, {target_y}), "
+                  f"~{self.run_body.estimated_duration():.1f}s")
         else:
             # If no target, just show running for a short time
-            QTimer.singleShot(3000, self.finish_running)
+            self.clock.single_shot(3000, self.finish_running)
+    
+    def _on_run_step(self, body):
+        """Mirror the motion body onto the pet and match leg speed to velocity"""
+        self.pet.move(round(body.x), round(body.y))
+        # Another animation may have taken over mid-run (a click, a bottle); it keeps its own pace
+        if self.pet.gif_manager.current_key == "running":
+            percent = body.velocity * 100 / RUN_GIF_REFERENCE_SPEED
+            self.pet.pet_label.set_speed(max(40, min(200, percent)))
+    
+    def _on_run_arrived(self, body):
+        """Stop running; the next animation starts at normal speed"""
+        self.finish_running()
     
     def finish_running(self):
         """Finish running animation and return to idle"""
@@ -112,10 +136,26 @@ class PetBehavior:
     
     def start_random_actions(self):
         """Start the random action timer"""
-        if self.pet.config.get("auto_spawn", True):  # Only if auto_spawn is enabled
-            self.action_timer = QTimer()
-            self.action_timer.timeout.connect(self.perform_random_action)
-            self.action_timer.start(45000)  # Random action every 45 seconds
+        self.action_timer = self.clock.timer()
+        self.action_timer.timeout.connect(self.perform_random_action)
+        self.configure_random_actions()
+    
+    def subscribe_to_settings(self, config):
+        """Follow the settings this behavior depends on"""
+        config.subscribe(("auto_spawn",), self.configure_random_actions)
+        config.subscribe(("milk_mocha_speaking",), self.configure_speaking)
+        config.subscribe(("sleep_after_seconds",),
+                         lambda settings: self.inactivity.set_stage_seconds("sleeping", settings.sleep_after_seconds))
+        config.subscribe(("sad_after_seconds",),
+                         lambda settings: self.inactivity.set_stage_seconds("crying", settings.sad_after_seconds))
+    
+    def configure_random_actions(self, settings=None):
+        """Run random actions only while auto_spawn is enabled"""
+        if (settings or self.pet.config.settings).auto_spawn:
+            if not self.action_timer.isActive():
+                self.action_timer.start(45000)  # Random action every 45 seconds
+        else:
+            self.action_timer.stop()
     
     def perform_random_action(self):
         """Perform a random action animation"""
@@ -129,7 +169,7 @@ class PetBehavior:
             return
             
         # Only perform random actions if currently idle
-        if self.pet.gif_manager.current_gif == self.pet.gif_manager.gif_paths["idle"]:
+        if self.pet.gif_manager.current_gif is self.pet.gif_manager.gifs["idle"]:
             # Use pet's animation methods for random actions
             random_actions = [
                 self.pet.show_dancing,
@@ -141,34 +181,48 @@ class PetBehavior:
                 self.pet.show_says_yes,
                 self.pet.show_doubtful
             ]
-            action = random.choice(random_actions)
-            action()
+            action = self.clock.random.choice(random_actions)
+            self._act_alone(action)
             print(f"🎭 Pet performed random action: {action.__name__}")
     
     def start_smart_speaking_system(self):
         """Start the enhanced speaking system with user activity detection"""
-        speaking_interval = self.pet.config.get("speaking_interval", 15) * 60  # Convert to seconds
+        speaking_interval = self.pet.config.settings.speaking_interval_seconds
         print(f"🤖 Starting smart speaking system (interval: {speaking_interval//60} minutes)")
         
         # Check for speaking opportunities every 2 minutes
-        self.speaking_check_timer = QTimer()
+        self.speaking_check_timer = self.clock.timer()
         self.speaking_check_timer.timeout.connect(self.check_speaking_opportunity)
         self.speaking_check_timer.start(120000)  # Check every 2 minutes
         
-        # Also schedule a greeting message for startup
-        QTimer.singleShot(5000, self.send_startup_greeting)  # 5 seconds after startup
+        # Also schedule a greeting message for startup (not when resuming after a restart)
+        if not getattr(self.pet, 'resumed', False):
+            self.clock.single_shot(5000, self.send_startup_greeting)  # 5 seconds after startup
+    
+    def configure_speaking(self, settings):
+        """Start or stop the speaking checks after the setting changed"""
+        if not settings.milk_mocha_speaking:
+            if self.speaking_check_timer:
+                self.speaking_check_timer.stop()
+        elif self.speaking_check_timer is None:
+            self.speaking_check_timer = self.clock.timer()
+            self.speaking_check_timer.timeout.connect(self.check_speaking_opportunity)
+            self.speaking_check_timer.start(120000)
+        elif not self.speaking_check_timer.isActive():
+            self.speaking_check_timer.start(120000)
     
     def check_speaking_opportunity(self):
         """Check if it's a good time to speak based on user activity"""
-        speaking_enabled = self.pet.config.get("milk_mocha_speaking", True)
-        speaking_interval = self.pet.config.get("speaking_interval", 15) * 60
+        settings = self.pet.config.settings
+        speaking_enabled = settings.milk_mocha_speaking
+        speaking_interval = settings.speaking_interval_seconds
         
         if not speaking_enabled:
             print("🔇 Speaking disabled")
             return
         
         # Check if enough time has passed since last message
-        current_time = time.time()
+        current_time = self.clock.time()
         if self.pet.last_message_time and (current_time - self.pet.last_message_time) < speaking_interval:
             print(f"⏰ Too soon - last message was {current_time - self.pet.last_message_time:.1f} seconds ago")
             return
@@ -176,14 +230,14 @@ class PetBehavior:
         print("✅ Time for a message!")
         # Check if user should receive a message
         if self.pet.user_activity.should_show_message(self.pet.last_message_time, speaking_interval):
-            self.request_contextual_message()
+            self.request_contextual_message(priority=PRIORITY_BACKGROUND)
         else:
             print("🚫 User activity detector says not a good time")
     
     def send_startup_greeting(self):
         """Send a contextual greeting message on startup"""
         print("🚀 send_startup_greeting called")
-        speaking_enabled = self.pet.config.get("milk_mocha_speaking", True)
+        speaking_enabled = self.pet.config.settings.milk_mocha_speaking
         if not speaking_enabled:
             print("🔇 Speaking disabled, skipping startup greeting")
             return
@@ -195,26 +249,29 @@ class PetBehavior:
         def get_greeting():
             print("🔄 Getting startup greeting in thread...")
             try:
-                message = self.pet.gemini_service.get_message_with_timeout(context)
+                message = self.pet.gemini_service.get_message_with_timeout(context, priority=PRIORITY_STARTUP)
                 print(f"✅ Got startup greeting: {message}")
-                self.pet.show_speech_bubble(message)
-                self.pet.last_message_time = time.time()
+                self.pet.show_speech_bubble(message, PRIORITY_STARTUP)
+                self.pet.last_message_time = self.clock.time()
                 print("✅ Startup greeting displayed immediately")
             except Exception as e:
                 print(f"❌ Error getting startup greeting: {e}")
                 import traceback
                 traceback.print_exc()
                 # Use simple fallback for startup
-                self.pet.show_speech_bubble("🥛 Hello! Milk Mocha is ready to chat! Press G, B, or F for messages! ✨")
+                self.pet.show_speech_bubble("🥛 Hello! Milk Mocha is ready to chat! Press G, B, or F for messages! ✨",
+                                            PRIORITY_STARTUP)
         
-        thread = threading.Thread(target=get_greeting)
-        thread.daemon = True
-        thread.start()
+        self.clock.run_in_background(get_greeting)
         print("🧵 Startup greeting thread started")
     
-    def request_contextual_message(self):
+    def request_contextual_message(self, priority=PRIORITY_USER):
         """Request a contextual message based on user activity"""
         print("🎯 request_contextual_message called")
+        tag = self.pet.new_speech_tag()
+        
+        def show(text, final=False):
+            self.pet.show_speech_stream(text, final, tag, priority)
         
         def get_contextual_message():
             print("🔄 Getting contextual message in thread...")
@@ -223,13 +280,19 @@ class PetBehavior:
                 activity_context = self.pet.user_activity.get_contextual_activity()
                 print(f"🎯 Requesting message for context: {activity_context}")
                 
-                # Use the safe timeout method
-                message = self.pet.gemini_service.get_contextual_message(activity_context)
+                if self.pet.config.settings.stream_responses:
+                    # Grow the bubble as chunks arrive
+                    message = self.pet.gemini_service.stream_contextual_message(
+                        activity_context, on_text=show, priority=priority
+                    )
+                    show(message, final=True)
+                else:
+                    # Use the safe timeout method
+                    message = self.pet.gemini_service.get_contextual_message(activity_context, priority)
+                    self.pet.show_speech_bubble(message, priority, tag)
                 print(f"✅ Got contextual message: {message}")
-                
-                # Show message immediately
-                self.pet.show_speech_bubble(message)
-                self.pet.last_message_time = time.time()
+
+                self.pet.last_message_time = self.clock.time()
                 print("✅ Contextual message displayed immediately")
                 
             except Exception as e:
@@ -239,31 +302,40 @@ class PetBehavior:
                 # Last resort fallback
                 try:
                     fallback = "🤖 Milk Mocha's AI is being shy! Press F for instant messages! 😊"
-                    self.pet.show_speech_bubble(fallback)
+                    self.pet.show_speech_bubble(fallback, priority, tag)
                     print("✅ Emergency fallback displayed")
                 except Exception as e2:
                     print(f"❌ Critical error: {e2}")
         
         # Show immediate feedback that something is happening
-        self.pet.show_speech_bubble("🔄 Asking Gemini for a message... This might take a moment! 🤖")
+        self.pet.show_speech_bubble("🔄 Asking Gemini for a message... This might take a moment! 🤖",
+                                    priority, tag, placeholder=True)
         
-        # Run in daemon thread to prevent blocking
-        thread = threading.Thread(target=get_contextual_message)
-        thread.daemon = True
-        thread.start()
+        # Run in the background to prevent blocking
+        self.clock.run_in_background(get_contextual_message)
         print("🧵 Contextual message thread started")
     
     def request_custom_message(self, custom_prompt: str, context: str = "random"):
         """Request a custom message with specific prompt"""
         print(f"🎨 request_custom_message called with prompt: {custom_prompt}")
+        tag = self.pet.new_speech_tag()
+        
+        def show(text, final=False):
+            self.pet.show_speech_stream(text, final, tag)
         
         def get_custom_message():
             print("🔄 Getting custom message in thread...")
             try:
-                message = self.pet.gemini_service.get_message_with_timeout(context, custom_prompt)
+                if self.pet.config.settings.stream_responses:
+                    message = self.pet.gemini_service.stream_message_with_timeout(
+                        context, custom_prompt, on_text=show
+                    )
+                    show(message, final=True)
+                else:
+                    message = self.pet.gemini_service.get_message_with_timeout(context, custom_prompt)
+                    self.pet.show_speech_bubble(message, tag=tag)
                 print(f"✅ Got custom message: {message}")
-                self.pet.show_speech_bubble(message)
-                self.pet.last_message_time = time.time()
+                self.pet.last_message_time = self.clock.time()
                 print("✅ Custom message displayed immediately")
             except Exception as e:
                 print(f"❌ Error getting custom message: {e}")
@@ -271,17 +343,15 @@ class PetBehavior:
                 traceback.print_exc()
                 try:
                     fallback = "🤖 Milk Mocha's creativity is blocked! Try the F key for instant quotes! 🎨"
-                    self.pet.show_speech_bubble(fallback)
+                    self.pet.show_speech_bubble(fallback, tag=tag)
                     print("✅ Custom fallback displayed")
                 except Exception as e2:
                     print(f"❌ Custom fallback failed: {e2}")
         
         # Show immediate feedback
-        self.pet.show_speech_bubble("🎨 Creating a custom message... Hold on! ✨")
+        self.pet.show_speech_bubble("🎨 Creating a custom message... Hold on! ✨", tag=tag, placeholder=True)
         
-        thread = threading.Thread(target=get_custom_message)
-        thread.daemon = True
-        thread.start()
+        self.clock.run_in_background(get_custom_message)
         print("🧵 Custom message thread started")
     
     def tell_funny_story(self):
@@ -291,6 +361,10 @@ class PetBehavior:
         # Show thinking animation while generating story
         self.pet.show_watching_mobile()  # Show thinking animation
         self.update_interaction_time()
+        tag = self.pet.new_speech_tag()
+        
+        def show(text, final=False):
+            self.pet.show_speech_stream(text, final, tag)
         
         def get_funny_story():
             print("� Getting funny story from Gemini in thread...")
@@ -303,15 +377,23 @@ class PetBehavior:
                 )
                 
                 # Use the safe timeout method to get a story
-                story = self.pet.gemini_service.get_message_with_timeout("random", story_prompt)
+                if self.pet.config.settings.stream_responses:
+                    story = self.pet.gemini_service.stream_message_with_timeout(
+                        "random", story_prompt, on_text=show
+                    )
+                else:
+                    story = self.pet.gemini_service.get_message_with_timeout("random", story_prompt)
                 print(f"✅ Got funny story: {story[:50]}...")
                 
                 # Switch to laugh animation when telling the story
-                self.pet.show_laugh()
+                self.pet.laugh_signal.emit()
                 
                 # Show the story in a speech bubble
-                self.pet.show_speech_bubble(story)
-                self.pet.last_message_time = time.time()
+                if self.pet.config.settings.stream_responses:
+                    show(story, final=True)
+                else:
+                    self.pet.show_speech_bubble(story, tag=tag)
+                self.pet.last_message_time = self.clock.time()
                 print("✅ Funny story displayed with laugh animation")
                 
             except Exception as e:
@@ -320,45 +402,50 @@ class PetBehavior:
                 traceback.print_exc()
                 
                 # Fallback to a pre-written story if Gemini fails
-                fallback_stories = [
-                    "📚 I tried to catch my cursor tail for 3 hours... I don't have one! 😅",
-                    "� Made friends with antivirus software, but it called me 'suspicious'! 🛡️",
-                    "📚 Spent all night dancing, your CPU hit 100% usage! 💃",
-                    "� Tried to eat a pixel cookie, but it was just a cursor! 🍪",
-                    "📚 Had an argument with Siri about who's cuter. I won! 😎"
-                ]
-                
-                fallback_story = random.choice(fallback_stories)
+                fallback_story = self.pet.gemini_service.handler.get_fallback_message("story")
                 
                 # Switch to laugh animation even for fallback stories
-                self.pet.show_laugh()
+                self.pet.laugh_signal.emit()
                 
-                self.pet.show_speech_bubble(fallback_story)
+                self.pet.show_speech_bubble(fallback_story, tag=tag)
                 print(f"✅ Fallback story displayed with laugh animation: {fallback_story[:50]}...")
         
         # Show immediate feedback that story is being generated
-        self.pet.show_speech_bubble("📚 Let me think of a funny story for you... 🤔✨")
+        self.pet.show_speech_bubble("📚 Let me think of a funny story for you... 🤔✨", tag=tag, placeholder=True)
         
-        # Run story generation in daemon thread to prevent blocking
-        thread = threading.Thread(target=get_funny_story)
-        thread.daemon = True
-        thread.start()
+        # Run story generation in the background to prevent blocking
+        self.clock.run_in_background(get_funny_story)
         print("🧵 Funny story generation thread started")
     
-    def check_inactivity(self):
-        """Check for inactivity and switch to sleeping if idle too long"""
-        idle_time = time.time() - self.last_interaction_time
-        if idle_time > 60:  # 1 minute of inactivity
-            self.pet.show_sleeping()
-        elif idle_time > 300:  # 5 minutes - show crying
-            self.pet.show_crying()
-        QTimer.singleShot(5000, self.check_inactivity)  # Check every 5 seconds
+    def _pet_is_busy(self):
+        return getattr(self.pet, 'is_drinking', False) or getattr(self.pet, 'is_angry', False)
+    
+    def _on_idle_sleep(self):
+        """Fall asleep once the pet has been left alone long enough"""
+        if self._pet_is_busy():
+            self.inactivity.touch()
+            return
+        self.pet.show_sleeping()
+    
+    def _on_idle_sad(self):
+        """Cry once after a long time alone, then go back to sleep"""
+        if self._pet_is_busy():
+            self.inactivity.touch()
+            return
+        self.pet.show_crying(revert_to="sleeping")
+    
+    def _on_idle_resume(self):
+        """Wake up when the user comes back"""
+        if self.pet.gif_manager.current_gif in (self.pet.gif_manager.gifs["sleeping"],
+                                                self.pet.gif_manager.gifs["crying"]):
+            self.pet.show_idle()
     
     def handle_click(self, event):
         """Handle left clicks with random reactions and spam protection"""
         try:
             self.click_count += 1
             self.update_interaction_time()
+            self.pet.record_event("click")
             
             if self.click_count >= 10:
                 self.pet.show_angry()
@@ -366,7 +453,7 @@ class PetBehavior:
             else:
                 # Random reaction on click - call pet's animation methods
                 reactions = [self.pet.show_excited, self.pet.show_laugh, self.pet.show_heartthrow]
-                reaction = random.choice(reactions)
+                reaction = self.clock.random.choice(reactions)
                 reaction()  # Call the selected reaction
                 print(f"🎭 Click reaction: {reaction.__name__}")
         except Exception as e:
@@ -378,6 +465,7 @@ class PetBehavior:
         """Handle right clicks to pet with heart throw"""
         try:
             self.update_interaction_time()
+            self.pet.record_event("pet")
             self.pet.show_heartthrow()
             print("❤️ Pet petted with heart throw")
         except Exception as e:
@@ -387,10 +475,15 @@ class PetBehavior:
     
     def update_interaction_time(self):
         """Update the last interaction time"""
-        self.last_interaction_time = time.time()
+        if self.acting_alone:
+            return
+        self.last_interaction_time = self.clock.time()
+        self.inactivity.touch()
     
     def stop_timers(self):
         """Stop all behavior timers"""
+        self.pet.motion.stop()
+        self.inactivity.stop()
         if self.running_timer:
             self.running_timer.stop()
         if self.action_timer:
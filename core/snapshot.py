@@ -0,0 +1,234 @@
+"""
+Runtime state snapshot for warm restarts of Milk Mocha Pet
+
+A warm restart resumes moods, timers and queued messages, and plays the
+saved current and idle animations at once, with no GIF decode or frame
+diff. It shortens the pet's own setup, not the launch as a whole. Most of
+the time to first paint is interpreter start, imports and QApplication,
+which a snapshot cannot skip. See benchmarks/warm_restart.py.
+"""
+import json
+import time
+from collections import deque
+from PyQt5.QtGui import QImage
+from PyQt5.QtCore import QRect, QSize, QFile, QIODevice, QDataStream
+
+from animation.frame_player import AnimationFrames, frame_cache
+from utils.config import cache_path
+from utils.clock import system_clock
+from utils.assets import assets
+from animation.skins import SKIN_SUFFIX
+
+SNAPSHOT_FILE = "snapshot.dat"
+SNAPSHOT_VERSION = 1
+
+# Runtime state (moods, timers, counters) older than this is not resumed
+STATE_MAX_AGE_SECONDS = 300
+
+# Other warmed animations are re-decoded one at a time, this far apart, after startup
+PREWARM_INTERVAL_MS = 50
+
+
+def _file_stamp(path):
+    asset = assets.find(path)
+    if asset is None and SKIN_SUFFIX + "/" in path:
+        # A GIF inside a skin pack is as fresh as the pack itself
+        asset = assets.find(path[:path.index(SKIN_SUFFIX + "/") + len(SKIN_SUFFIX)])
+    return asset.stamp if asset else (0, 0)
+
+
+def _is_asset(path):
+    asset = assets.find(path)
+    return bool(asset and asset.exists)
+
+
+def _remaining_ms(timer):
+    return timer.remainingTime() if timer and timer.isActive() else 0
+
+
+def capture_state(pet):
+    """Everything needed to pick up where the pet left off, as plain JSON data"""
+    gif_manager = pet.gif_manager
+    behavior = getattr(pet, 'behavior', None)
+    state = {
+        "saved_at": pet.clock.time(),
+        # A run cannot be resumed mid-path, so it resumes as idle
+        "animation": gif_manager.current_key if gif_manager.current_key != "running" else "idle",
+        "animation_remaining_ms": _remaining_ms(gif_manager.animation_timer),
+        "revert_to": gif_manager.revert_key,
+        "drinking_remaining_ms": _remaining_ms(pet.drinking_timer) if pet.is_drinking else 0,
+        "angry_remaining_ms": _remaining_ms(pet.angry_timer) if pet.is_angry else 0,
+        "last_message_time": pet.last_message_time,
+        "click_count": behavior.click_count if behavior else 0,
+        "idle_seconds": behavior.inactivity.idle_seconds() if behavior else 0,
+        "warm_frames": [list(key) for key in frame_cache.entries],
+        "pending_messages": {},
+    }
+    batch_cache = pet.gemini_service.batch_cache
+    with batch_cache.lock:
+        for context, queue in batch_cache.queues.items():
+            if queue:
+                state["pending_messages"][context] = [list(item) for item in queue]
+    return state
+
+
+def _write_frames(stream, frames):
+    size, mtime = _file_stamp(frames.path)
+    stream.writeQString(frames.path)
+    stream.writeInt64(size)
+    stream.writeInt64(mtime)
+    stream.writeDouble(frames.device_ratio)
+    stream.writeUInt32(frames.frame_count)
+    for image, delay, rect in zip(frames.images, frames.delays, frames.dirty_rects):
+        # Raw pixels: restoring is a memcpy, not a PNG decode
+        stream.writeInt32(image.width())
+        stream.writeInt32(image.height())
+        stream.writeInt32(image.bytesPerLine())
+        stream.writeInt32(int(image.format()))
+        stream.writeBytes(image.constBits().asstring(image.sizeInBytes()))
+        stream.writeInt32(delay)
+        for value in (rect.x(), rect.y(), rect.width(), rect.height()):
+            stream.writeInt32(value)
+
+
+def _read_frames(stream):
+    """Read one animation; returns None if its source GIF changed since"""
+    path = stream.readQString()
+    stamp = (stream.readInt64(), stream.readInt64())
+    device_ratio = stream.readDouble()
+    images, delays, rects = [], [], []
+    for _ in range(stream.readUInt32()):
+        width, height, stride, image_format = (stream.readInt32() for _ in range(4))
+        data = stream.readBytes()
+        images.append(QImage(data, width, height, stride, QImage.Format(image_format)).copy())
+        delays.append(stream.readInt32())
+        rects.append(QRect(*(stream.readInt32() for _ in range(4))))
+    if stamp != _file_stamp(path):
+        return None
+    return AnimationFrames(path, images, delays, device_ratio, dirty_rects=rects)
+
+
+def save_snapshot(pet, path=None):
+    """Write the pet's state plus its current and idle frames"""
+    path = path or cache_path(SNAPSHOT_FILE)
+    try:
+        state = capture_state(pet)
+    except Exception as e:
+        print(f"⚠️ Could not capture snapshot: {e}")
+        return False
+
+    gif_manager = pet.gif_manager
+    animations = []
+    for gif in dict.fromkeys([gif_manager.current_gif, gif_manager.gifs["idle"]]):
+        frames = frame_cache.entries.get((gif.path, gif_manager.gif_size.width(),
+                                          gif_manager.gif_size.height(), gif_manager.device_ratio()))
+        if frames and frames.frame_count:
+            animations.append(frames)
+
+    file = QFile(path)
+    if not file.open(QIODevice.WriteOnly):
+        print(f"⚠️ Could not write snapshot: {path}")
+        return False
+    stream = QDataStream(file)
+    stream.writeUInt32(SNAPSHOT_VERSION)
+    stream.writeQString(json.dumps(state))
+    stream.writeUInt32(len(animations))
+    for frames in animations:
+        _write_frames(stream, frames)
+    file.close()
+    print(f"💾 Saved snapshot ({len(animations)} animations)")
+    return True
+
+
+class Snapshot:
+    """A loaded snapshot: runtime state and ready-to-play frames"""
+
+    def __init__(self, state, animations):
+        self.state = state
+        self.animations = animations
+
+    def is_fresh(self, now=None):
+        """True if the runtime state is recent enough to resume"""
+        now = time.time() if now is None else now
+        return now - self.state.get("saved_at", 0) <= STATE_MAX_AGE_SECONDS
+
+    def install_frames(self, cache=frame_cache):
+        """Put the saved frames into the frame cache so nothing is decoded for them"""
+        for frames in self.animations:
+            cache.store(frames.path, frames.size, frames.device_ratio, frames)
+
+
+def load_snapshot(path=None):
+    """Read the last snapshot, or None"""
+    path = path or cache_path(SNAPSHOT_FILE)
+    file = QFile(path)
+    if not file.exists() or not file.open(QIODevice.ReadOnly):
+        return None
+    try:
+        stream = QDataStream(file)
+        if stream.readUInt32() != SNAPSHOT_VERSION:
+            return None
+        state = json.loads(stream.readQString())
+        animations = []
+        for _ in range(stream.readUInt32()):
+            frames = _read_frames(stream)
+            if frames:
+                animations.append(frames)
+        if stream.status() != QDataStream.Ok:
+            return None
+        return Snapshot(state, animations)
+    except ValueError:
+        return None
+    finally:
+        file.close()
+
+
+def restore_state(pet, state):
+    """Resume moods, timers, counters and pre-generated messages"""
+    behavior = pet.behavior
+    behavior.click_count = state.get("click_count", 0)
+    pet.last_message_time = state.get("last_message_time")
+    behavior.inactivity.set_idle_seconds(state.get("idle_seconds", 0))
+
+    animation = state.get("animation") or "idle"
+    remaining = state.get("animation_remaining_ms", 0)
+    revert_to = state.get("revert_to") or "idle"
+    if remaining > 0:
+        pet.gif_manager.switch_gif(animation, pet.pet_label, duration=remaining, revert_to=revert_to)
+    elif animation != "idle":
+        pet.gif_manager.switch_gif(animation, pet.pet_label)
+
+    if state.get("drinking_remaining_ms", 0) > 0:
+        pet.is_drinking = True
+        pet.drinking_timer = pet.clock.timer()
+        pet.drinking_timer.timeout.connect(pet._finish_drinking)
+        pet.drinking_timer.start(state["drinking_remaining_ms"])
+    if state.get("angry_remaining_ms", 0) > 0:
+        pet.is_angry = True
+        pet.angry_timer = pet.clock.timer()
+        pet.angry_timer.timeout.connect(pet._finish_angry_state)
+        pet.angry_timer.start(state["angry_remaining_ms"])
+
+    batch_cache = pet.gemini_service.batch_cache
+    with batch_cache.lock:
+        for context, items in state.get("pending_messages", {}).items():
+            batch_cache.queues.setdefault(context, deque()).extend(tuple(item) for item in items)
+    print(f"♻️ Resumed previous session ({animation})")
+
+
+def prewarm_frames(keys, clock=system_clock, cache=frame_cache, interval_ms=PREWARM_INTERVAL_MS):
+    """Re-decode previously warmed animations in the background, one per timer tick; returns the timer"""
+    pending = deque(key for key in keys if tuple(key) not in cache.entries and _is_asset(key[0]))
+    timer = clock.timer()
+
+    def warm_next():
+        if not pending:
+            timer.stop()
+            return
+        path, width, height, device_ratio = pending.popleft()
+        cache.warm(path, QSize(width, height), device_ratio, run_in_background=clock.run_in_background)
+
+    timer.timeout.connect(warm_next)
+    if pending:
+        timer.start(interval_ms)
+    return timer
@@ -0,0 +1,99 @@
+"""
+Vectorized collision index for Milk Mocha Pet
+Positions and sizes of every on-screen entity live in NumPy arrays
+"""
+import numpy as np
+
+# Entity kinds
+PET = 0
+FOOD = 1
+
+FREE_SLOT = -1
+
+
+class World:
+    """All entities' geometry in flat arrays, queried for overlaps in batched operations
+
+    Widgets register a slot and mirror their own geometry into it from their
+    move and resize events. The world never moves anything itself: the pet
+    runs through the MotionEngine and bottles are dragged by the user.
+    """
+
+    def __init__(self, capacity=16):
+        self.positions = np.zeros((capacity, 2))   # Top-left x, y
+        self.sizes = np.zeros((capacity, 2))       # Width, height
+        self.kinds = np.full(capacity, FREE_SLOT, dtype=np.int8)
+        self.widgets = [None] * capacity
+
+    @property
+    def capacity(self):
+        return len(self.kinds)
+
+    def _grow(self):
+        """Double every array when all slots are taken"""
+        extra = self.capacity
+        self.positions = np.vstack([self.positions, np.zeros((extra, 2))])
+        self.sizes = np.vstack([self.sizes, np.zeros((extra, 2))])
+        self.kinds = np.concatenate([self.kinds, np.full(extra, FREE_SLOT, dtype=np.int8)])
+        self.widgets.extend([None] * extra)
+
+    def add(self, kind, x, y, width, height, widget=None):
+        """Register an entity and return its slot"""
+        free = np.flatnonzero(self.kinds == FREE_SLOT)
+        if not len(free):
+            self._grow()
+            free = np.flatnonzero(self.kinds == FREE_SLOT)
+        slot = int(free[0])
+        self.kinds[slot] = kind
+        self.positions[slot] = (x, y)
+        self.sizes[slot] = (width, height)
+        self.widgets[slot] = widget
+        return slot
+
+    def remove(self, slot):
+        """Free an entity's slot"""
+        self.kinds[slot] = FREE_SLOT
+        self.widgets[slot] = None
+
+    def count(self, kind=None):
+        if kind is None:
+            return int(np.count_nonzero(self.kinds != FREE_SLOT))
+        return int(np.count_nonzero(self.kinds == kind))
+
+    def set_position(self, slot, x, y):
+        self.positions[slot] = (x, y)
+
+    def set_size(self, slot, width, height):
+        self.sizes[slot] = (width, height)
+
+    def bbox(self, slot):
+        """(left, top, right, bottom) of one entity"""
+        x, y = self.positions[slot]
+        w, h = self.sizes[slot]
+        return (int(x), int(y), int(x + w), int(y + h))
+
+    def overlaps(self):
+        """All-pairs AABB test; returns (slots, matrix) with matrix[i, j] for i < j"""
+        slots = np.flatnonzero(self.kinds != FREE_SLOT)
+        low = self.positions[slots]
+        high = low + self.sizes[slots]
+        hit = ((low[:, None, 0] < high[None, :, 0]) & (high[:, None, 0] > low[None, :, 0]) &
+               (low[:, None, 1] < high[None, :, 1]) & (high[:, None, 1] > low[None, :, 1]))
+        return slots, np.triu(hit, k=1)
+
+    def overlapping_pairs(self, kind_a, kind_b):
+        """Slot pairs (a, b) where an entity of kind_a overlaps one of kind_b"""
+        mask_a = self.kinds == kind_a
+        mask_b = self.kinds == kind_b
+        if not np.any(mask_a) or not np.any(mask_b):
+            return []
+        slots_a = np.flatnonzero(mask_a)
+        slots_b = np.flatnonzero(mask_b)
+        low_a = self.positions[slots_a]
+        high_a = low_a + self.sizes[slots_a]
+        low_b = self.positions[slots_b]
+        high_b = low_b + self.sizes[slots_b]
+        hit = ((low_a[:, None, 0] < high_b[None, :, 0]) & (high_a[:, None, 0] > low_b[None, :, 0]) &
+               (low_a[:, None, 1] < high_b[None, :, 1]) & (high_a[:, None, 1] > low_b[None, :, 1]))
+        rows, cols = np.nonzero(hit)
+        return [(int(slots_a[r]), int(slots_b[c])) for r, c in zip(rows, cols)]
@@ -0,0 +1,13 @@
+"""
+Shared fixtures for the pure-logic tests
+"""
+import pytest
+
+from utils import config
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point cache_path() at a fresh directory for one test"""
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
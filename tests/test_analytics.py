@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from utils.analytics import AnalyticsStore, hour_start
+
+
+class FakeTime:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def local_zone(monkeypatch):
+    """Run a test in a timezone with a half-hour offset (UTC+5:30, no DST)"""
+    monkeypatch.setenv("TZ", "IST-5:30")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def store(tmp_path):
+    clock = FakeTime(1_700_000_000.0)
+    store = AnalyticsStore(str(tmp_path / "analytics.db"), flush_interval=60, clock=clock)
+    yield store
+    store.close()
+
+
+def test_hour_start_follows_the_local_clock(local_zone):
+    ts = 1_700_000_000  # 2023-11-14 22:13:20 UTC, 03:43:20 in UTC+5:30
+    start = hour_start(ts + 0.5)
+    assert time.localtime(start)[3:6] == (3, 0, 0)
+    assert start % 3600 == 1800
+    assert hour_start(start) == start
+
+
+def test_totals_come_from_the_rollups(store):
+    store.record("click")
+    store.record("click")
+    store.record("key", "G")
+    store.clock.now += 7200
+    store.record("click")
+    assert store.flush()
+    assert store.totals() == {("click", ""): 3, ("key", "G"): 1}
+    assert store.totals(since=hour_start(store.clock.now)) == {("click", ""): 1}
+    assert [count for _, count in store.hourly("click")] == [2, 1]
+    assert [kind for _, kind, _ in store.recent()] == ["click", "key", "click", "click"]
+
+
+def test_busiest_hours_are_local_hours(store, local_zone):
+    # 03:55 and 04:05 local fall in different hours, though both are within 22:00 UTC
+    store.clock.now = 1_700_000_000 + 12 * 60
+    store.record("click")
+    store.record("click")
+    store.clock.now += 10 * 60
+    store.record("click")
+    assert store.flush()
+    assert store.busiest_hours() == [(3, 2), (4, 1)]
+
+
+def test_events_after_close_are_dropped(store):
+    store.record("click")
+    store.close()
+    store.record("click")
+    assert not store.buffer
+    assert store.dropped == 1
+    assert store.written == 1
+
+
+def test_events_are_dropped_when_the_writer_cannot_start(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "missing" / "analytics.db"))
+    store.writer.join(5)
+    store.record("click")
+    assert not store.buffer and store.dropped == 1
+    assert not store.flush()
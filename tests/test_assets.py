@@ -0,0 +1,59 @@
+import os
+
+from utils.assets import AssetRegistry
+
+
+def make_registry(tmp_path):
+    (tmp_path / "mocha_gifs").mkdir()
+    (tmp_path / "mocha_gifs" / "idle.gif").write_bytes(b"GIF89a")
+    (tmp_path / "skins").mkdir()
+    for name in ("b.zip", "a.zip", "notes.txt"):
+        (tmp_path / "skins" / name).write_bytes(b"x")
+    (tmp_path / "skins" / "old").mkdir()
+    (tmp_path / "skins" / "old" / "c.zip").write_bytes(b"x")
+    return AssetRegistry(str(tmp_path))
+
+
+def test_handles_are_resolved_once_and_reused(tmp_path):
+    registry = make_registry(tmp_path)
+    idle = registry.get("mocha_gifs/idle.gif")
+    assert idle.exists and idle.stamp[0] == 6
+    assert idle.path == os.path.join(str(tmp_path), "mocha_gifs", "idle.gif")
+    assert registry.get("mocha_gifs/idle.gif") is idle
+    assert registry.find(idle.path) is idle
+
+
+def test_unknown_names_get_a_missing_handle_that_can_appear_later(tmp_path):
+    registry = make_registry(tmp_path)
+    later = registry.get("mocha_gifs/later.gif")
+    assert not later.exists
+    (tmp_path / "mocha_gifs" / "later.gif").write_bytes(b"GIF89a!")
+    assert later.refresh() and later.exists and later.stamp[0] == 7
+    assert not later.refresh()
+
+
+def test_refresh_notices_removal(tmp_path):
+    registry = make_registry(tmp_path)
+    idle = registry.get("mocha_gifs/idle.gif")
+    os.remove(idle.path)
+    assert idle.refresh()
+    assert not idle.exists and idle.stamp == (0, 0)
+
+
+def test_children_lists_existing_direct_children_by_suffix(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.get("skins/missing.zip")
+    assert [asset.name for asset in registry.children("skins", ".zip")] == ["skins/a.zip", "skins/b.zip"]
+    assert registry.find(str(tmp_path / "elsewhere.gif")) is None
+
+
+def test_listeners_hear_about_changed_files(tmp_path):
+    registry = make_registry(tmp_path)
+    idle = registry.get("mocha_gifs/idle.gif")
+    heard = []
+    registry.add_listener(heard.append)
+    registry.add_listener(lambda asset: 1 / 0)  # A failing listener does not stop the others
+    (tmp_path / "mocha_gifs" / "idle.gif").write_bytes(b"GIF89a, but longer")
+    registry._on_file_changed(idle.path)
+    registry._on_file_changed(idle.path)
+    assert heard == [idle]
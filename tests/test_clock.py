@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from utils.clock import VirtualClock
+
+
+def test_timers_fire_in_deadline_order_ties_in_start_order():
+    clock = VirtualClock()
+    fired = []
+    for name, ms in (("late", 300), ("first tie", 100), ("second tie", 100)):
+        clock.single_shot(ms, lambda name=name: fired.append((name, clock.elapsed)))
+    timer = clock.timer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(lambda: fired.append(("timer", clock.elapsed)))
+    timer.start(100)
+    assert clock.advance(1) == 4
+    assert fired == [("first tie", 0.1), ("second tie", 0.1), ("timer", 0.1), ("late", 0.3)]
+    assert clock.elapsed == 1
+
+
+def test_nothing_fires_before_its_deadline():
+    clock = VirtualClock()
+    fired = []
+    clock.single_shot(500, lambda: fired.append(clock.elapsed))
+    assert clock.advance(0.4) == 0
+    assert clock.advance(0.1) == 1
+    assert fired == [0.5]
+
+
+def test_repeating_timer_fires_every_interval():
+    clock = VirtualClock()
+    fired = []
+    timer = clock.timer()
+    timer.timeout.connect(lambda: fired.append(clock.elapsed))
+    timer.start(250)
+    clock.advance(1)
+    assert fired == [0.25, 0.5, 0.75, 1.0]
+    assert timer.isActive()
+
+
+def test_stopped_and_restarted_timers_skip_stale_entries():
+    clock = VirtualClock()
+    fired = []
+    stopped, restarted = clock.timer(), clock.timer()
+    for name, timer in (("stopped", stopped), ("restarted", restarted)):
+        timer.setSingleShot(True)
+        timer.timeout.connect(lambda name=name: fired.append((name, clock.elapsed)))
+        timer.start(400)
+    stopped.stop()
+    clock.advance(0.25)
+    restarted.start(500)
+    clock.advance(1)
+    assert fired == [("restarted", 0.75)]
+    assert not restarted.isActive() and restarted.remainingTime() == -1
+
+
+def test_unreferenced_timer_never_fires():
+    clock = VirtualClock()
+    fired = []
+    timer = clock.timer()
+    timer.timeout.connect(lambda: fired.append(True))
+    timer.start(10)
+    del timer
+    clock.advance(1)
+    assert fired == []
+
+
+def test_time_follows_the_simulated_start():
+    start = datetime(2025, 3, 3, 9, 0)
+    clock = VirtualClock(start=start)
+    clock.advance(90)
+    assert clock.now() == datetime(2025, 3, 3, 9, 1, 30)
+    assert clock.monotonic() == clock.perf_counter() == 90
+
+
+def test_same_seed_same_randomness():
+    assert VirtualClock(5).random.random() == VirtualClock(5).random.random()
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from utils.config import ConfigManager
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "config" / "settings.json"
+    return ConfigManager(str(path))
+
+
+def write(config, data):
+    with open(config.config_path, "w") as f:
+        json.dump(data, f)
+
+
+def test_missing_file_gives_defaults_and_save_creates_it(config):
+    assert config.settings.pet_size == 150
+    config.save_config()
+    with open(config.config_path) as f:
+        assert json.load(f)["pet_size"] == 150
+
+
+def test_apply_saves_and_notifies_only_matching_subscribers(config):
+    sizes, skins, raw = [], [], []
+    config.subscribe(("pet_size",), lambda settings: sizes.append(settings.pet_size))
+    config.subscribe(("skin",), lambda settings: skins.append(settings.skin))
+    config.add_listener(raw.append)
+    assert config.apply({"pet_size": 200}) == {"pet_size": (150, 200)}
+    assert config.apply({"pet_size": 200}) == {}
+    assert sizes == [200] and skins == [] and raw == [{"pet_size": (150, 200)}]
+    with open(config.config_path) as f:
+        assert json.load(f)["pet_size"] == 200
+
+
+def test_clamped_values_that_end_up_the_same_notify_nobody(config):
+    sizes = []
+    config.subscribe(("pet_size",), lambda settings: sizes.append(settings.pet_size))
+    config.apply({"pet_size": 400})
+    config.apply({"pet_size": 900})  # Clamped to 400 again
+    assert sizes == [400]
+
+
+def test_reload_applies_external_edits(config):
+    config.save_config()
+    intervals = []
+    config.subscribe(("speaking_interval",), lambda settings: intervals.append(settings.speaking_interval))
+    data = config.settings.to_dict()
+    data["speaking_interval"] = 5
+    write(config, data)
+    assert config.reload() == {"speaking_interval": (15, 5)}
+    assert intervals == [5] and config.settings.speaking_interval == 5
+    assert config.reload() == {}  # The app's own writes reload to an empty diff
+
+
+def test_reload_keeps_settings_on_a_broken_file(config):
+    config.apply({"pet_size": 180})
+    with open(config.config_path, "w") as f:
+        f.write('{"pet_size": ')  # Half written
+    assert config.reload() == {}
+    write(config, ["not", "a", "dict"])
+    assert config.reload() == {}
+    assert config.settings.pet_size == 180
+
+
+def test_subscribing_to_an_unknown_setting_fails(config):
+    with pytest.raises(ValueError):
+        config.subscribe(("pet_sise",), print)
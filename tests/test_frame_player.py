@@ -0,0 +1,48 @@
+from PyQt5.QtGui import QImage, QColor
+from PyQt5.QtCore import QRect
+
+from animation.frame_player import changed_rect, compute_dirty_rects, to_logical_rect
+
+
+def frame(width=20, height=10, fill=0xFF000000):
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    image.fill(fill)
+    return image
+
+
+def test_identical_frames_have_no_changed_rect():
+    assert changed_rect(frame(), frame()).isEmpty()
+
+
+def test_changed_rect_bounds_every_changed_pixel():
+    after = frame()
+    after.setPixelColor(3, 2, QColor("red"))
+    after.setPixelColor(15, 7, QColor("blue"))
+    assert changed_rect(frame(), after) == QRect(3, 2, 13, 6)
+
+
+def test_changed_rect_reaches_the_last_column():
+    before, after = frame(3, 3), frame(3, 3)
+    after.setPixelColor(2, 1, QColor("white"))
+    assert changed_rect(before, after) == QRect(2, 1, 1, 1)
+
+
+def test_size_change_repaints_everything():
+    assert changed_rect(frame(10, 10), frame(20, 10)) == QRect(0, 0, 20, 10)
+
+
+def test_first_dirty_rect_diffs_against_the_last_frame():
+    first, second = frame(), frame()
+    second.setPixelColor(5, 5, QColor("red"))
+    assert compute_dirty_rects([first, second]) == [QRect(5, 5, 1, 1), QRect(5, 5, 1, 1)]
+
+
+def test_logical_rect_covers_the_device_pixels():
+    assert to_logical_rect(QRect(3, 3, 2, 2), 2.0) == QRect(1, 1, 2, 2)
+    assert to_logical_rect(QRect(4, 4, 2, 2), 2.0) == QRect(2, 2, 1, 1)
+    assert to_logical_rect(QRect(1, 1, 1, 1), 1.5) == QRect(0, 0, 2, 2)
+
+
+def test_logical_rect_is_unchanged_at_ratio_one():
+    assert to_logical_rect(QRect(1, 2, 3, 4), 1.0) == QRect(1, 2, 3, 4)
+    assert to_logical_rect(QRect(), 2.0).isEmpty()
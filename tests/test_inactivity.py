@@ -0,0 +1,63 @@
+from core.inactivity import InactivityMonitor
+from utils.clock import VirtualClock
+
+
+def make_monitor():
+    clock = VirtualClock()
+    fired = []
+    monitor = InactivityMonitor(clock.monotonic, timer_factory=clock.timer)
+    monitor.add_stage("cry", 300, lambda: fired.append(("cry", clock.elapsed)))
+    monitor.add_stage("sleep", 60, lambda: fired.append(("sleep", clock.elapsed)))
+    return monitor, clock, fired
+
+
+def test_stages_fire_once_in_order_of_delay():
+    monitor, clock, fired = make_monitor()
+    monitor.start()
+    clock.advance(1000)
+    assert [name for name, _ in fired] == ["sleep", "cry"]
+    assert fired[0][1] >= 60 and fired[1][1] >= 300
+    assert monitor.current_stage() == "cry" and not monitor.timer.isActive()
+
+
+def test_activity_pushes_the_deadline_back():
+    monitor, clock, fired = make_monitor()
+    monitor.start()
+    clock.advance(50)
+    monitor.touch()
+    clock.advance(50)
+    assert fired == []
+    clock.advance(11)
+    assert [name for name, _ in fired] == ["sleep"]
+
+
+def test_waking_up_resumes_and_starts_over():
+    monitor, clock, fired = make_monitor()
+    resumed = []
+    monitor.on_resume = lambda: resumed.append(clock.elapsed)
+    monitor.start()
+    clock.advance(100)
+    monitor.touch(resume=True)
+    assert resumed == [100] and monitor.current_stage() is None
+    clock.advance(61)
+    assert [name for name, _ in fired] == ["sleep", "sleep"]
+
+
+def test_changing_a_stage_rearms_only_while_running():
+    monitor, clock, fired = make_monitor()
+    monitor.set_stage_seconds("sleep", 10)
+    assert not monitor.timer.isActive()
+    clock.advance(1000)
+    assert fired == []
+    monitor.start()
+    monitor.set_stage_seconds("sleep", 2000)
+    clock.advance(400)
+    assert [name for name, _ in fired] == ["cry"]
+
+
+def test_carried_over_idle_time_counts():
+    monitor, clock, fired = make_monitor()
+    monitor.start()
+    monitor.set_idle_seconds(59)
+    clock.advance(1.1)
+    assert [name for name, _ in fired] == ["sleep"]
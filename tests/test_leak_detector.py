@@ -0,0 +1,49 @@
+from utils import leak_detector
+from utils.leak_detector import LeakDetector, _thread_kind
+
+
+def feed(detector, monkeypatch, samples):
+    """Run detector.sample() over made-up counts instead of the live process"""
+    for qobjects, threads in samples:
+        monkeypatch.setattr(leak_detector, "count_qobjects", lambda: dict(qobjects))
+        monkeypatch.setattr(leak_detector, "count_threads", lambda: dict(threads))
+        monkeypatch.setattr(leak_detector, "top_allocators", lambda: {})
+        detector.sample()
+
+
+def test_thread_names_lose_their_numbering():
+    assert _thread_kind("Thread-12 (get_message_thread)") == "get_message_thread"
+    assert _thread_kind("Dummy-3") == "Dummy"
+    assert _thread_kind("MainThread") == "MainThread"
+
+
+def test_only_steady_growth_above_the_threshold_is_flagged(monkeypatch):
+    detector = LeakDetector(trace_memory=False, growth_samples=3)
+    feed(detector, monkeypatch, [
+        ({"QTimer": 10, "QLabel": 5, "QMovie": 1}, {"worker": 1}),
+        ({"QTimer": 12, "QLabel": 9, "QMovie": 2}, {"worker": 2}),
+        ({"QTimer": 14, "QLabel": 8, "QMovie": 3}, {"worker": 3}),
+        ({"QTimer": 16, "QLabel": 12, "QMovie": 4}, {"worker": 4}),
+    ])
+    # QTimer rose every time by 6 (>= 5); QLabel dipped once; QMovie rose by only 3
+    assert detector.growing() == {"qobject:QTimer": (10, 16), "thread:worker": (1, 4)}
+
+
+def test_needs_enough_samples(monkeypatch):
+    detector = LeakDetector(trace_memory=False, growth_samples=3)
+    feed(detector, monkeypatch, [({"QTimer": n}, {}) for n in (0, 50, 100)])
+    assert detector.growing() == {}
+
+
+def test_categories_appearing_later_start_from_zero(monkeypatch):
+    detector = LeakDetector(trace_memory=False, growth_samples=2)
+    feed(detector, monkeypatch, [({}, {}), ({"QTimer": 3}, {}), ({"QTimer": 6}, {})])
+    assert detector.history["qobject:QTimer"] == [0, 3, 6]
+    assert detector.growing() == {"qobject:QTimer": (0, 6)}
+    assert "! qobject:QTimer" in detector.report()
+
+
+def test_report_before_a_second_sample(monkeypatch):
+    detector = LeakDetector(trace_memory=False)
+    feed(detector, monkeypatch, [({"QTimer": 1}, {})])
+    assert detector.report() == "Not enough samples yet."
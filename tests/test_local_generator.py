@@ -0,0 +1,57 @@
+import json
+import random
+
+from utils import local_generator
+from utils.local_generator import LocalMessageGenerator, MIN_WORDS, MAX_WORDS
+from utils.message_store import FallbackMessageStore
+
+BUILTIN = {
+    "random": [
+        "milk mocha loves a warm cup of cocoa on a rainy day",
+        "a warm hug and a cup of milk make every rainy day better",
+        "every little step you take today is a step worth cheering for",
+        "take a little step today and cheer for the warm cup of cocoa",
+    ],
+}
+
+
+def make_store(tmp_path):
+    quotes = tmp_path / "quotes.json"
+    quotes.write_text(json.dumps([]), encoding="utf-8")
+    return FallbackMessageStore(BUILTIN, quotes_path=str(quotes), rng=random.Random(0))
+
+
+def sample(generator, count=20):
+    return [generator.generate("random") for _ in range(count)]
+
+
+def test_generated_messages_are_new_and_sized(cache_dir, tmp_path):
+    generator = LocalMessageGenerator(make_store(tmp_path), seed=3)
+    messages = [message for message in sample(generator) if message is not None]
+    assert messages
+    for message in messages:
+        assert message not in generator.known
+        assert MIN_WORDS <= len(message.split()) <= MAX_WORDS
+
+
+def test_saved_model_round_trips(cache_dir, tmp_path, monkeypatch):
+    trained = LocalMessageGenerator(make_store(tmp_path), seed=7)
+    expected = sample(trained)
+    assert (cache_dir / local_generator.MODEL_FILE).exists()
+
+    def no_training(corpus):
+        raise AssertionError("the saved model should have been read")
+
+    reloaded = LocalMessageGenerator(make_store(tmp_path), seed=7)
+    monkeypatch.setattr(reloaded, "_train", no_training)
+    assert sample(reloaded) == expected
+    assert reloaded.vocab == trained.vocab
+    for context, chain in trained.chains.items():
+        loaded = reloaded.chains[context]
+        assert (loaded.starts, loaded.next_ids, loaded.cumulative) == (chain.starts, chain.next_ids, chain.cumulative)
+
+
+def test_a_model_for_other_sources_is_retrained(cache_dir, tmp_path):
+    LocalMessageGenerator(make_store(tmp_path), seed=0).generate()
+    generator = LocalMessageGenerator(make_store(tmp_path), seed=0)
+    assert not generator._read_model(b"\0" * 20)
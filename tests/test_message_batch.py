@@ -0,0 +1,96 @@
+import json
+
+from utils.clock import VirtualClock
+from utils.message_batch import MessageBatchCache, parse_message_batch, first_message_so_far, MAX_MESSAGE_CHARS
+from utils.quota import PRIORITY_USER, PRIORITY_BACKGROUND
+
+
+def test_parse_json_array():
+    assert parse_message_batch('["One.", "Two.", 3, "Three."]') == ["One.", "Two.", "Three."]
+
+
+def test_parse_fenced_json_with_chatter_around_it():
+    text = 'Here you go:\n```json\n["Sip some milk!", "You got this!"]\n```'
+    assert parse_message_batch(text) == ["Sip some milk!", "You got this!"]
+
+
+def test_parse_falls_back_to_list_lines():
+    text = '1. "Stretch your paws"\n- Drink water\n\n* Drink water\n2) Smile'
+    assert parse_message_batch(text) == ["Stretch your paws", "Drink water", "Smile"]
+
+
+def test_parse_drops_overlong_messages_and_caps_the_count():
+    text = json.dumps(["a", "x" * (MAX_MESSAGE_CHARS + 1), "b", "c"])
+    assert parse_message_batch(text, expected=2) == ["a", "b"]
+    assert parse_message_batch("") == []
+
+
+def test_first_message_grows_with_the_stream():
+    full = json.dumps(["Café time \U0001F375 \"yay\"", "Second"], ensure_ascii=True)
+    seen = [first_message_so_far(full[:end]) for end in range(len(full) + 1)]
+    assert seen[0] == "" and seen[-1] == "Café time \U0001F375 \"yay\""
+    for shorter, longer in zip(seen, seen[1:]):
+        assert longer.startswith(shorter.rstrip())  # Never shows a half-decoded escape
+
+
+def test_first_message_waits_for_the_array():
+    assert first_message_so_far('Sure! "not yet') == ""
+    assert first_message_so_far('["') == ""
+
+
+class FakeService:
+    model = object()
+
+    def __init__(self, batches):
+        self.batches = batches
+        self.calls = []
+
+    def get_message_batch(self, context, count, priority):
+        self.calls.append((context, count, priority))
+        return self.batches.pop(0)
+
+
+def test_refill_queues_a_batch_then_take_pops_in_order():
+    clock = VirtualClock()
+    cache = MessageBatchCache(FakeService([["a", "b"]]), batch_size=2, clock=clock)
+    assert cache.take("random") is None
+    assert cache.refill("random") == 2
+    assert cache.pending("random") == 2
+    assert [cache.take("random"), cache.take("random"), cache.take("random")] == ["a", "b", None]
+    assert cache.delivered == 2
+
+
+def test_refill_is_charged_at_the_callers_priority():
+    service = FakeService([["a"], ["b"]])
+    cache = MessageBatchCache(service, batch_size=2, clock=VirtualClock())
+    cache.refill("random", PRIORITY_USER)
+    cache.refill_in_background("random")
+    assert service.calls == [("random", 2, PRIORITY_USER), ("random", 2, PRIORITY_BACKGROUND)]
+
+
+def test_stale_messages_are_dropped():
+    clock = VirtualClock()
+    cache = MessageBatchCache(FakeService([["old"], ["new"]]), batch_size=2, max_age=60, clock=clock)
+    cache.refill("random")
+    clock.advance(61)
+    cache.refill("random")
+    assert cache.take("random") == "new"
+
+
+def test_one_refill_per_context_at_a_time():
+    service = FakeService([["a"]])
+    cache = MessageBatchCache(service, batch_size=2, clock=VirtualClock())
+    assert cache.claim_refill("random")
+    assert cache.refill("random") == 0  # Already running
+    assert service.calls == []
+    cache.finish_refill("random", ["streamed"])
+    assert cache.claim_refill("random")
+    assert cache.take("random") == "streamed"
+
+
+def test_batching_needs_a_model_and_more_than_one_message():
+    service = FakeService([])
+    assert MessageBatchCache(service, batch_size=5).enabled
+    assert not MessageBatchCache(service, batch_size=1).enabled
+    service.model = None
+    assert not MessageBatchCache(service, batch_size=5).enabled
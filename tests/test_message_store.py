@@ -0,0 +1,81 @@
+import json
+import random
+
+from utils import message_store
+from utils.message_store import FallbackMessageStore, tag_quote
+
+BUILTIN = {"random": ["one", "two", "three", "four"], "wellness": ["sip", "stretch"]}
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(tmp_path, clock=None, seed=0):
+    quotes = tmp_path / "quotes.json"
+    quotes.write_text(json.dumps(["Take a break and breathe"]), encoding="utf-8")
+    return FallbackMessageStore(BUILTIN, quotes_path=str(quotes), rng=random.Random(seed), clock=clock or FakeTime())
+
+
+def test_tag_quote_uses_keywords():
+    assert tag_quote("Why did the cow laugh?") == "humorous"
+    assert tag_quote("Drink some water") == "wellness"
+    assert tag_quote("You can do it") == "motivational"
+
+
+def test_quotes_join_their_context_and_random(cache_dir, tmp_path):
+    store = make_store(tmp_path)
+    corpus = store.corpus()
+    assert corpus["wellness"] == ["sip", "stretch", "Take a break and breathe"]
+    assert corpus["random"][-1] == "Take a break and breathe"
+
+
+def test_a_bag_never_repeats_until_empty(cache_dir, tmp_path):
+    store = make_store(tmp_path)
+    size = len(store.corpus()["random"])
+    for _ in range(5):
+        assert sorted(store.draw("random") for _ in range(size)) == sorted(store.corpus()["random"])
+
+
+def test_a_new_bag_never_starts_with_the_last_message(cache_dir, tmp_path):
+    store = make_store(tmp_path)
+    size = len(store.corpus()["random"])
+    last = None
+    for _ in range(50):
+        drawn = [store.draw("random") for _ in range(size)]
+        assert drawn[0] != last
+        last = drawn[-1]
+
+
+def test_unknown_context_draws_from_random(cache_dir, tmp_path):
+    store = make_store(tmp_path)
+    assert store.draw("nonsense") in store.corpus()["random"]
+
+
+def test_bags_are_saved_now_and_then_and_on_flush(cache_dir, tmp_path):
+    clock = FakeTime()
+    store = make_store(tmp_path, clock)
+    bags_file = cache_dir / message_store.BAGS_FILE
+    store.draw("random")
+    assert not bags_file.exists()
+    clock.now += message_store.SAVE_INTERVAL_SECONDS
+    store.draw("random")
+    assert json.loads(bags_file.read_text())["random"]["pos"] == 2
+    store.draw("random")
+    store.flush()
+    assert json.loads(bags_file.read_text())["random"]["pos"] == 3
+    assert not store.dirty
+
+
+def test_a_restart_carries_on_where_the_last_session_stopped(cache_dir, tmp_path):
+    first = make_store(tmp_path)
+    size = len(first.corpus()["random"])
+    drawn = [first.draw("random") for _ in range(2)]
+    first.flush()
+    second = make_store(tmp_path, seed=1)
+    rest = [second.draw("random") for _ in range(size - 2)]
+    assert sorted(drawn + rest) == sorted(first.corpus()["random"])
@@ -0,0 +1,90 @@
+import pytest
+
+from animation import motion
+from animation.motion import MotionBody, MotionEngine
+from utils.clock import VirtualClock
+
+
+def test_body_accelerates_cruises_and_stops_on_target():
+    body = MotionBody(0, 0)
+    body.retarget(1000, 0, speed=400)
+    top_speed = 0.0
+    steps = 0
+    while not body.step(motion.STEP_SECONDS):
+        top_speed = max(top_speed, body.velocity)
+        steps += 1
+        assert 0 <= body.x < 1000 and body.y == 0
+    assert (body.x, body.y, body.velocity, body.moving) == (1000, 0, 0.0, False)
+    assert top_speed == pytest.approx(400)
+    # 2.5 s at cruise speed plus about a sixth of a second lost to starting and braking
+    assert 2.5 < steps * motion.STEP_SECONDS < 2.75
+
+
+def test_retarget_keeps_the_velocity():
+    body = MotionBody(0, 0)
+    body.retarget(1000, 0)
+    for _ in range(60):
+        body.step(motion.STEP_SECONDS)
+    velocity = body.velocity
+    body.retarget(1000, 1000)
+    assert body.velocity == velocity and body.moving
+
+
+def test_advance_runs_whole_steps_and_carries_the_remainder():
+    engine = MotionEngine(step_seconds=0.01)
+    moves = []
+    body = engine.add_body(0, 0, on_move=lambda body: moves.append(body.x))
+    body.retarget(10000, 0)
+    engine.advance(0.025)  # Two steps, 5 ms carried over
+    assert engine.accumulator == pytest.approx(0.005)
+    engine.advance(0.005)  # The carried time makes a third step
+    assert engine.accumulator == pytest.approx(0.0)
+    assert len(moves) == 2 and moves[0] < moves[1]
+
+
+def test_path_does_not_depend_on_the_tick_rate():
+    paths = []
+    for elapsed, ticks in ((1 / 64, 64), (1 / 128, 128)):
+        engine = MotionEngine(step_seconds=1 / 128)
+        body = engine.add_body(0, 0)
+        body.retarget(500, 300)
+        trace = []
+        for tick in range(ticks):
+            engine.advance(elapsed)
+            if tick % (ticks // 8) == ticks // 8 - 1:
+                trace.append((body.x, body.y))
+        paths.append(trace)
+    assert paths[0] == paths[1]
+
+
+def test_a_long_stall_is_capped():
+    engine = MotionEngine()
+    body = engine.add_body(0, 0)
+    body.retarget(10000, 0)
+    engine.advance(10.0)
+    assert engine.accumulator == 0.0
+    assert body.x < 10000
+
+
+def test_engine_ticks_only_while_something_moves():
+    clock = VirtualClock()
+    engine = MotionEngine(clock=clock.perf_counter, timer_factory=clock.timer)
+    arrived = []
+    body = engine.add_body(0, 0, on_arrive=arrived.append)
+    engine.move_to(body, 200, 0)
+    assert engine.timer.isActive()
+    clock.advance(5)
+    assert arrived == [body] and (body.x, body.y) == (200, 0)
+    assert not engine.timer.isActive()
+
+
+def test_stop_halts_every_body_where_it_is():
+    clock = VirtualClock()
+    engine = MotionEngine(clock=clock.perf_counter, timer_factory=clock.timer)
+    body = engine.add_body(0, 0)
+    engine.move_to(body, 1000, 0)
+    clock.advance(0.5)
+    engine.stop()
+    x = body.x
+    clock.advance(5)
+    assert body.x == x and 0 < x < 1000 and not body.moving
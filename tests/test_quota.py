@@ -0,0 +1,54 @@
+from utils.quota import QuotaManager, PRIORITY_USER, PRIORITY_STARTUP, PRIORITY_BACKGROUND
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_background_leaves_half_the_budget_for_the_user():
+    quota = QuotaManager(per_minute=10, per_day=1000, clock=FakeTime())
+    granted = sum(quota.acquire(PRIORITY_BACKGROUND) for _ in range(10))
+    assert granted == 5
+    assert all(quota.acquire(PRIORITY_USER) for _ in range(5))
+    assert not quota.acquire(PRIORITY_USER)
+
+
+def test_startup_reserve_sits_between_user_and_background():
+    quota = QuotaManager(per_minute=8, per_day=1000, clock=FakeTime())
+    assert sum(quota.acquire(PRIORITY_STARTUP) for _ in range(8)) == 6
+
+
+def test_budget_refills_over_time():
+    clock = FakeTime()
+    quota = QuotaManager(per_minute=6, per_day=1000, clock=clock)
+    while quota.acquire(PRIORITY_USER):
+        pass
+    clock.now += 10  # One request's worth at 6 per minute
+    assert quota.acquire(PRIORITY_USER)
+    assert not quota.acquire(PRIORITY_USER)
+
+
+def test_daily_budget_caps_the_minute_budget():
+    quota = QuotaManager(per_minute=100, per_day=3, clock=FakeTime())
+    assert sum(quota.acquire(PRIORITY_USER) for _ in range(10)) == 3
+    assert quota.state()["denied"]["user"] == 7
+
+
+def test_reserves_round_down_to_whole_requests():
+    quota = QuotaManager(per_minute=3, per_day=1000, clock=FakeTime())
+    assert sum(quota.acquire(PRIORITY_BACKGROUND) for _ in range(3)) == 2  # Keeps back 1, not 1.5
+    assert quota.acquire(PRIORITY_USER)
+
+
+def test_background_still_runs_on_a_one_request_budget():
+    clock = FakeTime()
+    quota = QuotaManager(per_minute=1, per_day=1000, clock=clock)
+    assert quota.acquire(PRIORITY_BACKGROUND)
+    assert not quota.acquire(PRIORITY_USER)
+    clock.now += 60
+    assert quota.state()["next_background_in"] == 0
+    assert quota.acquire(PRIORITY_STARTUP)
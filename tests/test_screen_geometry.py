@@ -0,0 +1,97 @@
+import random
+
+from PyQt5.QtCore import QRect
+
+from utils import screen_geometry
+from utils.screen_geometry import ScreenGeometry
+
+
+class FakeSignal:
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self.slots:
+            slot(*args)
+
+
+class FakeScreen:
+    def __init__(self, x, y, width, height):
+        self.rect = QRect(x, y, width, height)
+        self.geometryChanged = FakeSignal()
+        self.availableGeometryChanged = FakeSignal()
+
+    def availableGeometry(self):
+        return self.rect
+
+
+class FakeApp:
+    def __init__(self, screens):
+        self.screen_list = screens
+        self.screenAdded = FakeSignal()
+        self.screenRemoved = FakeSignal()
+
+    def screens(self):
+        return self.screen_list
+
+
+def make_geometry(monkeypatch, *rects, rng=random):
+    app = FakeApp([FakeScreen(*rect) for rect in rects])
+    monkeypatch.setattr(screen_geometry.QApplication, "instance", staticmethod(lambda: app))
+    return ScreenGeometry(rng), app
+
+
+def test_points_map_to_the_screen_under_them(monkeypatch):
+    # A 1920x1080 screen with a taller 1080x1920 one to its right, top-aligned
+    geometry, _ = make_geometry(monkeypatch, (0, 0, 1920, 1080), (1920, 0, 1080, 1920))
+    assert geometry.screen_index_at(0, 0) == 0
+    assert geometry.screen_index_at(1919, 1079) == 0
+    assert geometry.screen_index_at(1920, 0) == 1
+    assert geometry.screen_index_at(2000, 1500) == 1
+    assert geometry.screen_index_at(100, 1500) is None  # Below the shorter screen
+    assert geometry.screen_index_at(-1, 0) is None
+
+
+def test_points_off_every_screen_use_the_nearest(monkeypatch):
+    geometry, _ = make_geometry(monkeypatch, (0, 0, 1920, 1080), (1920, 0, 1080, 1920))
+    assert geometry.nearest_screen_index(100, 1500) == 0
+    assert geometry.nearest_screen_index(1900, 1500) == 1
+    assert geometry.geometry_at(-500, -500) == QRect(0, 0, 1920, 1080)
+
+
+def test_clamp_keeps_a_rectangle_on_the_screen_under_its_center(monkeypatch):
+    geometry, _ = make_geometry(monkeypatch, (0, 0, 1920, 1080), (1920, 0, 1080, 1920))
+    assert geometry.clamp(-50, -50, 100, 100) == (0, 0)
+    assert geometry.clamp(1850, 100, 100, 100) == (1820, 100)  # Center still on the left screen
+    assert geometry.clamp(1900, 100, 100, 100) == (1920, 100)  # Center on the right screen
+    assert geometry.clamp(2950, 1900, 100, 100, margin=10) == (2890, 1810)
+
+
+def test_layout_is_rebuilt_only_after_a_change(monkeypatch):
+    geometry, app = make_geometry(monkeypatch, (0, 0, 800, 600))
+    assert geometry.rects_snapshot() == [(0, 0, 800, 600)]
+    app.screen_list.append(FakeScreen(800, 0, 800, 600))
+    assert geometry.screen_index_at(900, 10) is None  # Still the cached layout
+    app.screenAdded.emit(app.screen_list[-1])
+    assert geometry.screen_index_at(900, 10) == 1
+    app.screen_list[1].rect = QRect(-800, 0, 800, 600)
+    app.screen_list[1].geometryChanged.emit()
+    assert geometry.screen_index_at(-10, 10) == 1
+
+
+def test_no_screens_falls_back_to_a_default_area(monkeypatch):
+    geometry, _ = make_geometry(monkeypatch)
+    assert geometry.rects_snapshot() == [(0, 0, 800, 600)]
+
+
+def test_random_positions_fit_on_a_screen(monkeypatch):
+    geometry, _ = make_geometry(monkeypatch, (0, 0, 1920, 1080), (1920, 0, 1080, 1920), rng=random.Random(1))
+    for _ in range(200):
+        x, y = geometry.random_position(150, 150)
+        index = geometry.screen_index_at(x, y)
+        assert index is not None
+        left, top, right, bottom = geometry.rects_snapshot()[index]
+        assert x + 150 <= right and y + 150 <= bottom
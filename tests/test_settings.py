@@ -0,0 +1,39 @@
+import dataclasses
+
+import pytest
+
+from utils.settings import Settings, DEFAULT_SETTINGS
+
+
+def test_defaults_round_trip_through_dicts():
+    data = DEFAULT_SETTINGS.to_dict()
+    assert data["last_position"] == [300, 300]
+    assert Settings.from_dict(data) == DEFAULT_SETTINGS
+
+
+def test_numbers_are_clamped_to_their_bounds():
+    settings = Settings.from_dict({"pet_size": 10, "transparency": 999, "speaking_interval": "7"})
+    assert (settings.pet_size, settings.transparency, settings.speaking_interval) == (50, 255, 7)
+    assert settings.speaking_interval_seconds == 420
+
+
+def test_bad_values_fall_back_to_defaults():
+    settings = Settings.from_dict({"pet_size": True, "auto_spawn": "yes", "skin": 3,
+                                   "spawn_interval": "soon", "last_position": [1]})
+    assert settings == DEFAULT_SETTINGS
+
+
+def test_unknown_keys_are_ignored():
+    assert Settings.from_dict({"favorite_snack": "cookie"}) == DEFAULT_SETTINGS
+
+
+def test_last_position_becomes_an_int_tuple():
+    assert Settings.from_dict({"last_position": [10.7, "20"]}).last_position == (10, 20)
+
+
+def test_settings_are_immutable_and_changes_are_new_objects():
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        DEFAULT_SETTINGS.pet_size = 200
+    bigger = DEFAULT_SETTINGS.with_values(pet_size=200, skin="milk")
+    assert DEFAULT_SETTINGS.pet_size == 150
+    assert bigger.changed_fields(DEFAULT_SETTINGS) == {"pet_size", "skin"}
@@ -0,0 +1,74 @@
+import os
+import json
+import zipfile
+
+import pytest
+from PyQt5.QtCore import QSize
+
+from animation.frame_player import FrameCache
+from animation.skins import SkinLibrary, SkinPack, SkinError, MANIFEST
+from utils.assets import AssetRegistry, ASSETS_DIR
+
+IDLE_GIF = os.path.join(ASSETS_DIR, "mocha_gifs", "idle.gif")
+
+
+def write_pack(path, animations, manifest=True):
+    with zipfile.ZipFile(path, "w") as archive:
+        if manifest:
+            archive.writestr(MANIFEST, json.dumps({"name": "Milk", "animations": animations}))
+        archive.write(IDLE_GIF, "idle.gif")
+
+
+@pytest.fixture
+def library(tmp_path):
+    (tmp_path / "skins").mkdir()
+    write_pack(tmp_path / "skins" / "milk.zip", {"idle": "idle.gif", "sleeping": "missing.gif"})
+    write_pack(tmp_path / "skins" / "broken.zip", {}, manifest=False)
+    (tmp_path / "skins" / "junk.zip").write_bytes(b"not a zip")
+    return SkinLibrary(AssetRegistry(str(tmp_path)), FrameCache())
+
+
+def test_available_lists_packs_without_opening_them(library):
+    assert library.available() == ["broken", "junk", "milk"]
+    assert library.active is None
+
+
+def test_select_maps_only_members_that_exist(library):
+    pack = library.select("milk")
+    assert pack.title == "Milk"
+    assert list(pack.gifs) == ["idle"]
+    assert pack.gifs["idle"].path.endswith("milk.zip/idle.gif")
+    assert library.select("milk") is pack
+
+
+def test_frames_decode_from_the_archive(library):
+    pack = library.select("milk")
+    gif = pack.gifs["idle"]
+    frames = library.cache.get(gif.path, QSize(16, 16), 1.0)
+    assert frames.frame_count == 4
+    assert gif.stamp == pack.asset.stamp
+
+
+def test_switching_back_releases_the_pack(library):
+    pack = library.select("milk")
+    path = pack.gifs["idle"].path
+    library.cache.get(path, QSize(16, 16), 1.0)
+    assert library.select("") is None
+    assert path not in library.cache.sources
+    assert not library.cache.entries
+    assert pack.archive.fp is None  # Closed
+
+
+def test_unusable_packs_fall_back_to_the_default(library):
+    for name in ("broken", "junk", "nowhere"):
+        assert library.select(name) is None
+    with pytest.raises(SkinError):
+        SkinPack(library.registry.get("skins/broken.zip"))
+
+
+def test_reload_reopens_the_active_pack(library):
+    first = library.select("milk")
+    second = library.reload()
+    assert second is not first and second.name == "milk"
+    assert library.active is second
+    assert second.gifs["idle"].path in library.cache.sources
@@ -0,0 +1,128 @@
+import os
+import shutil
+import threading
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+from PyQt5.QtCore import QSize
+
+from animation.frame_player import FrameCache, decode_gif, AnimationFrames
+from core import snapshot
+from core.snapshot import Snapshot, load_snapshot, save_snapshot, prewarm_frames, STATE_MAX_AGE_SECONDS
+from utils.assets import AssetRegistry, ASSETS_DIR
+from utils.clock import VirtualClock
+
+SIZE = QSize(16, 16)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Two real GIFs in a scratch assets directory"""
+    root = tmp_path / "assets"
+    (root / "mocha_gifs").mkdir(parents=True)
+    for name in ("idle.gif", "dance1.gif"):
+        shutil.copy(os.path.join(ASSETS_DIR, "mocha_gifs", name), root / "mocha_gifs" / name)
+    registry = AssetRegistry(str(root))
+    monkeypatch.setattr(snapshot, "assets", registry)
+    return registry
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = FrameCache()
+    monkeypatch.setattr(snapshot, "frame_cache", cache)
+    return cache
+
+
+def frames_for(asset, cache):
+    images, delays = decode_gif(asset.path, SIZE)
+    frames = AnimationFrames(asset.path, images, delays)
+    cache.store(asset.path, SIZE, 1.0, frames)
+    return frames
+
+
+def active_timer(clock, ms):
+    timer = clock.timer()
+    timer.start(ms)
+    return timer
+
+
+def make_pet(registry, cache):
+    clock = VirtualClock()
+    idle, dance = registry.get("mocha_gifs/idle.gif"), registry.get("mocha_gifs/dance1.gif")
+    frames_for(idle, cache)
+    frames_for(dance, cache)
+    gif_manager = SimpleNamespace(current_key="dancing", current_gif=dance, gifs={"idle": idle},
+                                  animation_timer=active_timer(clock, 1500), revert_key="idle", gif_size=SIZE,
+                                  device_ratio=lambda: 1.0)
+    batch_cache = SimpleNamespace(lock=threading.Lock(), queues={"random": deque([(1.0, "Hi!")])})
+    return SimpleNamespace(clock=clock, gif_manager=gif_manager, is_drinking=False, drinking_timer=None,
+                           is_angry=True, angry_timer=active_timer(clock, 30000),
+                           last_message_time=12.5, gemini_service=SimpleNamespace(batch_cache=batch_cache))
+
+
+def test_state_and_frames_round_trip(registry, cache, tmp_path):
+    pet = make_pet(registry, cache)
+    path = str(tmp_path / "snapshot.dat")
+    assert save_snapshot(pet, path)
+
+    loaded = load_snapshot(path)
+    state = loaded.state
+    assert state["animation"] == "dancing" and state["revert_to"] == "idle"
+    assert state["animation_remaining_ms"] == 1500 and state["angry_remaining_ms"] == 30000
+    assert state["drinking_remaining_ms"] == 0 and state["last_message_time"] == 12.5
+    assert state["pending_messages"] == {"random": [[1.0, "Hi!"]]}
+    assert sorted(tuple(key) for key in state["warm_frames"]) == sorted(cache.entries)
+
+    assert [frames.path for frames in loaded.animations] == [pet.gif_manager.current_gif.path,
+                                                             pet.gif_manager.gifs["idle"].path]
+    for frames in loaded.animations:
+        original = cache.entries[(frames.path, SIZE.width(), SIZE.height(), 1.0)]
+        assert frames.images == original.images
+        assert frames.delays == original.delays
+        assert frames.dirty_rects == original.dirty_rects
+
+
+def test_frames_of_a_changed_gif_are_skipped(registry, cache, tmp_path):
+    pet = make_pet(registry, cache)
+    path = str(tmp_path / "snapshot.dat")
+    save_snapshot(pet, path)
+    idle = registry.get("mocha_gifs/idle.gif")
+    with open(idle.path, "ab") as f:
+        f.write(b"\0")
+    idle.refresh()
+    assert [frames.path for frames in load_snapshot(path).animations] == [pet.gif_manager.current_gif.path]
+
+
+def test_missing_or_foreign_files_load_as_nothing(tmp_path):
+    assert load_snapshot(str(tmp_path / "none.dat")) is None
+    (tmp_path / "junk.dat").write_bytes(b"not a snapshot")
+    assert load_snapshot(str(tmp_path / "junk.dat")) is None
+
+
+def test_state_is_resumed_only_while_fresh():
+    saved = Snapshot({"saved_at": 1000.0}, [])
+    assert saved.is_fresh(1000.0 + STATE_MAX_AGE_SECONDS)
+    assert not saved.is_fresh(1000.0 + STATE_MAX_AGE_SECONDS + 1)
+
+
+def test_install_frames_fills_the_cache(registry, cache):
+    idle = registry.get("mocha_gifs/idle.gif")
+    frames = frames_for(idle, FrameCache())
+    Snapshot({}, [frames]).install_frames(cache)
+    assert cache.get(idle.path, SIZE, 1.0) is frames
+
+
+def test_prewarm_decodes_one_animation_per_tick_on_the_clock(registry, cache):
+    clock = VirtualClock()
+    keys = [[registry.get(name).path, 16, 16, 1.0] for name in ("mocha_gifs/idle.gif", "mocha_gifs/dance1.gif")]
+    keys.append([os.path.join(registry.root, "gone.gif"), 16, 16, 1.0])
+    timer = prewarm_frames(keys, clock, cache, interval_ms=50)
+    assert not cache.entries
+    clock.advance(0.05)
+    assert list(cache.entries) == [tuple(keys[0])]
+    clock.advance(0.05)
+    assert set(cache.entries) == {tuple(keys[0]), tuple(keys[1])}
+    clock.advance(0.05)
+    assert not timer.isActive()
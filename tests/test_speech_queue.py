@@ -0,0 +1,92 @@
+from ui.speech_queue import SpeechQueue
+from utils.clock import VirtualClock
+from utils.quota import PRIORITY_USER, PRIORITY_BACKGROUND
+
+
+def make_queue(**kwargs):
+    clock = VirtualClock()
+    shown, updated = [], []
+    queue = SpeechQueue(shown.append, updated.append, min_display_ms=1000,
+                        clock=clock.monotonic, timer_factory=clock.timer, **kwargs)
+    return queue, clock, shown, updated
+
+
+def test_first_message_shows_at_once():
+    queue, _, shown, _ = make_queue()
+    queue.post("hello")
+    assert shown == ["hello"]
+
+
+def test_waiting_messages_show_by_priority_then_age():
+    queue, clock, shown, _ = make_queue()
+    queue.post("on screen")
+    queue.post("background", PRIORITY_BACKGROUND)
+    queue.post("user one", PRIORITY_USER)
+    queue.post("user two", PRIORITY_USER)
+    for _ in range(3):
+        clock.advance(1)
+    assert shown == ["on screen", "user one", "user two", "background"]
+
+
+def test_min_display_time_is_kept():
+    queue, clock, shown, _ = make_queue()
+    queue.post("first")
+    clock.advance(0.5)
+    queue.post("second")
+    clock.advance(0.49)
+    assert shown == ["first"]
+    clock.advance(0.01)
+    assert shown == ["first", "second"]
+
+
+def test_placeholder_answer_replaces_in_place():
+    queue, _, shown, updated = make_queue()
+    queue.post("thinking...", tag=7, placeholder=True)
+    queue.post("the answer", tag=7)
+    assert shown == ["thinking..."]
+    assert updated == ["the answer"]
+    assert queue.current.text == "the answer"
+
+
+def test_duplicates_are_coalesced():
+    queue, _, _, _ = make_queue()
+    queue.post("same")
+    queue.post("same")
+    queue.post("other")
+    queue.post("other")
+    assert len(queue.pending) == 1
+    assert queue.stats["coalesced"] == 2
+
+
+def test_overflow_drops_the_least_important_oldest():
+    queue, _, _, _ = make_queue(max_pending=2)
+    queue.post("on screen")
+    queue.post("old background", PRIORITY_BACKGROUND)
+    queue.post("new background", PRIORITY_BACKGROUND)
+    queue.post("user", PRIORITY_USER)
+    assert [item.text for item in queue.pending] == ["new background", "user"]
+    assert queue.stats["dropped"] == 1
+
+
+def test_streaming_answer_is_not_preempted_until_its_last_chunk():
+    queue, clock, shown, updated = make_queue()
+    queue.post("Once", tag=3, streaming=True)
+    queue.post("waiting")
+    clock.advance(5)
+    assert shown == ["Once"]
+    queue.post("Once upon", tag=3, streaming=True)
+    clock.advance(5)
+    queue.post("Once upon a time.", tag=3)
+    clock.advance(0.99)
+    assert shown == ["Once"]
+    clock.advance(0.01)
+    assert shown == ["Once", "waiting"]
+    assert updated == ["Once upon", "Once upon a time."]
+
+
+def test_hiding_the_bubble_shows_the_next_message():
+    queue, _, shown, _ = make_queue()
+    queue.post("first")
+    queue.post("second")
+    queue.on_hidden()
+    assert shown == ["first", "second"]
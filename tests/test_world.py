@@ -0,0 +1,37 @@
+from core import world as world_kinds
+from core.world import World
+
+
+def test_overlapping_pairs_matches_kinds_and_boxes():
+    world = World()
+    pet = world.add(world_kinds.PET, 0, 0, 100, 100)
+    touching = world.add(world_kinds.FOOD, 90, 90, 50, 50)
+    world.add(world_kinds.FOOD, 100, 0, 50, 50)  # Shares an edge only
+    world.add(world_kinds.PET, 10, 10, 50, 50)  # Overlaps the pet, but is no food
+    assert world.overlapping_pairs(world_kinds.PET, world_kinds.FOOD) == [(pet, touching)]
+
+
+def test_removed_slots_stop_colliding_and_are_reused():
+    world = World()
+    world.add(world_kinds.PET, 0, 0, 100, 100)
+    food = world.add(world_kinds.FOOD, 10, 10, 10, 10)
+    world.remove(food)
+    assert world.overlapping_pairs(world_kinds.PET, world_kinds.FOOD) == []
+    assert world.add(world_kinds.FOOD, 500, 500, 10, 10) == food
+
+
+def test_positions_follow_set_position():
+    world = World()
+    pet = world.add(world_kinds.PET, 0, 0, 100, 100)
+    food = world.add(world_kinds.FOOD, 500, 500, 10, 10)
+    assert world.overlapping_pairs(world_kinds.PET, world_kinds.FOOD) == []
+    world.set_position(pet, 450, 450)
+    assert world.overlapping_pairs(world_kinds.PET, world_kinds.FOOD) == [(pet, food)]
+
+
+def test_world_grows_past_its_capacity():
+    world = World(capacity=2)
+    slots = [world.add(world_kinds.FOOD, i * 10, 0, 5, 5) for i in range(5)]
+    assert slots == [0, 1, 2, 3, 4]
+    assert world.capacity >= 5
+    assert world.count(world_kinds.FOOD) == 5
@@ -1,15 +1,22 @@
 """
 Milk bottle UI component for feeding the pet
 """
-import os
-from PyQt5.QtWidgets import QWidget, QLabel, QApplication
-from PyQt5.QtGui import QMovie
-from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QSize
+
+from animation.frame_player import FramePlayer, frame_cache
+from core import world as world_kinds
+from utils.assets import assets
 
 
 class MilkBottle(QWidget):
     """Interactive milk bottle widget"""
     
+    BOTTLE_SIZE = QSize(50, 50)  # Logical pixels
+    BOTTLE_GIF = "food_gifs/milk_bottle.gif"
+    SPAWN_POSITION = (300, 300)  # Where bottles appear unless the pet is sitting there
+    SPAWN_ATTEMPTS = 20
+    
     def __init__(self, pet):
         super().__init__()
         self.pet = pet
@@ -23,59 +30,78 @@ class MilkBottle(QWidget):
         self.drag_start_position = None
         
         # Create the bottle label
-        self.bottle_label = QLabel(self)
-        self.bottle_label.setAlignment(Qt.AlignCenter)
+        self.bottle_label = FramePlayer(self)
+        
+        # Register with the world; the pet's world tick checks collisions
+        self.world_slot = self.pet.world.add(world_kinds.FOOD, 0, 0, 0, 0, self)
         
         # Set up the bottle animation
         self.setup_bottle_animation()
         
         # Set initial position
-        self.move(300, 300)
-        
-        # Start collision checking
-        self.collision_timer = QTimer()
-        self.collision_timer.timeout.connect(self.check_collision)
-        self.collision_timer.start(100)  # Check every 100ms
+        self.move(*self.spawn_position())
         
         self.show()
+        
+        # The real screen is only known once the window exists; follow it across screens too
+        self.refresh_frames()
+        self.windowHandle().screenChanged.connect(self.refresh_frames)
+    
+    def spawn_position(self):
+        """The usual spot, or a random one on screen if the pet would eat the bottle as it appears"""
+        width, height = self.BOTTLE_SIZE.width(), self.BOTTLE_SIZE.height()
+        x, y = self.SPAWN_POSITION
+        for _ in range(self.SPAWN_ATTEMPTS):
+            left, top, right, bottom = self.pet.get_position_bbox()
+            if x >= right or x + width <= left or y >= bottom or y + height <= top:
+                break
+            x, y = self.pet.screens.random_position(width, height)
+        return x, y
     
     def setup_bottle_animation(self):
         """Set up the bottle GIF animation"""
-        gif_path = "assets/food_gifs/milk_bottle.gif"
-        if os.path.exists(gif_path):
-            self.movie = QMovie(gif_path)
-            
-            # Scale the movie to desired size
-            bottle_size = QSize(50, 50)
-            self.movie.setScaledSize(bottle_size)
-            
+        gif = assets.get(self.BOTTLE_GIF)
+        if gif.exists:
             # Set up the label
-            self.bottle_label.setMovie(self.movie)
+            bottle_size = self.BOTTLE_SIZE
             self.bottle_label.setFixedSize(bottle_size)
             self.setFixedSize(bottle_size)
             
             # Start the animation
-            self.movie.start()
+            self.refresh_frames()
         else:
-            print(f"Bottle GIF not found: {gif_path}")
+            print(f"Bottle GIF not found: {gif.path}")
+    
+    def refresh_frames(self, *args):
+        """Play frames rendered at the device pixel ratio of the bottle's current screen"""
+        gif = assets.get(self.BOTTLE_GIF)
+        if not gif.exists:
+            return
+        frames = frame_cache.get(gif.path, self.BOTTLE_SIZE, self.devicePixelRatioF())
+        if frames is not self.bottle_label.frames:
+            self.bottle_label.set_frames(frames, self.bottle_label.frame_index)
     
     def get_position_bbox(self):
         """Get bounding box for collision detection"""
-        return (self.x(), self.y(), self.x() + self.width(), self.y() + self.height())
+        return self.pet.world.bbox(self.world_slot)
     
-    def check_collision(self):
-        """Check for collision with pet"""
-        bottle_box = self.get_position_bbox()
-        pet_box = self.pet.get_position_bbox()
-        
-        if (bottle_box[0] < pet_box[2] and
-            bottle_box[2] > pet_box[0] and
-            bottle_box[1] < pet_box[3] and
-            bottle_box[3] > pet_box[1]):
-            # Collision detected
-            self.pet.feed_pet()
-            self.pet.remove_bottle(self)
-            self.close()
+    def collide_with_pet(self):
+        """Called by the world tick when the bottle overlaps the pet"""
+        self.pet.feed_pet()
+        self.pet.remove_bottle(self)
+        self.close()
+    
+    def moveEvent(self, event):
+        """Mirror the widget position into the world model"""
+        if self.world_slot is not None:
+            self.pet.world.set_position(self.world_slot, self.x(), self.y())
+        super().moveEvent(event)
+    
+    def resizeEvent(self, event):
+        """Mirror the widget size into the world model"""
+        if self.world_slot is not None:
+            self.pet.world.set_size(self.world_slot, self.width(), self.height())
+        super().resizeEvent(event)
     
     def mousePressEvent(self, event):
         """Handle mouse press for dragging"""
@@ -89,10 +115,8 @@ class MilkBottle(QWidget):
         if event.buttons() == Qt.LeftButton and self.drag_start_position:
             new_pos = event.globalPos() - self.drag_start_position
             
-            # Keep within screen bounds
-            screen = QApplication.primaryScreen().availableGeometry()
-            new_x = max(0, min(new_pos.x(), screen.width() - self.width()))
-            new_y = max(0, min(new_pos.y(), screen.height() - self.height()))
+            # Keep within the bounds of whichever screen the bottle is over
+            new_x, new_y = self.pet.screens.clamp(new_pos.x(), new_pos.y(), self.width(), self.height())
             
             self.move(new_x, new_y)
             
@@ -111,12 +135,12 @@ class MilkBottle(QWidget):
     
     def closeEvent(self, event):
         """Handle window close event"""
-        # Stop collision timer
-        if hasattr(self, 'collision_timer'):
-            self.collision_timer.stop()
+        # Leave the world so collisions stop
+        if self.world_slot is not None:
+            self.pet.world.remove(self.world_slot)
+            self.world_slot = None
         
-        # Stop movie
-        if hasattr(self, 'movie'):
-            self.movie.stop()
+        # Stop animation
+        self.bottle_label.stop()
         
         super().closeEvent(event)
@@ -3,7 +3,7 @@ Simple settings window for Milk Mocha Pet
 """
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QCheckBox, QSpinBox, QPushButton, QGroupBox)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 
 
 class SettingsWindow(QDialog):
@@ -12,11 +12,16 @@ class SettingsWindow(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Milk Mocha Pet Settings")
-        self.setFixedSize(400, 300)
+        self.setFixedSize(400, 420)
         self.setWindowFlags(Qt.Dialog | Qt.WindowCloseButtonHint)
         
         # Store reference to config (we'll get it from the pet)
         self.config = None
+        self.quota = None
+        
+        # Refresh the AI budget display while the window is open
+        self.quota_timer = QTimer(self)
+        self.quota_timer.timeout.connect(self.refresh_quota)
         self.init_ui()
     
     def init_ui(self):
@@ -44,6 +49,14 @@ class SettingsWindow(QDialog):
         speaking_group.setLayout(speaking_layout)
         layout.addWidget(speaking_group)
         
+        # AI budget group (read-only)
+        budget_group = QGroupBox("AI Request Budget")
+        budget_layout = QVBoxLayout()
+        self.quota_label = QLabel("Budget information unavailable")
+        budget_layout.addWidget(self.quota_label)
+        budget_group.setLayout(budget_layout)
+        layout.addWidget(budget_group)
+        
         # Behavior settings group
         behavior_group = QGroupBox("Behavior Settings")
         behavior_layout = QVBoxLayout()
@@ -53,6 +66,16 @@ class SettingsWindow(QDialog):
         self.auto_spawn.setChecked(True)
         behavior_layout.addWidget(self.auto_spawn)
         
+        # Pet size
+        size_layout = QHBoxLayout()
+        size_layout.addWidget(QLabel("Pet size (pixels):"))
+        self.pet_size = QSpinBox()
+        self.pet_size.setRange(50, 400)
+        self.pet_size.setSingleStep(10)
+        self.pet_size.setValue(150)
+        size_layout.addWidget(self.pet_size)
+        behavior_layout.addLayout(size_layout)
+        
         behavior_group.setLayout(behavior_layout)
         layout.addWidget(behavior_group)
         
@@ -75,25 +98,43 @@ class SettingsWindow(QDialog):
         """Load settings from config"""
         self.config = config
         
-        # Load values from config
-        self.speaking_enabled.setChecked(config.get("milk_mocha_speaking", True))
-        self.speaking_interval.setValue(config.get("speaking_interval", 15))
-        self.auto_spawn.setChecked(config.get("auto_spawn", True))
+        # Load values from the validated settings
+        settings = config.settings
+        self.speaking_enabled.setChecked(settings.milk_mocha_speaking)
+        self.speaking_interval.setValue(settings.speaking_interval)
+        self.auto_spawn.setChecked(settings.auto_spawn)
+        self.pet_size.setValue(settings.pet_size)
     
     def save_settings(self):
         """Save settings to config"""
         if self.config:
-            # Save values to config
-            self.config.set("milk_mocha_speaking", self.speaking_enabled.isChecked())
-            self.config.set("speaking_interval", self.speaking_interval.value())
-            self.config.set("auto_spawn", self.auto_spawn.isChecked())
-            self.config.save()
+            # Save values to config; the running pet applies whatever changed
+            self.config.apply({
+                "milk_mocha_speaking": self.speaking_enabled.isChecked(),
+                "speaking_interval": self.speaking_interval.value(),
+                "auto_spawn": self.auto_spawn.isChecked(),
+                "pet_size": self.pet_size.value(),
+            })
         
         self.close()
     
-    def show_with_config(self, config):
+    def refresh_quota(self):
+        """Show the current Gemini request budget"""
+        if self.quota:
+            self.quota_label.setText(self.quota.describe())
+    
+    def closeEvent(self, event):
+        """Stop refreshing the budget once closed"""
+        self.quota_timer.stop()
+        super().closeEvent(event)
+    
+    def show_with_config(self, config, quota=None):
         """Show the settings window with current config"""
         self.load_settings(config)
+        self.quota = quota
+        if quota:
+            self.refresh_quota()
+            self.quota_timer.start(1000)
         self.show()
         self.raise_()
         self.activateWindow()
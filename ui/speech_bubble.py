@@ -1,59 +1,167 @@
 """
 Speech bubble UI component for Milk Mocha Pet
 """
-from PyQt5.QtWidgets import QWidget, QLabel
-from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve
+import math
+from collections import OrderedDict
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QFont, QFontMetrics, QColor, QPainter, QPen, QPixmap, QStaticText, QTextOption, QTransform
+from PyQt5.QtCore import Qt, QRectF, QPointF, QPropertyAnimation, QEasingCurve
+
+# Bubble geometry in logical pixels
+MIN_WIDTH = 200
+MAX_WIDTH = 300
+MIN_HEIGHT = 80
+TEXT_MARGIN_X = 20   # Between the border and the wrapped text, each side
+TEXT_MARGIN_Y = 25
+CORNER_RADIUS = 20
+BORDER_WIDTH = 3
+SHADOW_SIZE = 8      # Transparent margin around the bubble that holds its shadow
+SHADOW_OFFSET = 4    # The shadow falls this far below the bubble
+
+FILL_COLOR = QColor(255, 255, 255, 250)
+BORDER_COLOR = QColor("#4CAF50")
+TEXT_COLOR = QColor("#000000")
+
+# Cached layouts and frames kept before the least recently used is dropped
+LAYOUT_CACHE_SIZE = 128
+FRAME_CACHE_SIZE = 16
+
+
+def bubble_font():
+    font = QFont("Arial")
+    font.setPixelSize(14)
+    font.setBold(True)
+    return font
+
+
+class BubbleLayout:
+    """A message laid out once: its prepared text and the bubble size around it"""
+
+    __slots__ = ("text", "width", "height")
+
+    def __init__(self, text, width, height):
+        self.text = text
+        self.width = width
+        self.height = height
+
+
+class TextLayoutCache:
+    """Bubble layouts per (message, font, width), least recently used dropped first
+
+    Laying out wraps the text once into a QStaticText, so painting it again,
+    or showing the same message later, does no text measurement at all.
+    """
+
+    def __init__(self, max_entries=LAYOUT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, message, font, max_width=MAX_WIDTH):
+        key = (message, font.key(), max_width)
+        layout = self.entries.get(key)
+        if layout is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return layout
+        self.misses += 1
+        layout = self._lay_out(message, font, max_width)
+        self.entries[key] = layout
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return layout
+
+    @staticmethod
+    def _lay_out(message, font, max_width):
+        # Short messages get a narrower bubble; long ones wrap at the maximum width
+        natural_width = QFontMetrics(font).horizontalAdvance(message)
+        width = min(max(natural_width + 3 * TEXT_MARGIN_X, MIN_WIDTH), max_width)
+
+        option = QTextOption(Qt.AlignHCenter)
+        option.setWrapMode(QTextOption.WordWrap)
+        text = QStaticText(message)
+        text.setTextFormat(Qt.PlainText)
+        text.setTextOption(option)
+        text.setTextWidth(width - 2 * TEXT_MARGIN_X)
+        text.prepare(QTransform(), font)
+
+        height = max(math.ceil(text.size().height()) + 2 * TEXT_MARGIN_Y, MIN_HEIGHT)
+        return BubbleLayout(text, width, height)
+
+
+def _paint_frame(width, height, device_ratio):
+    """The bubble's shadow, fill and border, without text"""
+    pixmap = QPixmap(round((width + 2 * SHADOW_SIZE) * device_ratio),
+                     round((height + 2 * SHADOW_SIZE) * device_ratio))
+    pixmap.setDevicePixelRatio(device_ratio)
+    pixmap.fill(Qt.transparent)
+
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    body = QRectF(SHADOW_SIZE, SHADOW_SIZE, width, height)
+
+    # Soft shadow: stacked translucent outlines, darkest nearest the bubble
+    painter.setBrush(Qt.NoBrush)
+    for step in range(SHADOW_SIZE, 0, -1):
+        painter.setPen(QPen(QColor(0, 0, 0, 100 // (step + 1)), 2))
+        shadow = body.translated(0, SHADOW_OFFSET).adjusted(-step / 2, -step / 2, step / 2, step / 2)
+        painter.drawRoundedRect(shadow, CORNER_RADIUS + step / 2, CORNER_RADIUS + step / 2)
+
+    inset = BORDER_WIDTH / 2
+    painter.setPen(QPen(BORDER_COLOR, BORDER_WIDTH))
+    painter.setBrush(FILL_COLOR)
+    painter.drawRoundedRect(body.adjusted(inset, inset, -inset, -inset), CORNER_RADIUS, CORNER_RADIUS)
+    painter.end()
+    return pixmap
+
+
+class BubbleFrameCache:
+    """Painted bubble frames per (width, height, devicePixelRatio)"""
+
+    def __init__(self, max_entries=FRAME_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, width, height, device_ratio):
+        key = (width, height, device_ratio)
+        pixmap = self.entries.get(key)
+        if pixmap is None:
+            pixmap = _paint_frame(width, height, device_ratio)
+            self.entries[key] = pixmap
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return pixmap
+
+
+# Shared by every bubble, so a repeated message or size is only ever prepared once
+layout_cache = TextLayoutCache()
+frame_cache = BubbleFrameCache()
 
 
 class SpeechBubble(QWidget):
-    """Speech bubble widget for displaying Gemini messages"""
+    """Speech bubble widget for displaying Gemini messages
+    
+    Painted by hand: a cached frame pixmap plus the cached text layout, so
+    showing a message involves no stylesheet and no repeated measurement.
+    """
     
     def __init__(self, message, pet_parent=None):
         super().__init__(None)  # No Qt parent for independent window
         self.message = message
         self.pet_parent = pet_parent  # Reference to MilkMochaPet for communication
+        self.text_font = bubble_font()
+        self.text_layout = None
         
         # Set up window properties for better visibility
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setAttribute(Qt.WA_ShowWithoutActivating)
         
-        # Create label for text
-        self.label = QLabel(self)
-        self.label.setText(message)
-        self.label.setWordWrap(True)
-        self.label.setAlignment(Qt.AlignCenter)
-        
-        # Enhanced styling for better visibility
-        self.label.setStyleSheet("""
-            QLabel {
-                background-color: rgba(255, 255, 255, 250);
-                border: 3px solid #4CAF50;
-                border-radius: 20px;
-                padding: 15px;
-                font-family: Arial, sans-serif;
-                font-size: 14px;
-                color: #000;
-                font-weight: bold;
-                box-shadow: 0px 4px 8px rgba(0, 0, 0, 100);
-            }
-        """)
-        
-        # Calculate size based on text with better sizing
-        font_metrics = self.label.fontMetrics()
-        text_width = font_metrics.boundingRect(message).width()
-        
-        # Set bubble size (increased for better visibility)
-        bubble_width = min(max(text_width + 60, 200), 300)
-        bubble_height = 80
-        
-        # Calculate required height for wrapped text
-        text_rect = font_metrics.boundingRect(0, 0, bubble_width - 40, 1000, Qt.TextWordWrap, message)
-        required_height = max(text_rect.height() + 50, bubble_height)
-        
-        self.setFixedSize(bubble_width, required_height)
-        self.label.setFixedSize(bubble_width, required_height)
+        # Size the bubble for its text
+        self.resize_for_message(message)
         
         # Make widget focusable and ensure it's visible
         self.setFocusPolicy(Qt.NoFocus)
@@ -62,6 +170,31 @@ class SpeechBubble(QWidget):
         # Add fade-in animation
         self.fade_in()
     
+    def resize_for_message(self, message):
+        """Size the bubble so the wrapped message fits"""
+        self.text_layout = layout_cache.get(message, self.text_font)
+        self.setFixedSize(self.text_layout.width + 2 * SHADOW_SIZE, self.text_layout.height + 2 * SHADOW_SIZE)
+    
+    def set_message(self, message):
+        """Replace the text in place (used while a response streams in)"""
+        if message == self.message:
+            return
+        self.message = message
+        self.resize_for_message(message)
+        self.update()
+    
+    def paintEvent(self, event):
+        layout = self.text_layout
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, frame_cache.get(layout.width, layout.height, self.devicePixelRatioF()))
+        painter.setFont(self.text_font)
+        painter.setPen(TEXT_COLOR)
+        # Centre the wrapped text vertically inside the bubble
+        text_height = layout.text.size().height()
+        painter.drawStaticText(QPointF(SHADOW_SIZE + TEXT_MARGIN_X,
+                                       SHADOW_SIZE + (layout.height - text_height) / 2), layout.text)
+        painter.end()
+    
     def fade_in(self):
         """Animate fade-in effect"""
         self.setWindowOpacity(0.0)
@@ -0,0 +1,130 @@
+"""
+Prioritised queue of messages waiting for the speech bubble
+"""
+import time
+import itertools
+from PyQt5.QtCore import QTimer
+
+from utils.quota import PRIORITY_USER, PRIORITY_NAMES
+
+# A message stays up at least this long before a queued one may replace it
+MIN_DISPLAY_MS = 3000
+
+# Messages waiting beyond this are dropped, least important and oldest first
+MAX_PENDING = 5
+
+
+class SpeechItem:
+    """One message for the bubble; items sharing a tag belong to one request"""
+
+    __slots__ = ("text", "priority", "tag", "placeholder", "streaming", "seq")
+
+    def __init__(self, text, priority, tag, placeholder, seq, streaming=False):
+        self.text = text
+        self.priority = priority
+        self.tag = tag
+        self.placeholder = placeholder
+        self.streaming = streaming  # More of the text is still on its way
+        self.seq = seq
+
+
+class SpeechQueue:
+    """Decides what the speech bubble shows and when - MAIN THREAD ONLY
+
+    The bubble on screen is never replaced before MIN_DISPLAY_MS. Waiting
+    messages are shown best priority first (utils.quota order), oldest first
+    within a priority. An answer posted with its placeholder's tag replaces
+    the placeholder wherever it is, in place if it is on screen, and a text
+    already on screen or waiting is not queued twice. A streamed answer is
+    not replaced until its last chunk has arrived, and then stays up for
+    MIN_DISPLAY_MS more.
+
+    show(text) puts a new message up; update(text) changes the one on screen.
+    """
+
+    def __init__(self, show, update, min_display_ms=MIN_DISPLAY_MS, max_pending=MAX_PENDING,
+                 clock=time.monotonic, timer_factory=QTimer):
+        self.show = show
+        self.update = update
+        self.min_display_ms = min_display_ms
+        self.max_pending = max_pending
+        self.clock = clock
+        self.pending = []
+        self.current = None
+        self.shown_at = 0.0
+        self.seq = itertools.count()
+        self.stats = {"posted": 0, "shown": 0, "replaced": 0, "coalesced": 0, "dropped": 0}
+
+        self.timer = timer_factory()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._advance)
+
+    def post(self, text, priority=PRIORITY_USER, tag=0, placeholder=False, streaming=False):
+        """Ask for text to be shown; streaming means later posts with this tag will extend it"""
+        self.stats["posted"] += 1
+        current = self.current
+        if tag and current and current.tag == tag:
+            # The answer (or more of a streamed one) to what is on screen
+            if (current.placeholder and not placeholder) or (current.streaming and not streaming):
+                current.placeholder = False
+                self.shown_at = self.clock()  # The real or finished answer gets its own display time
+                self.timer.stop()
+            current.streaming = streaming
+            current.text = text
+            self.stats["replaced"] += 1
+            self.update(text)
+            self._schedule()
+            return
+        for item in self.pending:
+            if (tag and item.tag == tag) or item.text == text:
+                self.stats["replaced" if tag and item.tag == tag else "coalesced"] += 1
+                item.text = text
+                item.priority = min(item.priority, priority)
+                item.placeholder = item.placeholder and placeholder
+                item.streaming = streaming
+                return
+        if current and current.text == text:
+            self.stats["coalesced"] += 1
+            return
+
+        self.pending.append(SpeechItem(text, priority, tag, placeholder, next(self.seq), streaming))
+        if len(self.pending) > self.max_pending:
+            victim = max(self.pending, key=lambda item: (item.priority, item.placeholder, -item.seq))
+            self.pending.remove(victim)
+            self.stats["dropped"] += 1
+            print(f"💬 Dropped queued {PRIORITY_NAMES.get(victim.priority, victim.priority)} message")
+        self._schedule()
+
+    def on_hidden(self):
+        """The bubble went away (timed out or clicked): show the next message, if any"""
+        self.current = None
+        self.timer.stop()
+        self._advance()
+
+    def stop(self):
+        self.timer.stop()
+        self.pending.clear()
+
+    def _schedule(self):
+        if not self.pending:
+            return
+        if self.current is None:
+            self._advance()
+            return
+        if self.current.streaming:
+            return  # Rescheduled when the last chunk arrives
+        if not self.timer.isActive():
+            elapsed_ms = (self.clock() - self.shown_at) * 1000
+            self.timer.start(max(0, int(self.min_display_ms - elapsed_ms)))
+
+    def _advance(self):
+        if not self.pending or (self.current and self.current.streaming):
+            return
+        item = min(self.pending, key=lambda item: (item.priority, item.seq))
+        self.pending.remove(item)
+        self.current = item
+        self.shown_at = self.clock()
+        self.stats["shown"] += 1
+        self.show(item.text)
+        if self.pending and not item.streaming:
+            self.timer.start(self.min_display_ms)
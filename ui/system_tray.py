@@ -1,11 +1,13 @@
 """
 System tray management for Milk Mocha Pet
 """
-import os
-from PyQt5.QtWidgets import QSystemTrayIcon, QMenu, QAction, QApplication
-from PyQt5.QtGui import QMovie, QIcon, QPixmap
+from PyQt5.QtWidgets import QSystemTrayIcon, QMenu, QAction, QActionGroup
+from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtCore import Qt
 
+from ui.tray_icons import TrayIconLoader, TrayIconAnimator, ANIMATION_STATES
+from animation.skins import skins
+
 
 class SystemTrayManager:
     """Manages system tray icon and menu"""
@@ -14,6 +16,9 @@ class SystemTrayManager:
         self.pet = pet_instance
         self.tray_icon = None
         self.show_hide_action = None
+        self.animator = None
+        self.icon_loader = None
+        self.skin_actions = {}
         
         # Initialize system tray
         self.init_system_tray()
@@ -28,19 +33,18 @@ class SystemTrayManager:
         # Create system tray icon
         self.tray_icon = QSystemTrayIcon(self.pet)
         
-        # Set tray icon (use a simple icon or create one from existing GIF)
+        # Set tray icon from the precomputed multi-size icon cache of the character in use
         try:
-            # Try to use the idle GIF as icon
-            if os.path.exists("assets/mocha_gifs/idle.gif"):
-                movie = QMovie("assets/mocha_gifs/idle.gif")
-                movie.jumpToFrame(0)  # Get first frame
-                pixmap = movie.currentPixmap().scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.tray_icon.setIcon(QIcon(pixmap))
-            else:
-                # Fallback: create a simple icon
-                pixmap = QPixmap(32, 32)
-                pixmap.fill(Qt.transparent)
-                self.tray_icon.setIcon(QIcon(pixmap))
+            # Fallback: a simple icon until (or unless) the pet's icons are loaded
+            pixmap = QPixmap(32, 32)
+            pixmap.fill(Qt.transparent)
+            self.tray_icon.setIcon(QIcon(pixmap))
+            self.animator = TrayIconAnimator(
+                self.tray_icon, animated=self.pet.config.settings.animated_tray_icon, clock=self.pet.clock
+            )
+            self.icon_loader = TrayIconLoader(self.animator.set_icons, self.pet.clock)
+            self.load_icons()
+            self.pet.gif_manager.add_change_listener(self.on_animation_changed)
         except:
             # If all else fails, use default icon
             self.tray_icon.setIcon(self.pet.style().standardIcon(self.pet.style().SP_ComputerIcon))
@@ -91,6 +95,29 @@ class SystemTrayManager:
         # Separator
         tray_menu.addSeparator()
         
+        # Animated tray icon toggle
+        self.animated_icon_action = QAction("Animated Tray Icon", self.pet)
+        self.animated_icon_action.setCheckable(True)
+        self.animated_icon_action.setChecked(self.pet.config.settings.animated_tray_icon)
+        self.animated_icon_action.toggled.connect(self.set_animated_icon)
+        tray_menu.addAction(self.animated_icon_action)
+        
+        # Skin packs, listed by file name; none is opened until picked
+        skin_menu = tray_menu.addMenu("Skin")
+        skin_group = QActionGroup(skin_menu)
+        for name in [""] + skins.available():
+            skin_action = QAction(name or "Milk Mocha", self.pet, checkable=True)
+            skin_action.setChecked(name == self.pet.config.settings.skin)
+            skin_action.triggered.connect(lambda checked, name=name: self.set_skin(name))
+            skin_group.addAction(skin_action)
+            skin_menu.addAction(skin_action)
+            self.skin_actions[name] = skin_action
+        
+        # Profiling toggle (same as F9)
+        self.profiling_action = QAction("Record Performance Profile", self.pet, checkable=True)
+        self.profiling_action.triggered.connect(lambda checked: self.pet.toggle_profiling())
+        tray_menu.addAction(self.profiling_action)
+        
         # Settings
         settings_action = QAction("Settings", self.pet)
         settings_action.triggered.connect(self.pet.open_settings)
@@ -112,6 +139,49 @@ class SystemTrayManager:
         # Set the menu
         self.tray_icon.setContextMenu(tray_menu)
     
+    def on_animation_changed(self, gif_key):
+        """Reflect the pet's current animation in the tray icon"""
+        if self.animator:
+            self.animator.set_state(ANIMATION_STATES.get(gif_key, "idle"))
+    
+    def set_animated_icon(self, enabled):
+        """Turn the animated tray icon on or off and remember the choice"""
+        self.pet.config.apply({"animated_tray_icon": enabled})
+    
+    def set_skin(self, name):
+        """Switch the pet to a skin pack and remember the choice"""
+        self.pet.config.apply({"skin": name})
+    
+    def subscribe_to_settings(self, config):
+        config.subscribe(("animated_tray_icon",), lambda settings: self.apply_animated_icon(settings.animated_tray_icon))
+        config.subscribe(("skin",), lambda settings: self.apply_skin(settings.skin))
+    
+    def apply_skin(self, name):
+        """Check the menu entry of the skin in use and show its character in the tray"""
+        if name in self.skin_actions:
+            self.skin_actions[name].setChecked(True)
+        if self.icon_loader:
+            self.load_icons()
+    
+    def load_icons(self):
+        """Load tray icons cut from the pet's current character (default or skin pack)"""
+        gif_manager = self.pet.gif_manager
+        self.icon_loader.load(gif_manager.gifs, gif_manager.skin.name if gif_manager.skin else "")
+    
+    def apply_animated_icon(self, enabled):
+        """Reflect the animated tray icon setting in the icon and the menu"""
+        if self.animator:
+            self.animator.set_animated(enabled)
+        if hasattr(self, 'animated_icon_action'):
+            self.animated_icon_action.blockSignals(True)
+            self.animated_icon_action.setChecked(enabled)
+            self.animated_icon_action.blockSignals(False)
+    
+    def apply_profiling(self, active):
+        """Check the profiling entry while a profile is recording"""
+        if hasattr(self, 'profiling_action'):
+            self.profiling_action.setChecked(active)
+    
     def tray_icon_activated(self, reason):
         """Handle tray icon activation"""
         if reason == QSystemTrayIcon.DoubleClick:
@@ -157,5 +227,9 @@ class SystemTrayManager:
     
     def hide(self):
         """Hide the system tray icon"""
+        if self.animator:
+            self.animator.stop()
+        if self.icon_loader:
+            self.icon_loader.shutdown()
         if self.tray_icon:
             self.tray_icon.hide()
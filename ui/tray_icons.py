@@ -0,0 +1,237 @@
+"""
+Precomputed system tray icons for Milk Mocha Pet
+"""
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+from PyQt5.QtCore import Qt, QSize, QObject, QFile, QIODevice, QDataStream, pyqtSignal
+
+from animation.frame_player import decode_gif
+from utils.config import cache_path
+from utils.clock import system_clock
+
+CACHE_FILE = "tray_icons.dat"
+CACHE_VERSION = 1
+
+# Standard tray/taskbar sizes across Windows, macOS and Linux desktops
+TRAY_SIZES = (16, 20, 24, 32, 48, 64)
+
+# Frames kept per state for the animated icon
+FRAMES_PER_STATE = 4
+
+# Pet states shown in the tray and the animation (GifManager.gifs key) each one is cut from,
+# so a skin pack's tray follows its own character
+STATE_GIFS = {
+    "idle": "idle",
+    "sleeping": "sleeping",
+    "angry": "angry",
+    "drinking": "drinking",
+}
+
+# Animation keys (GifManager.gifs) that map onto a tray state
+ANIMATION_STATES = {"sleeping": "sleeping", "angry": "angry", "drinking": "drinking"}
+
+# Low, power-friendly frame rate for the animated icon
+ANIMATION_INTERVAL_MS = 500
+
+
+def cache_file(skin=""):
+    """Cache file name for the default character or a skin pack"""
+    return f"tray_icons-{skin}.dat" if skin else CACHE_FILE
+
+
+def _build_state_frames(path, data=None):
+    """Cut a few evenly spaced frames from a GIF, pre-scaled to every tray size"""
+    largest = max(TRAY_SIZES)
+    images, _ = decode_gif(path, QSize(largest, largest), data)
+    if not images:
+        return []
+    step = max(1, len(images) // FRAMES_PER_STATE)
+    frames = []
+    for image in images[::step][:FRAMES_PER_STATE]:
+        frames.append([image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                       for size in TRAY_SIZES])
+    return frames
+
+
+def _write_cache(path, states, stamps):
+    file = QFile(path)
+    if not file.open(QIODevice.WriteOnly):
+        print(f"⚠️ Could not write tray icon cache: {path}")
+        return
+    stream = QDataStream(file)
+    stream.writeUInt32(CACHE_VERSION)
+    stream.writeUInt32(len(states))
+    for state, frames in states.items():
+        size, mtime = stamps[state]
+        stream.writeQString(state)
+        stream.writeInt64(size)
+        stream.writeInt64(mtime)
+        stream.writeUInt32(len(frames))
+        for images in frames:
+            for image in images:
+                stream << image
+    file.close()
+
+
+def _read_cache(path, stamps):
+    """Load cached frames, or None if the cache is missing, old or stale
+
+    stamps holds the current (size, mtime) of each state's source GIF.
+    """
+    file = QFile(path)
+    if not file.open(QIODevice.ReadOnly):
+        return None
+    try:
+        stream = QDataStream(file)
+        if stream.readUInt32() != CACHE_VERSION:
+            return None
+        states = {}
+        for _ in range(stream.readUInt32()):
+            state = stream.readQString()
+            stamp = (stream.readInt64(), stream.readInt64())
+            if state not in stamps or stamp != tuple(stamps[state]):
+                return None
+            frames = []
+            for _ in range(stream.readUInt32()):
+                images = []
+                for _ in TRAY_SIZES:
+                    image = QImage()
+                    stream >> image
+                    images.append(image)
+                frames.append(images)
+            states[state] = frames
+        if stream.status() != QDataStream.Ok or set(states) != set(stamps):
+            return None
+        return states
+    finally:
+        file.close()
+
+
+def _icons(states):
+    """{state: [QIcon, ...]} from pre-scaled frames (GUI thread only)"""
+    icons = {}
+    for state, frames in states.items():
+        icons[state] = []
+        for images in frames:
+            icon = QIcon()
+            for image in images:
+                icon.addPixmap(QPixmap.fromImage(image))
+            icons[state].append(icon)
+    return icons
+
+
+class TrayIconLoader(QObject):
+    """Loads the tray icons of the character in use without blocking the GUI thread
+
+    A cached set is read straight away. Otherwise the tray gets the first idle
+    frame alone, and the full set is cut from the GIFs and written to the
+    cache in the background; on_ready is called again once it is done.
+    """
+
+    # (token, states) from a background build, delivered on the GUI thread
+    built = pyqtSignal(object, object)
+
+    def __init__(self, on_ready, clock=system_clock):
+        super().__init__()
+        self.on_ready = on_ready  # Called with {state: [QIcon, ...]}
+        self.clock = clock
+        self.token = None
+        self.worker = None
+        self.built.connect(self._on_built)
+
+    def load(self, gifs, skin=""):
+        """Load the icons for a set of animations (GifManager.gifs) and the skin they belong to"""
+        sources = {state: gifs.get(key, gifs["idle"]) for state, key in STATE_GIFS.items()}
+        stamps = {state: gif.stamp for state, gif in sources.items()}
+        path = cache_path(cache_file(skin))
+        self.token = token = object()
+        states = _read_cache(path, stamps)
+        if states is not None:
+            self.on_ready(_icons(states))
+            return
+
+        idle = sources["idle"]
+        images, _ = decode_gif(idle.path, QSize(max(TRAY_SIZES), max(TRAY_SIZES)),
+                               idle.read() if hasattr(idle, "read") else None, limit=1)
+        if images:
+            self.on_ready(_icons({"idle": [[image] for image in images]}))
+        # Archive members are read here; only decoding moves off the GUI thread
+        data = {state: gif.read() if hasattr(gif, "read") else None for state, gif in sources.items()}
+        paths = {state: gif.path for state, gif in sources.items()}
+        self.worker = self.clock.run_in_background(self._build, token, path, paths, data, stamps)
+
+    def _build(self, token, path, paths, data, stamps):
+        print("🖼️ Building tray icon cache...")
+        states = {state: _build_state_frames(paths[state], data[state]) for state in paths}
+        _write_cache(path, states, stamps)
+        self.built.emit(token, states)
+
+    def _on_built(self, token, states):
+        if token is self.token:  # Not replaced by a newer load (e.g. the skin changed)
+            self.on_ready(_icons(states))
+
+    def shutdown(self, timeout=5.0):
+        """Wait for a background build before exit"""
+        self.token = None
+        if self.worker:
+            self.worker.join(timeout)
+            self.worker = None
+
+
+class TrayIconAnimator:
+    """Shows the pet's state in the tray, optionally cycling a few frames slowly"""
+
+    def __init__(self, tray_icon, icons=None, animated=False, clock=system_clock):
+        self.tray_icon = tray_icon
+        self.icons = icons or {}
+        self.animated = animated
+        self.state = "idle"
+        self.frame_index = 0
+
+        self.timer = clock.timer()
+        self.timer.timeout.connect(self.next_frame)
+
+    def set_icons(self, icons):
+        """Swap in a new icon set (e.g. once built, or for another skin), keeping the state"""
+        self.icons = icons
+        state, self.state = self.state, None
+        self.set_state(state)
+
+    def set_state(self, state):
+        """Switch the tray to a pet state ('idle', 'sleeping', 'angry', 'drinking')"""
+        if not self.icons.get(state):
+            state = "idle"
+        if state == self.state:
+            return
+        self.state = state
+        self.frame_index = 0
+        self._show_first_frame()
+        self._update_timer()
+
+    def set_animated(self, animated):
+        """Turn frame cycling on or off"""
+        self.animated = animated
+        if not animated:
+            self.frame_index = 0
+            self._show_first_frame()
+        self._update_timer()
+
+    def _show_first_frame(self):
+        frames = self.icons.get(self.state)
+        if frames:
+            self.tray_icon.setIcon(frames[0])
+
+    def _update_timer(self):
+        # Idle stays static so the tray costs nothing most of the time
+        if self.animated and self.state != "idle" and len(self.icons.get(self.state, ())) > 1:
+            if not self.timer.isActive():
+                self.timer.start(ANIMATION_INTERVAL_MS)
+        else:
+            self.timer.stop()
+
+    def next_frame(self):
+        frames = self.icons[self.state]
+        self.frame_index = (self.frame_index + 1) % len(frames)
+        self.tray_icon.setIcon(frames[self.frame_index])
+
+    def stop(self):
+        self.timer.stop()
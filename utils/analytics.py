@@ -0,0 +1,204 @@
+"""
+Append-only interaction analytics, stored in SQLite by a background writer
+"""
+import time
+import sqlite3
+import threading
+from collections import deque
+
+from utils.config import cache_path
+
+DB_FILE = "analytics.db"
+
+# Buffered events are written at least this often, or as soon as this many pile up
+FLUSH_INTERVAL_SECONDS = 5.0
+FLUSH_BATCH_SIZE = 200
+
+def hour_start(ts):
+    """Start of the local clock hour containing ts (not always a whole UTC hour, e.g. UTC+5:30)"""
+    local = time.localtime(ts)
+    return int(ts) - local.tm_min * 60 - local.tm_sec
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    detail TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE TABLE IF NOT EXISTS hourly (
+    hour INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    detail TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, kind, detail)
+) WITHOUT ROWID;
+"""
+
+
+class AnalyticsStore:
+    """Buffers events in memory and commits them in batches off the GUI thread
+
+    record() is a deque append, safe from any thread. A daemon writer owns the
+    only write connection: it drains the buffer in one transaction, appending
+    raw events and bumping per-hour rollups so reports never scan the event log.
+    Rollups are bucketed by local clock hour, the hours reports show.
+    Queries use their own read connection; WAL lets them run during writes.
+    Events recorded once the writer has stopped are dropped, not buffered.
+    """
+
+    def __init__(self, path=None, flush_interval=FLUSH_INTERVAL_SECONDS, batch_size=FLUSH_BATCH_SIZE,
+                 clock=time.time):
+        self.path = path or cache_path(DB_FILE)
+        self.clock = clock  # Timestamps events; a simulation passes its virtual time
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.buffer = deque()
+        self.wake = threading.Event()
+        self.running = True
+        self.written = 0
+        self.dropped = 0  # Recorded after the writer stopped (or failed to start)
+        self.read_lock = threading.Lock()
+        self.reader = None
+
+        self.writer = threading.Thread(target=self._run_writer, name="analytics-writer", daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record(self, kind, detail=""):
+        """Note that something happened; never blocks or touches disk"""
+        if not self.running:
+            self.dropped += 1
+            return
+        self.buffer.append((self.clock(), kind, detail or ""))
+        if len(self.buffer) >= self.batch_size:
+            self.wake.set()
+
+    def _run_writer(self):
+        try:
+            connection = self._connect()
+            connection.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            print(f"⚠️ Analytics disabled: {e}")
+            self.running = False
+            while self.buffer:
+                item = self.buffer.popleft()
+                if isinstance(item, threading.Event):
+                    item.set()  # Nothing will be written; let flush() return
+            return
+        try:
+            while True:
+                self.wake.wait(self.flush_interval)
+                self.wake.clear()
+                self._write_batch(connection)
+                if not self.running:
+                    break
+        finally:
+            self.running = False
+            connection.close()
+
+    def _write_batch(self, connection):
+        batch, waiters = [], []
+        while self.buffer:
+            item = self.buffer.popleft()
+            # flush() queues an Event to learn when everything before it is committed
+            (waiters if isinstance(item, threading.Event) else batch).append(item)
+        try:
+            if batch:
+                self._commit(connection, batch)
+        finally:
+            for waiter in waiters:
+                waiter.set()
+
+    def _commit(self, connection, batch):
+        rollup = {}
+        for ts, kind, detail in batch:
+            key = (hour_start(ts), kind, detail)
+            rollup[key] = rollup.get(key, 0) + 1
+        try:
+            with connection:
+                connection.executemany("INSERT INTO events (ts, kind, detail) VALUES (?, ?, ?)", batch)
+                connection.executemany(
+                    "INSERT INTO hourly (hour, kind, detail, count) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (hour, kind, detail) DO UPDATE SET count = count + excluded.count",
+                    [key + (count,) for key, count in rollup.items()]
+                )
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not write analytics batch: {e}")
+
+    def flush(self, timeout=5.0):
+        """Ask the writer to commit now and wait until it has"""
+        if not self.writer.is_alive():
+            return False
+        done = threading.Event()
+        self.buffer.append(done)
+        self.wake.set()
+        return done.wait(timeout)
+
+    def close(self):
+        """Write what is left and stop the writer"""
+        self.running = False
+        self.wake.set()
+        self.writer.join(5.0)
+        with self.read_lock:
+            if self.reader:
+                self.reader.close()
+                self.reader = None
+
+    def _query(self, sql, params=()):
+        with self.read_lock:
+            if self.reader is None:
+                self.reader = self._connect()
+            return self.reader.execute(sql, params).fetchall()
+
+    # Usage reports -------------------------------------------------------
+
+    def totals(self, since=None, until=None):
+        """{(kind, detail): count} from the hourly rollups"""
+        rows = self._query(
+            "SELECT kind, detail, SUM(count) FROM hourly WHERE hour >= ? AND hour < ? "
+            "GROUP BY kind, detail ORDER BY kind, detail",
+            (since or 0, until or float("inf"))
+        )
+        return {(kind, detail): count for kind, detail, count in rows}
+
+    def hourly(self, kind, since=None):
+        """[(hour start timestamp, count)] for one kind, all details summed"""
+        return self._query(
+            "SELECT hour, SUM(count) FROM hourly WHERE kind = ? AND hour >= ? GROUP BY hour ORDER BY hour",
+            (kind, since or 0)
+        )
+
+    def busiest_hours(self, kind=None, limit=3):
+        """Hours of the day (0-23, local time) with the most events, as [(hour, count)]"""
+        totals = {}
+        for hour, count in self._query(
+            "SELECT hour, SUM(count) FROM hourly WHERE ? IS NULL OR kind = ? GROUP BY hour", (kind, kind)
+        ):
+            local_hour = time.localtime(hour).tm_hour
+            totals[local_hour] = totals.get(local_hour, 0) + count
+        return sorted(totals.items(), key=lambda item: -item[1])[:limit]
+
+    def recent(self, limit=20):
+        """Latest raw events, newest first"""
+        return self._query("SELECT ts, kind, detail FROM events ORDER BY id DESC LIMIT ?", (limit,))
+
+    def report(self, days=7):
+        """Short plain-text usage summary for the last few days"""
+        totals = self.totals(since=self.clock() - days * 86400)
+        if not totals:
+            return f"No interactions recorded in the last {days} days."
+        lines = [f"Last {days} days:"]
+        for (kind, detail), count in totals.items():
+            lines.append(f"  {kind}{' / ' + detail if detail else ''}: {count}")
+        busiest = ", ".join(f"{hour:02d}:00 ({count})" for hour, count in self.busiest_hours())
+        lines.append(f"Busiest hours: {busiest}")
+        return "\n".join(lines)
@@ -0,0 +1,171 @@
+"""
+Asset registry for Milk Mocha Pet: every asset resolved and stat'ed once
+"""
+import os
+from PyQt5.QtCore import QFileSystemWatcher
+
+from utils.config import PACKAGE_ROOT
+
+ASSETS_DIR = os.path.join(PACKAGE_ROOT, "assets")
+
+
+class Asset:
+    """Handle to one asset file, kept up to date by the registry
+
+    Handles are never replaced, only refreshed in place, so holding on to one
+    is safe. Reading its fields costs no system call.
+    """
+
+    __slots__ = ("name", "path", "size", "mtime", "exists")
+
+    def __init__(self, name, path):
+        self.name = name    # Relative to the assets directory, e.g. "mocha_gifs/idle.gif"
+        self.path = path    # Absolute path
+        self.size = 0
+        self.mtime = 0
+        self.exists = False
+
+    @property
+    def stamp(self):
+        """(size, whole-second mtime), used to detect stale caches"""
+        return self.size, self.mtime
+
+    def refresh(self):
+        """Re-stat the file; returns True if anything about it changed"""
+        try:
+            info = os.stat(self.path)
+            current = (True, info.st_size, int(info.st_mtime))
+        except OSError:
+            current = (False, 0, 0)
+        if current == (self.exists, self.size, self.mtime):
+            return False
+        self.exists, self.size, self.mtime = current
+        return True
+
+    def __repr__(self):
+        return f"Asset({self.name!r}{'' if self.exists else ', missing'})"
+
+
+class AssetRegistry:
+    """Every file under assets/, scanned once and then only on change
+
+    Lookups are dictionary reads. Once watch() is called, a file watcher
+    re-stats entries that change on disk and tells listeners about them.
+    """
+
+    def __init__(self, root=ASSETS_DIR):
+        self.root = root
+        self.entries = {}   # Name -> Asset
+        self.by_path = {}   # Absolute path -> Asset
+        self.listeners = []  # Called with the Asset that changed
+        self.watcher = None
+        self.scanned = False
+
+    def scan(self):
+        """Walk the assets directory and stat every file"""
+        self.scanned = True
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                self._add_path(os.path.join(directory, filename))
+
+    def _add_path(self, path):
+        return self.get(os.path.relpath(path, self.root).replace(os.sep, "/"))
+
+    def get(self, name):
+        """Handle for an asset by its name, e.g. "mocha_gifs/idle.gif"
+
+        Unknown names still get a handle (marked missing), so an asset that
+        appears later is picked up without asking again.
+        """
+        asset = self.entries.get(name)
+        if asset is None:
+            if not self.scanned:
+                self.scan()
+                asset = self.entries.get(name)
+            if asset is None:
+                asset = Asset(name, os.path.join(self.root, *name.split("/")))
+                asset.refresh()
+                self.entries[name] = asset
+                self.by_path[asset.path] = asset
+                self._watch_asset(asset)
+        return asset
+
+    def find(self, path):
+        """Handle for an absolute path, or None if it is not a known asset"""
+        if not self.scanned:
+            self.scan()
+        return self.by_path.get(path)
+
+    def children(self, directory, suffix=""):
+        """Existing assets directly inside a directory, e.g. children("skins", ".zip")"""
+        if not self.scanned:
+            self.scan()
+        prefix = directory.rstrip("/") + "/"
+        return sorted((asset for name, asset in self.entries.items()
+                       if name.startswith(prefix) and "/" not in name[len(prefix):]
+                       and name.endswith(suffix) and asset.exists), key=lambda asset: asset.name)
+
+    def add_listener(self, listener):
+        """Register a callback for assets that change on disk"""
+        self.listeners.append(listener)
+
+    def watch(self):
+        """Start following changes on disk (needs a running Qt application)"""
+        if self.watcher is not None:
+            return
+        if not self.scanned:
+            self.scan()
+        self.watcher = QFileSystemWatcher()
+        self.watcher.fileChanged.connect(self._on_file_changed)
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+        directories = {os.path.dirname(asset.path) for asset in self.entries.values()}
+        directories.add(self.root)
+        self.watcher.addPaths(sorted(d for d in directories if os.path.isdir(d)))
+        for asset in self.entries.values():
+            self._watch_asset(asset)
+
+    def stop_watching(self):
+        if self.watcher is None:
+            return
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.watcher = None
+
+    def _watch_asset(self, asset):
+        if self.watcher is not None and asset.exists and asset.path not in self.watcher.files():
+            self.watcher.addPath(asset.path)
+
+    def _on_file_changed(self, path):
+        asset = self.by_path.get(path)
+        if asset:
+            self._refresh(asset)
+
+    def _on_directory_changed(self, directory):
+        # Files added, removed or replaced (editors often save by renaming)
+        for asset in list(self.entries.values()):
+            if os.path.dirname(asset.path) == directory:
+                self._refresh(asset)
+        if os.path.isdir(directory):
+            for filename in os.listdir(directory):
+                path = os.path.join(directory, filename)
+                if path not in self.by_path and os.path.isfile(path):
+                    self._notify(self._add_path(path))
+
+    def _refresh(self, asset):
+        changed = asset.refresh()
+        self._watch_asset(asset)
+        if changed:
+            self._notify(asset)
+
+    def _notify(self, asset):
+        print(f"🖼️ Asset changed: {asset.name}")
+        for listener in self.listeners:
+            try:
+                listener(asset)
+            except Exception as e:
+                print(f"❌ Error reloading asset: {e}")
+
+
+# Shared by everything that loads images, so each file is stat'ed once per process
+assets = AssetRegistry()
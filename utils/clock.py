@@ -0,0 +1,205 @@
+"""
+Time, randomness, timers and background work for Milk Mocha Pet, real or simulated
+"""
+import time
+import heapq
+import random
+import weakref
+import itertools
+import threading
+from datetime import datetime
+from PyQt5.QtCore import QTimer
+
+# Simulated sessions start here (local time) unless told otherwise: a Monday morning
+SIMULATION_START = datetime(2025, 1, 6, 8, 0)
+
+
+class Clock:
+    """The real world: wall and monotonic time, randomness, timers and threads
+
+    Behavior code asks its clock instead of calling time, datetime, random,
+    QTimer or threading directly, so a VirtualClock can stand in for all of
+    them at once. Give a seed to make the randomness repeatable.
+    """
+
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def perf_counter(self):
+        return time.perf_counter()
+
+    def now(self):
+        return datetime.now()
+
+    def timer(self, parent=None):
+        return QTimer(parent)
+
+    def single_shot(self, ms, callback):
+        QTimer.singleShot(ms, callback)
+
+    def run_in_background(self, target, *args):
+        """Run target(*args) on a daemon thread; returns the thread"""
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+
+class _Signal:
+    """Just enough of a bound pyqtSignal for timer.timeout"""
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def disconnect(self, slot=None):
+        if slot is None:
+            self.slots.clear()
+        else:
+            self.slots.remove(slot)
+
+    def emit(self):
+        for slot in list(self.slots):
+            slot()
+
+
+class VirtualTimer:
+    """A QTimer stand-in that fires when its VirtualClock reaches the deadline
+
+    Like a parentless QTimer, one that is no longer referenced never fires.
+    """
+
+    def __init__(self, clock, parent=None):
+        self.clock = clock
+        self.timeout = _Signal()
+        self.interval_ms = 0
+        self.single_shot = False
+        self.due = None  # Virtual seconds, None while stopped
+        self.generation = 0  # Bumped by start/stop so stale schedule entries are skipped
+
+    def setSingleShot(self, single_shot):
+        self.single_shot = single_shot
+
+    def isSingleShot(self):
+        return self.single_shot
+
+    def setInterval(self, ms):
+        self.interval_ms = int(ms)
+
+    def interval(self):
+        return self.interval_ms
+
+    def setTimerType(self, timer_type):
+        pass  # Virtual timers are exact
+
+    def start(self, ms=None):
+        if ms is not None:
+            self.interval_ms = int(ms)
+        self.generation += 1
+        self.due = self.clock.elapsed + self.interval_ms / 1000.0
+        self.clock._schedule(self)
+
+    def stop(self):
+        self.generation += 1
+        self.due = None
+
+    def isActive(self):
+        return self.due is not None
+
+    def remainingTime(self):
+        if self.due is None:
+            return -1
+        return max(0, round((self.due - self.clock.elapsed) * 1000))
+
+    def _fire(self):
+        if self.single_shot:
+            self.stop()
+        else:
+            self.start()
+        self.timeout.emit()
+
+
+class FinishedTask:
+    """What VirtualClock.run_in_background returns: work that has already run"""
+
+    daemon = True
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return False
+
+
+class VirtualClock(Clock):
+    """Simulated time that only moves when advanced, with seeded randomness
+
+    Timers made by timer() and single_shot() fire in deadline order (ties in
+    the order they were started) as advance() moves time forward, as fast as
+    their callbacks run. Background work runs inline, so a session depends
+    only on the seed and the start time and replays identically.
+    """
+
+    def __init__(self, seed=0, start=None):
+        super().__init__(seed)
+        self.start = (start or SIMULATION_START).timestamp()
+        self.elapsed = 0.0
+        self.schedule = []  # (due, seq, timer weakref or None, timer generation or callback)
+        self.seq = itertools.count()
+        self.fired = 0
+
+    def time(self):
+        return self.start + self.elapsed
+
+    def monotonic(self):
+        return self.elapsed
+
+    def perf_counter(self):
+        return self.elapsed
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+    def timer(self, parent=None):
+        return VirtualTimer(self, parent)
+
+    def single_shot(self, ms, callback):
+        heapq.heappush(self.schedule, (self.elapsed + ms / 1000.0, next(self.seq), None, callback))
+
+    def run_in_background(self, target, *args):
+        target(*args)
+        return FinishedTask()
+
+    def _schedule(self, timer):
+        heapq.heappush(self.schedule, (timer.due, next(self.seq), weakref.ref(timer), timer.generation))
+
+    def advance(self, seconds):
+        """Move time forward, firing everything that falls due on the way; returns how many fired"""
+        end = self.elapsed + seconds
+        fired = 0
+        while self.schedule and self.schedule[0][0] <= end:
+            due, _, timer_ref, token = heapq.heappop(self.schedule)
+            if timer_ref is None:
+                callback = token
+            else:
+                timer = timer_ref()
+                if timer is None or timer.generation != token:
+                    continue
+                callback = timer._fire
+            self.elapsed = max(self.elapsed, due)
+            fired += 1
+            callback()
+        self.elapsed = end
+        self.fired += fired
+        return fired
+
+
+# The real clock, used wherever no other one is passed in
+system_clock = Clock()
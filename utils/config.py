@@ -4,13 +4,36 @@ Configuration management utilities for Milk Mocha Pet
 import os
 import json
 
+from utils.settings import Settings, DEFAULT_SETTINGS
+
+# Generated caches live next to the code, so they work from any working directory
+# (MILK_MOCHA_CACHE_DIR moves them, e.g. to keep a simulated session's state separate)
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.getenv("MILK_MOCHA_CACHE_DIR") or os.path.join(PACKAGE_ROOT, "cache")
+
+# The same goes for the settings file (MILK_MOCHA_SETTINGS_FILE points a test run elsewhere)
+SETTINGS_PATH = os.getenv("MILK_MOCHA_SETTINGS_FILE") or os.path.join(PACKAGE_ROOT, "config", "settings.json")
+
+
+def cache_path(filename):
+    """Absolute path of a file in the cache directory, creating the directory"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
 
 class ConfigManager:
-    """Manages application configuration"""
+    """Manages application configuration
+    
+    config_data holds the raw JSON; settings is the validated, immutable view
+    that the rest of the app reads as plain attributes.
+    """
     
-    def __init__(self, config_path="config/settings.json"):
+    def __init__(self, config_path=SETTINGS_PATH):
         self.config_path = config_path
         self.config_data = self.load_config()
+        self.settings = Settings.from_dict(self.config_data)
+        self.listeners = []      # Called with {key: (old, new)} for any raw change
+        self.subscriptions = []  # (field names, callback) called with the new Settings
     
     def load_config(self):
         """Load configuration from file"""
@@ -22,19 +45,12 @@ class ConfigManager:
             print(f"Error loading config: {e}")
         
         # Default config
-        return {
-            "spawn_interval": 10000,
-            "transparency": 255,
-            "last_position": [300, 300],
-            "auto_spawn": True,
-            "milk_mocha_speaking": True,
-            "speaking_interval": 15
-        }
+        return DEFAULT_SETTINGS.to_dict()
     
     def save_config(self, new_position=None):
         """Save current configuration"""
         try:
-            os.makedirs("config", exist_ok=True)
+            os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
             if new_position:
                 self.config_data["last_position"] = new_position
             with open(self.config_path, "w") as f:
@@ -43,14 +59,70 @@ class ConfigManager:
             print(f"Error saving config: {e}")
     
     def get(self, key, default=None):
-        """Get configuration value"""
+        """Get a raw configuration value (prefer the typed settings attributes)"""
         return self.config_data.get(key, default)
     
     def set(self, key, value):
-        """Set configuration value"""
+        """Set configuration value without notifying anyone"""
         self.config_data[key] = value
+        self.settings = Settings.from_dict(self.config_data)
+    
+    def add_listener(self, listener):
+        """Register a callback for any changed key, including ones outside the schema"""
+        self.listeners.append(listener)
+    
+    def subscribe(self, field_names, callback):
+        """Call callback(settings) whenever one of these settings changes"""
+        unknown = set(field_names) - set(DEFAULT_SETTINGS.to_dict())
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        self.subscriptions.append((frozenset(field_names), callback))
+    
+    def _notify(self, changes):
+        if not changes:
+            return
+        previous, self.settings = self.settings, Settings.from_dict(self.config_data)
+        changed = self.settings.changed_fields(previous)
+        for field_names, callback in self.subscriptions:
+            if field_names & changed:
+                try:
+                    callback(self.settings)
+                except Exception as e:
+                    print(f"❌ Error applying settings: {e}")
+        for listener in self.listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                print(f"❌ Error applying settings: {e}")
+    
+    def apply(self, values):
+        """Set several values, save, and tell subscribers which ones actually changed"""
+        changes = {key: (self.config_data.get(key), value) for key, value in values.items()
+                   if self.config_data.get(key) != value}
+        if not changes:
+            return {}
+        self.config_data.update(values)
+        self.save_config()
+        self._notify(changes)
+        return changes
+    
+    def reload(self):
+        """Re-read the file (e.g. after an external edit) and apply only what differs"""
+        try:
+            with open(self.config_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # Missing or half-written file: keep the current settings
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        changes = {key: (self.config_data.get(key), value) for key, value in data.items()
+                   if self.config_data.get(key) != value}
+        self.config_data.update(data)
+        self._notify(changes)
+        return changes
     
     def update_position(self, x, y):
         """Update pet position in config"""
-        self.config_data["last_position"] = [x, y]
+        self.set("last_position", [x, y])
         self.save_config()
@@ -0,0 +1,51 @@
+"""
+Reload settings when config/settings.json is edited outside the app
+"""
+import os
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer
+
+# Editors often write a file in several steps; wait for them to settle
+RELOAD_DELAY_MS = 250
+
+
+class ConfigWatcher(QObject):
+    """Watches the settings file and calls ConfigManager.reload() after changes
+
+    The directory is watched as well, because many editors save by replacing
+    the file, which drops it from the watcher. Writes made by the app itself
+    reload to an empty diff and so change nothing.
+    """
+
+    def __init__(self, config, parent=None):
+        super().__init__(parent)
+        self.config = config
+        self.path = os.path.abspath(config.config_path)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.schedule_reload)
+        self.watcher.directoryChanged.connect(self.schedule_reload)
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.timeout.connect(self.reload)
+        self._watch()
+
+    def _watch(self):
+        directory = os.path.dirname(self.path)
+        if os.path.isdir(directory) and directory not in self.watcher.directories():
+            self.watcher.addPath(directory)
+        if os.path.exists(self.path) and self.path not in self.watcher.files():
+            self.watcher.addPath(self.path)
+
+    def schedule_reload(self, *args):
+        self.reload_timer.start(RELOAD_DELAY_MS)
+
+    def reload(self):
+        self._watch()
+        changes = self.config.reload()
+        if changes:
+            print(f"⚙️ Settings file changed: {', '.join(sorted(changes))}")
+
+    def stop(self):
+        self.reload_timer.stop()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
@@ -0,0 +1,65 @@
+"""
+Minimal REST client for the Gemini generateContent API
+
+Used when GEMINI_API_BASE_URL points at a compatible server (such as the
+local stub in benchmarks/stub_gemini_server.py), so the app's real request
+paths can be exercised without the google-generativeai SDK.
+"""
+import json
+import requests
+
+
+class RestResponse:
+    """Mimics the SDK response/chunk object: only .text is used by the app"""
+
+    def __init__(self, payload):
+        self.text = extract_text(payload)
+
+
+def extract_text(payload):
+    """Concatenate the text parts of the first candidate"""
+    try:
+        parts = payload["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError, TypeError):
+        return ""
+    return "".join(part.get("text", "") for part in parts)
+
+
+class RestGenerativeModel:
+    """generate_content() over HTTP, with the same call shape as genai.GenerativeModel"""
+
+    def __init__(self, model_name, api_key, base_url, timeout=(5, 30)):
+        self.model_name = model_name
+        self.api_key = api_key or ""
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout  # (connect, read) seconds
+        self.session = requests.Session()
+
+    def _url(self, method):
+        return f"{self.base_url}/v1beta/models/{self.model_name}:{method}"
+
+    @staticmethod
+    def _body(prompt):
+        return {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+
+    def generate_content(self, prompt, stream=False):
+        if stream:
+            return self._stream(prompt)
+        response = self.session.post(
+            self._url("generateContent"), params={"key": self.api_key},
+            json=self._body(prompt), timeout=self.timeout
+        )
+        response.raise_for_status()
+        return RestResponse(response.json())
+
+    def _stream(self, prompt):
+        """Yield chunks from a server-sent-events stream"""
+        with self.session.post(
+            self._url("streamGenerateContent"), params={"key": self.api_key, "alt": "sse"},
+            json=self._body(prompt), timeout=self.timeout, stream=True
+        ) as response:
+            response.raise_for_status()
+            response.encoding = "utf-8"  # SSE is always UTF-8, whatever the headers say
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data:"):
+                    yield RestResponse(json.loads(line[5:].strip()))
@@ -4,6 +4,13 @@ Gemini AI Service for generating cute pet messages
 import os
 import random
 
+from utils.message_store import FallbackMessageStore
+from utils.local_generator import LocalMessageGenerator
+from utils.gemini_stub import StubGenerativeModel
+from utils.message_batch import parse_message_batch
+from utils.quota import QuotaManager, PRIORITY_USER, PRIORITY_BACKGROUND
+from utils.clock import system_clock
+
 # Optional import for Google Generative AI
 try:
     import google.generativeai as genai
@@ -17,7 +24,7 @@ except ImportError:
 class GeminiHandler:
     """Handles Gemini AI message generation"""
     
-    def __init__(self):
+    def __init__(self, rng=None):
         self.fallback_messages = {
             "random": [
                 "🥛 Hello there! I'm Milk Mocha, your adorable desktop companion! ✨",
@@ -44,22 +51,67 @@ class GeminiHandler:
                 "🎯 Focused and fabulous! That's you! ✨",
                 "💪 Work hard, dream big! You've got this! 🌟",
                 "📈 Progress is progress! Every step counts! 🎉"
+            ],
+            "story": [
+                "📚 I tried to catch my cursor tail for 3 hours... I don't have one! 😅",
+                "📚 Made friends with antivirus software, but it called me 'suspicious'! 🛡️",
+                "📚 Spent all night dancing, your CPU hit 100% usage! 💃",
+                "📚 Tried to eat a pixel cookie, but it was just a cursor! 🍪",
+                "📚 Had an argument with Siri about who's cuter. I won! 😎"
             ]
         }
+        
+        # Shuffle-bag sampler over these lists and config/fallback_quotes.json (loaded on first use)
+        self.message_store = FallbackMessageStore(self.fallback_messages, rng=rng or random)
+        
+        # Markov chain over the same sources, for fresh messages when there is no AI at all
+        self.local_generator = LocalMessageGenerator(self.message_store, rng=rng)
     
     def get_fallback_message(self, context: str = "random") -> str:
         """Get a fallback message when AI is unavailable"""
-        messages = self.fallback_messages.get(context, self.fallback_messages["random"])
-        return random.choice(messages)
+        return self.message_store.draw(context)
+    
+    def get_offline_message(self, context: str = "random") -> str:
+        """Generate a new message locally, or draw a bundled one"""
+        try:
+            message = self.local_generator.generate(context)
+        except Exception as e:
+            print(f"⚠️ Local generator error: {e}")
+            message = None
+        return message or self.get_fallback_message(context)
 
 
 class GeminiService:
     """Main Gemini service for generating AI messages"""
     
-    def __init__(self):
-        self.handler = GeminiHandler()
+    def __init__(self, model=None, clock=system_clock):
+        self.handler = GeminiHandler(clock.random)
+        self.api_key = None
+        self.model = model
+        
+        # Request and size counters, used to compare single vs batched generation
+        self.usage = {"requests": 0, "prompt_chars": 0, "response_chars": 0}
+        
+        # Global request budget shared by every caller
+        self.quota = QuotaManager(clock=clock.monotonic)
+        
+        if self.model is not None:
+            return
+        
+        if os.getenv('MILK_MOCHA_GEMINI_STUB'):
+            self.model = StubGenerativeModel.from_environment()
+            print("🧪 Using local stub Gemini model")
+            return
+        
         self.api_key = self._get_api_key()
-        self.model = None
+        
+        # A compatible REST endpoint (e.g. the local stub server) overrides the SDK
+        base_url = os.getenv('GEMINI_API_BASE_URL')
+        if base_url:
+            from utils.gemini_rest import RestGenerativeModel
+            self.model = RestGenerativeModel('gemini-1.5-flash', self.api_key, base_url)
+            print(f"🧪 Using Gemini REST endpoint at {base_url}")
+            return
         
         if GENAI_AVAILABLE and self.api_key:
             try:
@@ -98,27 +150,94 @@ class GeminiService:
         
         return None
     
-    def get_message(self, context: str = "random", custom_prompt: str = None) -> str:
+    def build_prompt(self, context: str = "random", custom_prompt: str = None) -> str:
+        """Create the prompt for a context, unless a custom one is given"""
+        if custom_prompt:
+            return custom_prompt
+        prompts = {
+            "random": "Generate a cute, short, encouraging message from Milk Mocha, an adorable desktop pet. Include emojis and keep it under 50 words. Be cheerful and supportive!",
+            "greetings": "Generate a cute greeting message from Milk Mocha, an adorable desktop pet. Make it warm and welcoming with emojis. Keep it under 40 words.",
+            "working": "Generate an encouraging work-related message from Milk Mocha, an adorable desktop pet. Be supportive and motivating with emojis. Keep it under 45 words.",
+            "break": "Generate a message encouraging the user to take a break, from Milk Mocha, an adorable desktop pet. Be caring and remind them to rest with emojis. Keep it under 40 words."
+        }
+        return prompts.get(context, prompts["random"])
+    
+    def build_batch_prompt(self, context: str, count: int) -> str:
+        """Prompt asking for several distinct messages in one response"""
+        return (
+            f"{self.build_prompt(context)}\n\n"
+            f"Write exactly {count} different messages like that. "
+            "Reply with only a JSON array of strings, one message per string, and no other text."
+        )
+    
+    def _record_usage(self, prompt, response_text):
+        self.usage["requests"] += 1
+        self.usage["prompt_chars"] += len(prompt)
+        self.usage["response_chars"] += len(response_text or "")
+    
+    def get_message_batch(self, context: str = "random", count: int = 5,
+                          priority: int = PRIORITY_BACKGROUND) -> list:
+        """Get several messages for a context from a single Gemini request"""
+        if not self.model:
+            return []
+        if not self.quota.acquire(priority):
+            print(f"🪙 Gemini budget exhausted, skipping '{context}' batch")
+            return []
+        try:
+            prompt = self.build_batch_prompt(context, count)
+            response = self.model.generate_content(prompt)
+            text = response.text if response else ""
+            self._record_usage(prompt, text)
+            messages = parse_message_batch(text, count)
+            print(f"📦 Gemini batch for '{context}': {len(messages)}/{count} messages")
+            return messages
+        except Exception as e:
+            print(f"❌ Gemini batch error: {e}")
+            return []
+    
+    def stream_message_batch(self, context: str = "random", count: int = 5,
+                             priority: int = PRIORITY_USER):
+        """Yield the raw text of a batch response in chunks as it arrives; nothing if refused or failed"""
+        if not self.model:
+            return
+        if not self.quota.acquire(priority):
+            print(f"🪙 Gemini budget exhausted, skipping '{context}' batch")
+            return
+        prompt = self.build_batch_prompt(context, count)
+        streamed = ""
+        try:
+            response = self.model.generate_content(prompt, stream=True)
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue
+                if text:
+                    streamed += text
+                    yield text
+        except Exception as e:
+            print(f"❌ Gemini batch streaming error: {e}")
+        finally:
+            self._record_usage(prompt, streamed)
+    
+    def get_message(self, context: str = "random", custom_prompt: str = None,
+                    priority: int = PRIORITY_USER) -> str:
         """Get a message from Gemini AI or fallback"""
         
         if not self.model:
+            return self.handler.get_offline_message(context)
+        
+        if not self.quota.acquire(priority):
+            print("🪙 Gemini budget exhausted, using local fallback")
             return self.handler.get_fallback_message(context)
         
         try:
             # Create appropriate prompt based on context
-            if custom_prompt:
-                prompt = custom_prompt
-            else:
-                prompts = {
-                    "random": "Generate a cute, short, encouraging message from Milk Mocha, an adorable desktop pet. Include emojis and keep it under 50 words. Be cheerful and supportive!",
-                    "greetings": "Generate a cute greeting message from Milk Mocha, an adorable desktop pet. Make it warm and welcoming with emojis. Keep it under 40 words.",
-                    "working": "Generate an encouraging work-related message from Milk Mocha, an adorable desktop pet. Be supportive and motivating with emojis. Keep it under 45 words.",
-                    "break": "Generate a message encouraging the user to take a break, from Milk Mocha, an adorable desktop pet. Be caring and remind them to rest with emojis. Keep it under 40 words."
-                }
-                prompt = prompts.get(context, prompts["random"])
+            prompt = self.build_prompt(context, custom_prompt)
             
             # Generate response
             response = self.model.generate_content(prompt)
+            self._record_usage(prompt, response.text if response else "")
             
             if response and response.text:
                 return response.text.strip()
@@ -129,6 +248,41 @@ class GeminiService:
             print(f"❌ Gemini API error: {e}")
             return self.handler.get_fallback_message(context)
     
+    def stream_message(self, context: str = "random", custom_prompt: str = None,
+                       priority: int = PRIORITY_USER):
+        """Yield a message from Gemini AI in text chunks as they arrive, or one fallback chunk"""
+        if not self.model:
+            yield self.handler.get_offline_message(context)
+            return
+        
+        if not self.quota.acquire(priority):
+            print("🪙 Gemini budget exhausted, using local fallback")
+            yield self.handler.get_fallback_message(context)
+            return
+        
+        produced = False
+        prompt = self.build_prompt(context, custom_prompt)
+        streamed = ""
+        try:
+            response = self.model.generate_content(prompt, stream=True)
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunk without text (e.g. blocked by safety filters)
+                    continue
+                if text:
+                    produced = True
+                    streamed += text
+                    yield text
+        except Exception as e:
+            print(f"❌ Gemini streaming error: {e}")
+        finally:
+            self._record_usage(prompt, streamed)
+        
+        if not produced:
+            yield self.handler.get_fallback_message(context)
+    
     def get_message_with_timeout(self, context: str = "random", custom_prompt: str = None, timeout: int = 10) -> str:
         """Get a message from Gemini AI with timeout protection"""
         import threading
@@ -0,0 +1,72 @@
+"""
+Local stand-in for a Gemini GenerativeModel, for testing without an API key
+"""
+import os
+import re
+import json
+import time
+
+
+class StubChunk:
+    """Mimics a generate_content response or stream chunk"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """Answers generate_content() locally, optionally streaming with delays
+
+    Set MILK_MOCHA_GEMINI_STUB=1 to make GeminiService use it. Timing can be
+    tuned with MILK_MOCHA_STUB_FIRST_DELAY and MILK_MOCHA_STUB_CHUNK_DELAY
+    (seconds) and MILK_MOCHA_STUB_CHUNK_WORDS.
+    """
+
+    DEFAULT_TEXT = ("🥛 Milk Mocha here! I just counted every pixel on your screen "
+                    "and they are all cheering for you! Keep going, you're doing great! ✨")
+
+    def __init__(self, text=None, first_chunk_delay=0.5, chunk_delay=0.15, chunk_words=3):
+        self.text = text or self.DEFAULT_TEXT
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_words = max(1, chunk_words)
+
+    @classmethod
+    def from_environment(cls):
+        """Build a stub from MILK_MOCHA_STUB_* variables"""
+        return cls(
+            text=os.getenv("MILK_MOCHA_STUB_TEXT"),
+            first_chunk_delay=float(os.getenv("MILK_MOCHA_STUB_FIRST_DELAY", "0.5")),
+            chunk_delay=float(os.getenv("MILK_MOCHA_STUB_CHUNK_DELAY", "0.15")),
+            chunk_words=int(os.getenv("MILK_MOCHA_STUB_CHUNK_WORDS", "3")),
+        )
+
+    def split_chunks(self, text=None):
+        """The response text cut into chunks of a few words"""
+        words = (text or self.text).split(" ")
+        return [" ".join(words[i:i + self.chunk_words]) + (" " if i + self.chunk_words < len(words) else "")
+                for i in range(0, len(words), self.chunk_words)]
+
+    def batch_text(self, prompt):
+        """JSON array answer for prompts that ask for several messages"""
+        match = re.search(r"exactly (\d+) different messages", prompt)
+        if not match:
+            return None
+        count = int(match.group(1))
+        return json.dumps([f"{self.text} (#{i + 1})" for i in range(count)], ensure_ascii=False)
+
+    def generate_content(self, prompt, stream=False):
+        batch = self.batch_text(prompt)
+        text = batch if batch is not None else self.text
+        chunks = self.split_chunks(text)
+        if not stream:
+            time.sleep(self.first_chunk_delay + self.chunk_delay * (len(chunks) - 1))
+            return StubChunk(text)
+        return self._stream(chunks)
+
+    def _stream(self, chunks):
+        time.sleep(self.first_chunk_delay)
+        for index, chunk in enumerate(chunks):
+            if index:
+                time.sleep(self.chunk_delay)
+            yield StubChunk(chunk)
@@ -0,0 +1,158 @@
+"""
+Leak detection for long sessions: live QObjects, threads and allocations
+"""
+import os
+import re
+import gc
+import threading
+import tracemalloc
+from collections import Counter
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QTimer
+
+from utils.config import PACKAGE_ROOT
+
+# Samples taken in the running app
+CHECK_INTERVAL_MS = 5 * 60 * 1000
+
+# A category is growing if it rose at every one of this many consecutive samples
+GROWTH_SAMPLES = 4
+
+# Smallest rise from the baseline that counts, per kind of category
+MIN_GROWTH = {"qobject": 5, "thread": 2, "memory": 256 * 1024}
+
+# Allocation sites followed per sample, biggest first
+TOP_ALLOCATORS = 15
+
+# "Thread-12 (get_message_thread)" -> "get_message_thread", "Dummy-3" -> "Dummy"
+_THREAD_NAME = re.compile(r"^(?:Thread-\d+ \((?P<target>[^)]*)\)|(?P<base>.*?)-?\d*)$")
+
+
+def _thread_kind(name):
+    match = _THREAD_NAME.match(name)
+    return (match.group("target") or match.group("base") or name) if match else name
+
+
+def count_qobjects():
+    """{class name: live count} over QObjects that have a Python wrapper"""
+    counts = Counter()
+    for obj in gc.get_objects():
+        if isinstance(obj, QObject) and not sip.isdeleted(obj):
+            counts[type(obj).__name__] += 1
+    return counts
+
+
+def count_threads():
+    """{thread kind: live count}, numbering stripped from the names"""
+    return Counter(_thread_kind(thread.name) for thread in threading.enumerate())
+
+
+def top_allocators(limit=TOP_ALLOCATORS):
+    """{"file:line": bytes} for the biggest live allocation sites (needs tracemalloc)"""
+    if not tracemalloc.is_tracing():
+        return {}
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    sizes = {}
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        filename = frame.filename
+        if filename.startswith(PACKAGE_ROOT):
+            filename = os.path.relpath(filename, PACKAGE_ROOT)
+        else:
+            filename = os.path.basename(filename)
+        sizes[f"{filename}:{frame.lineno}"] = stat.size
+    return sizes
+
+
+class LeakDetector:
+    """Counts live objects by category and flags the ones that only ever grow
+
+    Each sample records, per category ("qobject:QTimer", "thread:Dummy",
+    "memory:core/pet.py:120"), a live count or byte size. The first sample is
+    the baseline. A category is flagged once it rose at each of the last
+    GROWTH_SAMPLES samples and sits clearly above its baseline.
+    """
+
+    def __init__(self, trace_memory=True, growth_samples=GROWTH_SAMPLES):
+        self.growth_samples = growth_samples
+        self.history = {}  # Category -> [value per sample, 0 before it first appeared]
+        self.samples = 0
+        self.timer = None
+        self.started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def sample(self):
+        """Record one measurement of every category; returns the ones now growing"""
+        gc.collect()
+        values = {}
+        for name, count in count_qobjects().items():
+            values[f"qobject:{name}"] = count
+        for name, count in count_threads().items():
+            values[f"thread:{name}"] = count
+        for site, size in top_allocators().items():
+            values[f"memory:{site}"] = size
+
+        for category, series in self.history.items():
+            series.append(values.pop(category, 0))
+        for category, value in values.items():
+            self.history[category] = [0] * self.samples + [value]
+        self.samples += 1
+        return self.growing()
+
+    def _min_growth(self, category):
+        return MIN_GROWTH.get(category.split(":", 1)[0], 1)
+
+    def growing(self):
+        """{category: (baseline, latest)} for every category that keeps growing"""
+        flagged = {}
+        for category, series in self.history.items():
+            recent = series[-(self.growth_samples + 1):]
+            if len(recent) <= self.growth_samples:
+                continue
+            rising = all(later > earlier for earlier, later in zip(recent, recent[1:]))
+            if rising and series[-1] - series[0] >= self._min_growth(category):
+                flagged[category] = (series[0], series[-1])
+        return flagged
+
+    def report(self, limit=15):
+        """Plain-text changes since the baseline, growing categories first"""
+        if self.samples < 2:
+            return "Not enough samples yet."
+        flagged = self.growing()
+        changes = sorted(((category, series[0], series[-1]) for category, series in self.history.items()
+                          if series[-1] != series[0]),
+                         key=lambda row: (row[0] not in flagged, -(row[2] - row[1]) / self._min_growth(row[0])))
+        lines = [f"Live objects after {self.samples} samples "
+                 f"({len(flagged)} growing, marked with !):"]
+        for category, baseline, latest in changes[:limit]:
+            mark = "!" if category in flagged else " "
+            lines.append(f"{mark} {category:<60}{baseline:>12}{latest:>12}{latest - baseline:>+12}")
+        if not changes:
+            lines.append("  No change from the baseline.")
+        return "\n".join(lines)
+
+    # Periodic checks in the running app ---------------------------------
+
+    def start(self, interval_ms=CHECK_INTERVAL_MS):
+        """Sample now and then every interval, printing anything that keeps growing"""
+        self.sample()
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._check)
+        self.timer.start(interval_ms)
+
+    def _check(self):
+        for category, (baseline, latest) in self.sample().items():
+            print(f"🧯 Possible leak: {category} grew from {baseline} to {latest}")
+
+    def stop(self):
+        if self.timer:
+            self.timer.stop()
+            self.timer = None
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
@@ -0,0 +1,185 @@
+"""
+Offline message generator: a word-level Markov chain over the bundled messages
+"""
+import json
+import zlib
+import struct
+import random
+import bisect
+import hashlib
+import threading
+from array import array
+
+from utils.config import cache_path
+
+MODEL_FILE = "local_generator.bin"
+MODEL_MAGIC = b"MMLG"
+MODEL_VERSION = 1
+
+BOS, EOS = 0, 1  # Reserved token ids: sentence start and end
+
+# How strongly a context's own messages outweigh the shared pool when training its chain
+CONTEXT_WEIGHT = 3
+
+MIN_WORDS = 5
+MAX_WORDS = 24
+MAX_ATTEMPTS = 8
+
+
+class MarkovChain:
+    """Transitions of one context, flattened for bisect sampling
+
+    For state s, its successors are next_ids[starts[s]:starts[s + 1]] with
+    cumulative weights in cumulative[...] over the same slice.
+    """
+
+    __slots__ = ("starts", "next_ids", "cumulative")
+
+    def __init__(self, starts, next_ids, cumulative):
+        self.starts = starts
+        self.next_ids = next_ids
+        self.cumulative = cumulative
+
+    @classmethod
+    def from_counts(cls, counts, vocab_size):
+        """Build from {state: {next: weight}}"""
+        starts, next_ids, cumulative = array("I"), array("I"), array("I")
+        for state in range(vocab_size):
+            starts.append(len(next_ids))
+            total = 0
+            for next_id, weight in sorted(counts.get(state, {}).items()):
+                total += weight
+                next_ids.append(next_id)
+                cumulative.append(total)
+        starts.append(len(next_ids))
+        return cls(starts, next_ids, cumulative)
+
+    def step(self, state, rng):
+        lo, hi = self.starts[state], self.starts[state + 1]
+        if lo == hi:
+            return EOS
+        pick = rng.random() * self.cumulative[hi - 1]
+        return self.next_ids[bisect.bisect_right(self.cumulative, pick, lo, hi)]
+
+
+class LocalMessageGenerator:
+    """Generates new context-tagged messages without any network access
+
+    Trained on the same sources as the fallback store (the built-in lists and
+    config/fallback_quotes.json). The compiled chains are saved as a small
+    zlib-compressed binary in the cache directory and only read on the first
+    call to generate(); they are rebuilt when the sources change.
+    """
+
+    def __init__(self, message_store, seed=None, rng=None):
+        self.message_store = message_store
+        self.rng = rng or random.Random(seed)
+        self.vocab = None   # token id -> word
+        self.chains = None  # context -> MarkovChain
+        self.known = None   # source messages, so copies can be rejected
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(corpus):
+        blob = json.dumps(corpus, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha1(blob).digest()
+
+    def _load(self):
+        corpus = self.message_store.corpus()
+        digest = self.fingerprint(corpus)
+        self.known = {message for messages in corpus.values() for message in messages}
+        if not self._read_model(digest):
+            self._train(corpus)
+            self._write_model(digest)
+
+    def _train(self, corpus):
+        words = {"": BOS, "\n": EOS}
+        tokenized = {context: [[words.setdefault(word, len(words)) for word in message.split()]
+                               for message in messages]
+                     for context, messages in corpus.items()}
+        shared = [sentence for sentences in tokenized.values() for sentence in sentences]
+
+        self.vocab = [None] * len(words)
+        for word, token in words.items():
+            self.vocab[token] = word
+        self.chains = {}
+        for context, sentences in tokenized.items():
+            counts = {}
+            for weight, source in ((CONTEXT_WEIGHT, sentences), (1, shared)):
+                for sentence in source:
+                    for prev, nxt in zip([BOS] + sentence, sentence + [EOS]):
+                        successors = counts.setdefault(prev, {})
+                        successors[nxt] = successors.get(nxt, 0) + weight
+            self.chains[context] = MarkovChain.from_counts(counts, len(self.vocab))
+
+    def _read_model(self, digest):
+        """Load the compiled model if it matches the current sources"""
+        try:
+            with open(cache_path(MODEL_FILE), "rb") as f:
+                data = f.read()
+            magic, version = struct.unpack_from("<4sH", data)
+            if magic != MODEL_MAGIC or version != MODEL_VERSION or data[6:26] != digest:
+                return False
+            data = zlib.decompress(data[26:])
+            (vocab_len,) = struct.unpack_from("<I", data)
+            offset = 4 + vocab_len
+            vocab = data[4:offset].decode("utf-8").split("\0")
+            (context_count,) = struct.unpack_from("<H", data, offset)
+            offset += 2
+            chains = {}
+            for _ in range(context_count):
+                name_len, state_count, edge_count = struct.unpack_from("<HII", data, offset)
+                offset += 10
+                name = data[offset:offset + name_len].decode("utf-8")
+                offset += name_len
+                arrays = []
+                for length in (state_count, edge_count, edge_count):
+                    values = array("I")
+                    values.frombytes(data[offset:offset + 4 * length])
+                    offset += 4 * length
+                    arrays.append(values)
+                chains[name] = MarkovChain(*arrays)
+        except (OSError, struct.error, zlib.error, UnicodeDecodeError, ValueError):
+            return False
+        self.vocab, self.chains = vocab, chains
+        return True
+
+    def _write_model(self, digest):
+        vocab = "\0".join(self.vocab).encode("utf-8")
+        parts = [struct.pack("<I", len(vocab)), vocab, struct.pack("<H", len(self.chains))]
+        for name, chain in self.chains.items():
+            encoded = name.encode("utf-8")
+            parts.append(struct.pack("<HII", len(encoded), len(chain.starts), len(chain.next_ids)))
+            parts.append(encoded)
+            for values in (chain.starts, chain.next_ids, chain.cumulative):
+                parts.append(values.tobytes())
+        try:
+            with open(cache_path(MODEL_FILE), "wb") as f:
+                f.write(struct.pack("<4sH", MODEL_MAGIC, MODEL_VERSION) + digest)
+                f.write(zlib.compress(b"".join(parts), 9))
+        except OSError as e:
+            print(f"⚠️ Could not save local generator model: {e}")
+
+    def _walk(self, chain):
+        tokens = []
+        state = BOS
+        while len(tokens) < MAX_WORDS:
+            state = chain.step(state, self.rng)
+            if state == EOS:
+                break
+            tokens.append(state)
+        return " ".join(self.vocab[token] for token in tokens)
+
+    def generate(self, context="random"):
+        """A new message for a context, or None if no fresh one came out"""
+        with self.lock:
+            if self.chains is None:
+                self._load()
+            chain = self.chains.get(context) or self.chains.get("random")
+            if chain is None:
+                return None
+            for _ in range(MAX_ATTEMPTS):
+                message = self._walk(chain)
+                if len(message.split()) >= MIN_WORDS and message not in self.known:
+                    return message
+        return None
@@ -0,0 +1,150 @@
+"""
+Batched Gemini message generation: one request, many messages
+"""
+import re
+import json
+import threading
+from collections import deque
+
+from utils.clock import system_clock
+from utils.quota import PRIORITY_BACKGROUND
+
+# Messages longer than this are rejected as malformed (the prompts ask for < 50 words)
+MAX_MESSAGE_CHARS = 280
+
+# Pre-generated messages older than this are dropped (time-of-day greetings go stale)
+DEFAULT_MAX_AGE_SECONDS = 3600
+
+_LIST_PREFIX = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+
+def parse_message_batch(text, expected=None):
+    """Split a batch response into clean, distinct messages
+
+    Accepts a JSON array of strings (optionally inside a ``` fence) and falls
+    back to one message per non-empty line with list markers stripped.
+    """
+    if not text:
+        return []
+    body = text.strip()
+    if body.startswith("```"):
+        body = body.strip("`")
+        body = body[body.find("\n") + 1:] if "\n" in body else body
+
+    candidates = None
+    start, end = body.find("["), body.rfind("]")
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(body[start:end + 1])
+            if isinstance(parsed, list):
+                candidates = [item for item in parsed if isinstance(item, str)]
+        except ValueError:
+            candidates = None
+    if candidates is None:
+        candidates = [_LIST_PREFIX.sub("", line) for line in body.splitlines()]
+
+    messages = []
+    for message in candidates:
+        message = message.strip().strip('"').strip()
+        if message and len(message) <= MAX_MESSAGE_CHARS and message not in messages:
+            messages.append(message)
+    return messages[:expected] if expected else messages
+
+
+def first_message_so_far(text):
+    """The first message of a JSON batch response that is still streaming in, or ""
+
+    Decodes the first string of the array up to the last complete character,
+    so it can be shown while the rest of the batch arrives.
+    """
+    start = text.find("[")
+    quote = text.find('"', start) if start != -1 else -1
+    if quote == -1:
+        return ""
+    end = index = quote + 1
+    while index < len(text) and text[index] != '"':
+        step = (6 if text[index + 1:index + 2] == "u" else 2) if text[index] == "\\" else 1
+        if index + step > len(text):
+            break  # Escape sequence cut off mid-chunk
+        index += step
+        end = index
+    try:
+        message = json.loads(f'"{text[quote + 1:end]}"')
+    except ValueError:
+        return ""
+    if message and "\ud800" <= message[-1] <= "\udbff":
+        message = message[:-1]  # First half of a surrogate pair
+    return message.strip()
+
+
+class MessageBatchCache:
+    """Per-context queues of pre-generated messages, refilled one request at a time"""
+
+    def __init__(self, service, batch_size=5, max_age=DEFAULT_MAX_AGE_SECONDS, clock=system_clock):
+        self.service = service
+        self.clock = clock
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.queues = {}       # context -> deque of (created_at, message)
+        self.refilling = set()  # contexts with a refill in flight
+        self.lock = threading.Lock()
+        self.delivered = 0
+
+    @property
+    def enabled(self):
+        return self.batch_size > 1 and self.service.model is not None
+
+    def take(self, context):
+        """Pop a fresh pre-generated message for a context, or None"""
+        now = self.clock.time()
+        with self.lock:
+            queue = self.queues.get(context)
+            while queue:
+                created_at, message = queue.popleft()
+                if now - created_at <= self.max_age:
+                    self.delivered += 1
+                    return message
+        return None
+
+    def pending(self, context):
+        with self.lock:
+            return len(self.queues.get(context, ()))
+
+    def claim_refill(self, context):
+        """Mark a refill for a context as started; False if one is already running"""
+        with self.lock:
+            if context in self.refilling:
+                return False
+            self.refilling.add(context)
+            return True
+
+    def finish_refill(self, context, messages):
+        """Queue a fetched batch and mark its refill as done"""
+        now = self.clock.time()
+        with self.lock:
+            queue = self.queues.setdefault(context, deque())
+            queue.extend((now, message) for message in messages)
+            self.refilling.discard(context)
+
+    def refill(self, context, priority=PRIORITY_BACKGROUND):
+        """Fetch one batch for a context (blocking); returns how many were added
+
+        The request is charged at priority: background for topping up ahead of
+        time, the caller's own when a message is needed now. If refused,
+        callers fall back to a single request.
+        """
+        if not self.claim_refill(context):
+            return 0
+        messages = []
+        try:
+            messages = self.service.get_message_batch(context, self.batch_size, priority)
+            return len(messages)
+        finally:
+            self.finish_refill(context, messages)
+
+    def refill_in_background(self, context, priority=PRIORITY_BACKGROUND):
+        """Start a refill in the background unless one is already running"""
+        with self.lock:
+            if context in self.refilling:
+                return
+        self.clock.run_in_background(self.refill, context, priority)
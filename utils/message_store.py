@@ -0,0 +1,138 @@
+"""
+Fallback message store with per-context shuffle bags for Milk Mocha Pet
+"""
+import os
+import time
+import json
+import random
+import threading
+
+from utils.config import PACKAGE_ROOT, cache_path
+
+QUOTES_PATH = os.path.join(PACKAGE_ROOT, "config", "fallback_quotes.json")
+BAGS_FILE = "message_bags.json"
+
+# Bag positions are written at most this often while drawing, and on flush() at quit
+SAVE_INTERVAL_SECONDS = 60
+
+# Keywords that tag a bundled quote with a context; untagged quotes are motivational
+QUOTE_CONTEXT_KEYWORDS = {
+    "humorous": ("why did", "laugh", "joke"),
+    "wellness": ("break", "rest", "water", "breathe", "kind to yourself"),
+}
+
+
+def tag_quote(quote):
+    """Pick the context a bundled quote belongs to"""
+    lowered = quote.lower()
+    for context, keywords in QUOTE_CONTEXT_KEYWORDS.items():
+        if any(keyword in lowered for keyword in keywords):
+            return context
+    return "motivational"
+
+
+class FallbackMessageStore:
+    """Draws fallback messages without repeats until a context's bag is empty
+
+    Sources (the built-in lists plus config/fallback_quotes.json) are read and
+    indexed on the first draw, not at startup. Each context has a shuffled
+    order and a position; a draw is one list lookup. The bag state is
+    persisted now and then and at quit, so a restart carries on where the
+    last session stopped.
+    """
+
+    def __init__(self, builtin_messages, quotes_path=QUOTES_PATH, rng=random, clock=time.monotonic):
+        self.builtin_messages = builtin_messages
+        self.rng = rng  # Shuffles the bags; pass a seeded random.Random for repeatable draws
+        self.clock = clock
+        self.quotes_path = quotes_path
+        self.messages = None  # context -> list of messages, built lazily
+        self.bags = {}        # context -> {"order": [...], "pos": int}
+        self.dirty = False    # Bags changed since they were last written
+        self.saved_at = clock()
+        self.lock = threading.Lock()
+
+    def _load(self):
+        """Index every source by context (first use only)"""
+        messages = {context: list(items) for context, items in self.builtin_messages.items()}
+        try:
+            with open(self.quotes_path, "r", encoding="utf-8") as f:
+                quotes = json.load(f)
+            for quote in quotes:
+                messages.setdefault(tag_quote(quote), []).append(quote)
+                messages.setdefault("random", []).append(quote)
+        except Exception as e:
+            print(f"⚠️ Could not load fallback quotes: {e}")
+
+        # Deduplicate while keeping order
+        self.messages = {context: list(dict.fromkeys(items)) for context, items in messages.items()}
+        self.bags = self._load_bags()
+
+    def _load_bags(self):
+        """Restore saved bag positions that still match the current sources"""
+        try:
+            with open(cache_path(BAGS_FILE), "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        bags = {}
+        for context, bag in saved.items():
+            items = self.messages.get(context)
+            if items and sorted(bag.get("order", [])) == list(range(len(items))):
+                bags[context] = {"order": bag["order"], "pos": int(bag.get("pos", 0))}
+        return bags
+
+    def _save_bags(self):
+        self.dirty = False
+        self.saved_at = self.clock()
+        try:
+            with open(cache_path(BAGS_FILE), "w", encoding="utf-8") as f:
+                json.dump(self.bags, f)
+        except OSError as e:
+            print(f"⚠️ Could not save message bags: {e}")
+
+    def flush(self):
+        """Write the bag positions now if they changed, e.g. at quit"""
+        with self.lock:
+            if self.dirty:
+                self._save_bags()
+
+    def _refill(self, context, last_index=None):
+        """Shuffle a fresh bag, never starting with the message just shown"""
+        order = list(range(len(self.messages[context])))
+        self.rng.shuffle(order)
+        if last_index is not None and len(order) > 1 and order[0] == last_index:
+            order[0], order[-1] = order[-1], order[0]
+        bag = {"order": order, "pos": 0}
+        self.bags[context] = bag
+        return bag
+
+    def corpus(self):
+        """Every source message by context, e.g. to train the offline generator"""
+        with self.lock:
+            if self.messages is None:
+                self._load()
+            return {context: list(items) for context, items in self.messages.items()}
+
+    def contexts(self):
+        with self.lock:
+            if self.messages is None:
+                self._load()
+            return list(self.messages)
+
+    def draw(self, context="random"):
+        """Next message for a context (falls back to 'random' for unknown contexts)"""
+        with self.lock:
+            if self.messages is None:
+                self._load()
+            if not self.messages.get(context):
+                context = "random"
+            bag = self.bags.get(context) or self._refill(context)
+            if bag["pos"] >= len(bag["order"]):
+                bag = self._refill(context, bag["order"][-1])
+            index = bag["order"][bag["pos"]]
+            bag["pos"] += 1
+            self.dirty = True
+            if self.clock() - self.saved_at >= SAVE_INTERVAL_SECONDS:
+                self._save_bags()
+            return self.messages[context][index]
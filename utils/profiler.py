@@ -0,0 +1,135 @@
+"""
+Sampling profiler covering every Python thread of Milk Mocha Pet
+"""
+import os
+import sys
+import time
+import marshal
+import threading
+from collections import Counter
+
+from utils.config import cache_path
+
+# 200 samples per second: enough to see stutters, cheap enough to leave on for minutes
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+
+def _label(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Snapshots all threads' Python stacks from a background thread
+
+    Each tick reads sys._current_frames() and counts the stack of every other
+    thread (GUI, Gemini workers, analytics writer...), keyed by code object so
+    sampling does no string work. stop() writes the samples twice: collapsed
+    stacks for flame graph tools, and a pstats file for pstats/snakeviz.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples = Counter()  # (thread name, (code, ...) root first) -> count
+        self.sample_count = 0
+        self.started_at = None
+        self.elapsed = 0.0
+        self.running = False
+        self.thread = None
+        self.thread_names = {}
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+        print(f"📈 Profiling started ({1 / self.interval:.0f} samples/s)")
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while self.running:
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[(self._thread_name(thread_id), tuple(stack))] += 1
+            self.sample_count += 1
+            frames = frame = None  # Don't keep other threads' frames alive while sleeping
+            time.sleep(self.interval)
+
+    def _thread_name(self, thread_id):
+        name = self.thread_names.get(thread_id)
+        if name is None:
+            self.thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            name = self.thread_names.setdefault(thread_id, f"thread-{thread_id}")
+        return name
+
+    def stop(self, basename=None):
+        """Stop sampling and write the results; returns (collapsed path, pstats path)"""
+        if not self.running:
+            return None, None
+        self.running = False
+        self.thread.join(1.0)
+        self.elapsed = time.perf_counter() - self.started_at
+        basename = basename or time.strftime("profile-%Y%m%d-%H%M%S")
+        collapsed_path = cache_path(basename + ".collapsed")
+        pstats_path = cache_path(basename + ".pstats")
+        self.write_collapsed(collapsed_path)
+        self.write_pstats(pstats_path)
+        print(f"📈 Profiling stopped: {self.sample_count} samples over {self.elapsed:.1f}s")
+        print(f"   Flame graph input: {collapsed_path}")
+        print(f"   pstats: {pstats_path}")
+        return collapsed_path, pstats_path
+
+    def write_collapsed(self, path):
+        """One "thread;module:function;... count" line per distinct stack"""
+        lines = Counter()
+        for (thread_name, stack), count in self.samples.items():
+            lines[";".join([thread_name] + [_label(code) for code in stack])] += count
+        with open(path, "w", encoding="utf-8") as f:
+            for line, count in sorted(lines.items()):
+                f.write(f"{line} {count}\n")
+
+    def write_pstats(self, path):
+        """Sampled times in the marshal format pstats.Stats() loads
+
+        A function's own time is the samples where it was on top of a stack;
+        its cumulative time is the samples where it was anywhere on one.
+        """
+        stats = {}
+
+        def entry(code):
+            key = (code.co_filename, code.co_firstlineno, code.co_name)
+            if key not in stats:
+                stats[key] = [0, 0, 0.0, 0.0, {}]
+            return key, stats[key]
+
+        # Sleeping overshoots, so weight samples by the measured rather than the nominal interval
+        sample_seconds = self.elapsed / self.sample_count if self.sample_count else self.interval
+        for (_, stack), count in self.samples.items():
+            seconds = count * sample_seconds
+            seen = set()
+            caller = None
+            for code in stack:
+                key, record = entry(code)
+                if key not in seen:
+                    seen.add(key)
+                    record[0] += count
+                    record[1] += count
+                    record[3] += seconds
+                if caller is not None:
+                    edge = record[4].get(caller, (0, 0, 0.0, 0.0))
+                    record[4][caller] = (edge[0] + count, edge[1] + count, edge[2], edge[3] + seconds)
+                caller = key
+            if stack:
+                entry(stack[-1])[1][2] += seconds
+
+        with open(path, "wb") as f:
+            marshal.dump({key: tuple(record) for key, record in stats.items()}, f)
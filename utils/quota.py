@@ -0,0 +1,118 @@
+"""
+Token-bucket quota shared by every Gemini caller
+"""
+import math
+import time
+import threading
+
+# Priority classes, highest first
+PRIORITY_USER = 0        # Explicit keypress or menu action
+PRIORITY_STARTUP = 1     # Startup greeting
+PRIORITY_BACKGROUND = 2  # Speaking timer ticks, batch refills
+
+PRIORITY_NAMES = {PRIORITY_USER: "user", PRIORITY_STARTUP: "startup", PRIORITY_BACKGROUND: "background"}
+
+# Share of each bucket a priority class must leave untouched for higher classes,
+# rounded down to whole requests (a 1-request bucket reserves nothing)
+PRIORITY_RESERVE = {PRIORITY_USER: 0.0, PRIORITY_STARTUP: 0.25, PRIORITY_BACKGROUND: 0.5}
+
+
+class TokenBucket:
+    """Classic token bucket: holds up to capacity tokens, refilled continuously"""
+
+    def __init__(self, capacity, period_seconds, clock=time.monotonic):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period_seconds
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self):
+        self._refill()
+        return self.tokens
+
+    def reserved(self, reserve):
+        """Whole tokens a reserve share of the capacity keeps back"""
+        return math.floor(self.capacity * reserve + 1e-9)
+
+    def can_take(self, amount=1.0, reserve=0.0):
+        """True if amount can be taken while leaving the reserved tokens behind"""
+        self._refill()
+        return self.tokens - amount >= self.reserved(reserve) - 1e-9
+
+    def take(self, amount=1.0):
+        self._refill()
+        self.tokens -= amount
+
+    def seconds_until(self, amount=1.0, reserve=0.0):
+        """Time until can_take(amount, reserve) would succeed"""
+        missing = amount + self.reserved(reserve) - self.available()
+        return max(0.0, missing / self.rate)
+
+
+class QuotaManager:
+    """Per-minute and per-day request budgets with priority classes
+
+    Lower-priority callers must leave a reserve in both buckets, so a burst of
+    background ticks can never use up the budget an explicit keypress needs.
+    When a request is refused the caller should go straight to a local fallback.
+    """
+
+    def __init__(self, per_minute=10, per_day=1000, clock=time.monotonic):
+        self.minute = TokenBucket(per_minute, 60, clock)
+        self.day = TokenBucket(per_day, 86400, clock)
+        self.lock = threading.Lock()
+        self.granted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.denied = {name: 0 for name in PRIORITY_NAMES.values()}
+
+    def acquire(self, priority=PRIORITY_BACKGROUND, cost=1.0):
+        """Take budget for one request; False means use the local fallback"""
+        reserve = PRIORITY_RESERVE.get(priority, PRIORITY_RESERVE[PRIORITY_BACKGROUND])
+        name = PRIORITY_NAMES.get(priority, "background")
+        with self.lock:
+            if self.minute.can_take(cost, reserve) and self.day.can_take(cost, reserve):
+                self.minute.take(cost)
+                self.day.take(cost)
+                self.granted[name] += 1
+                return True
+            self.denied[name] += 1
+            return False
+
+    def set_limits(self, per_minute, per_day):
+        """Change capacities, keeping the current fill ratio"""
+        with self.lock:
+            for bucket, capacity, period in ((self.minute, per_minute, 60), (self.day, per_day, 86400)):
+                ratio = bucket.available() / bucket.capacity if bucket.capacity else 1.0
+                bucket.capacity = float(capacity)
+                bucket.rate = bucket.capacity / period
+                bucket.tokens = bucket.capacity * ratio
+
+    def state(self):
+        """Snapshot of the budget for display"""
+        with self.lock:
+            return {
+                "minute_remaining": self.minute.available(),
+                "minute_capacity": self.minute.capacity,
+                "day_remaining": self.day.available(),
+                "day_capacity": self.day.capacity,
+                "next_background_in": max(self.minute.seconds_until(1, PRIORITY_RESERVE[PRIORITY_BACKGROUND]),
+                                          self.day.seconds_until(1, PRIORITY_RESERVE[PRIORITY_BACKGROUND])),
+                "granted": dict(self.granted),
+                "denied": dict(self.denied),
+            }
+
+    def describe(self):
+        """One-paragraph human readable budget summary"""
+        s = self.state()
+        text = (f"This minute: {s['minute_remaining']:.1f} / {s['minute_capacity']:.0f} requests\n"
+                f"Today: {s['day_remaining']:.0f} / {s['day_capacity']:.0f} requests\n"
+                f"Granted: {sum(s['granted'].values())}, "
+                f"fell back locally: {sum(s['denied'].values())}")
+        if s["next_background_in"] > 0:
+            text += f"\nBackground messages paused for {s['next_background_in']:.0f}s"
+        return text
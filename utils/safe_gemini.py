@@ -1,58 +1,178 @@
 """
 Improved Gemini service with timeout protection
 """
-import asyncio
-import threading
-import time
+import queue
 from utils.gemini_service import GeminiService as OriginalGeminiService
+from utils.message_batch import MessageBatchCache, parse_message_batch, first_message_so_far
+from utils.quota import PRIORITY_USER
+from utils.clock import system_clock
 
 class SafeGeminiService:
     """Gemini service wrapper with timeout protection to prevent crashes"""
     
-    def __init__(self):
-        self.original_service = OriginalGeminiService()
+    def __init__(self, batch_size: int = 5, requests_per_minute: int = 10, requests_per_day: int = 1000,
+                 analytics=None, clock=system_clock):
+        self.clock = clock
+        self.original_service = OriginalGeminiService(clock=clock)
+        self.analytics = analytics  # Optional AnalyticsStore for request outcomes
+        self.original_service.quota.set_limits(requests_per_minute, requests_per_day)
         self.timeout_seconds = 5  # 5 second timeout
+        
+        # Context messages are generated several per request and served from here
+        self.batch_cache = MessageBatchCache(self.original_service, batch_size, clock=clock)
     
-    def get_message_with_timeout(self, context: str = "random", custom_prompt: str = None) -> str:
+    def get_message_with_timeout(self, context: str = "random", custom_prompt: str = None,
+                                 priority: int = PRIORITY_USER) -> str:
         """Get message with timeout protection"""
+        # Without a model the answer is local and instant; no worker thread needed
+        if self.original_service.model is None:
+            self._record_outcome("offline")
+            return self.original_service.get_message(context, custom_prompt, priority)
+        
+        # Pre-generated messages cost nothing to deliver
+        use_batch = not custom_prompt and self.batch_cache.enabled
+        if use_batch:
+            cached = self.batch_cache.take(context)
+            if cached:
+                print(f"📦 Using pre-generated '{context}' message ({self.batch_cache.pending(context)} left)")
+                self._record_outcome("cached")
+                return cached
+        
         try:
             result = [None]
             exception = [None]
             
             def get_message_thread():
                 try:
-                    result[0] = self.original_service.get_message(context, custom_prompt)
+                    if use_batch:
+                        # One request refills the whole batch for this context, charged to the caller
+                        self.batch_cache.refill(context, priority)
+                        result[0] = self.batch_cache.take(context)
+                    if not result[0]:
+                        result[0] = self.original_service.get_message(context, custom_prompt, priority)
                 except Exception as e:
                     exception[0] = e
             
             # Start thread
-            thread = threading.Thread(target=get_message_thread)
-            thread.daemon = True
-            thread.start()
+            thread = self.clock.run_in_background(get_message_thread)
             
             # Wait with timeout
             thread.join(self.timeout_seconds)
             
             if thread.is_alive():
                 print(f"⏰ Gemini API timeout after {self.timeout_seconds}s, using fallback")
+                self._record_outcome("timeout")
                 return self.original_service.handler.get_fallback_message(context)
             
             if exception[0]:
                 print(f"❌ Gemini API error: {exception[0]}")
+                self._record_outcome("error")
                 return self.original_service.handler.get_fallback_message(context)
             
             if result[0]:
+                self._record_outcome("answered")
                 return result[0]
             else:
                 print("🤔 Gemini returned empty result, using fallback")
+                self._record_outcome("empty")
                 return self.original_service.handler.get_fallback_message(context)
                 
         except Exception as e:
             print(f"❌ SafeGeminiService error: {e}")
             return "🤖 Milk Mocha's AI is taking a nap! 😴"
     
-    def get_contextual_message(self, user_activity: str = "working") -> str:
-        """Get contextual message with timeout protection"""
+    def stream_message_with_timeout(self, context: str = "random", custom_prompt: str = None,
+                                    on_text=None, priority: int = PRIORITY_USER) -> str:
+        """Stream a message, calling on_text with the text so far after each chunk
+        
+        The timeout applies to the gap before each chunk, so a slow but steady
+        stream is not cut off. Returns the final text (or a fallback).
+        """
+        if self.original_service.model is None:
+            self._record_outcome("offline")
+            text = self.original_service.get_message(context, custom_prompt, priority)
+            if on_text:
+                on_text(text)
+            return text
+        
+        # A pre-generated message beats even the first streamed chunk
+        use_batch = False
+        if not custom_prompt and self.batch_cache.enabled:
+            cached = self.batch_cache.take(context)
+            if cached:
+                self._record_outcome("cached")
+                if on_text:
+                    on_text(cached)
+                return cached
+            # One request serves this message and refills the batch: stream a whole
+            # batch, show its first message as it arrives and queue the rest
+            use_batch = self.batch_cache.claim_refill(context)
+        
+        chunks = queue.Queue()
+        done = object()
+        
+        def stream_thread():
+            raw = ""
+            try:
+                if use_batch:
+                    for chunk in self.original_service.stream_message_batch(
+                            context, self.batch_cache.batch_size, priority):
+                        raw += chunk
+                        chunks.put(chunk)
+                else:
+                    for chunk in self.original_service.stream_message(context, custom_prompt, priority):
+                        chunks.put(chunk)
+            except Exception as e:
+                print(f"❌ Gemini API error: {e}")
+            finally:
+                if use_batch:
+                    # Queued even if the caller gave up waiting; its first message is the one shown
+                    self.batch_cache.finish_refill(context, parse_message_batch(raw, self.batch_cache.batch_size)[1:])
+                chunks.put(done)
+        
+        self.clock.run_in_background(stream_thread)
+        
+        raw = ""
+        text = ""
+        stalled = False
+        while True:
+            try:
+                chunk = chunks.get(timeout=self.timeout_seconds)
+            except queue.Empty:
+                print(f"⏰ Gemini stream stalled for {self.timeout_seconds}s, using what we have")
+                self._record_outcome("stalled")
+                stalled = True
+                break
+            if chunk is done:
+                break
+            raw += chunk
+            shown = first_message_so_far(raw) if use_batch else raw
+            if shown != text:
+                text = shown
+                if on_text:
+                    on_text(text)
+        
+        if use_batch and not stalled:
+            messages = parse_message_batch(raw, self.batch_cache.batch_size)
+            text = messages[0] if messages else ""
+        
+        text = text.strip()
+        if not text:
+            print("🤔 Gemini stream returned nothing, using fallback")
+            self._record_outcome("empty")
+            text = self.original_service.handler.get_fallback_message(context)
+            if on_text:
+                on_text(text)
+        elif not stalled:
+            self._record_outcome("streamed")
+        return text
+    
+    def _record_outcome(self, outcome):
+        if self.analytics:
+            self.analytics.record("ai", outcome)
+    
+    def map_activity_context(self, user_activity: str) -> str:
+        """Map a user activity description onto a message context"""
         context_mapping = {
             "working": "motivational",
             "break": "wellness", 
@@ -62,8 +182,21 @@ class SafeGeminiService:
             "idle": "humorous"
         }
         
-        context = context_mapping.get(user_activity, "random")
-        return self.get_message_with_timeout(context)
+        return context_mapping.get(user_activity, "random")
+    
+    def get_contextual_message(self, user_activity: str = "working", priority: int = PRIORITY_USER) -> str:
+        """Get contextual message with timeout protection"""
+        return self.get_message_with_timeout(self.map_activity_context(user_activity), priority=priority)
+    
+    def stream_contextual_message(self, user_activity: str = "working", on_text=None,
+                                  priority: int = PRIORITY_USER) -> str:
+        """Stream a contextual message with per-chunk timeout protection"""
+        return self.stream_message_with_timeout(self.map_activity_context(user_activity),
+                                                on_text=on_text, priority=priority)
+    
+    @property
+    def quota(self):
+        return self.original_service.quota
     
     # Delegate other methods to original service
     @property
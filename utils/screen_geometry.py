@@ -0,0 +1,117 @@
+"""
+Cached multi-monitor screen geometry for Milk Mocha Pet
+"""
+import random
+from bisect import bisect_right
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QRect
+
+
+class ScreenGeometry:
+    """Caches the virtual-desktop layout and answers point and clamping queries
+
+    The layout is rebuilt only when a screen is added, removed or changes
+    geometry. Queries bisect a small grid of screen edges, so their cost does
+    not depend on how often they are called (every drag event, every bubble
+    follow tick).
+    """
+
+    def __init__(self, rng=random):
+        self.app = QApplication.instance()
+        self.rng = rng  # Anything with choices() and randint(), e.g. a seeded random.Random
+        self.rects = []  # Available geometry per screen as (left, top, right, bottom), exclusive
+        self.x_edges = []
+        self.y_edges = []
+        self.grid = {}  # (column, row) -> screen index
+        self.dirty = True
+
+        # Invalidate the cache whenever the layout changes
+        self.app.screenAdded.connect(self._on_screen_added)
+        self.app.screenRemoved.connect(self.invalidate)
+        for screen in self.app.screens():
+            self._watch_screen(screen)
+
+    def _watch_screen(self, screen):
+        screen.geometryChanged.connect(self.invalidate)
+        screen.availableGeometryChanged.connect(self.invalidate)
+
+    def _on_screen_added(self, screen):
+        self._watch_screen(screen)
+        self.invalidate()
+
+    def invalidate(self, *args):
+        """Mark the cached layout stale; it is rebuilt on the next query"""
+        self.dirty = True
+
+    def _rebuild(self):
+        """Snapshot every screen's available geometry and index it"""
+        self.rects = []
+        for screen in self.app.screens():
+            geometry = screen.availableGeometry()
+            self.rects.append((geometry.x(), geometry.y(),
+                               geometry.x() + geometry.width(), geometry.y() + geometry.height()))
+        if not self.rects:
+            self.rects = [(0, 0, 800, 600)]
+
+        self.x_edges = sorted({edge for r in self.rects for edge in (r[0], r[2])})
+        self.y_edges = sorted({edge for r in self.rects for edge in (r[1], r[3])})
+        self.grid = {}
+        for index, (left, top, right, bottom) in enumerate(self.rects):
+            for column in range(self.x_edges.index(left), self.x_edges.index(right)):
+                for row in range(self.y_edges.index(top), self.y_edges.index(bottom)):
+                    self.grid.setdefault((column, row), index)
+        self.dirty = False
+
+    def _bounds(self):
+        if self.dirty:
+            self._rebuild()
+        return self.rects
+
+    def rects_snapshot(self):
+        """Every screen's available area as (left, top, right, bottom) tuples"""
+        return self._bounds()
+
+    def screen_index_at(self, x, y):
+        """Index of the screen containing a point, or None if it is off every screen"""
+        self._bounds()
+        column = bisect_right(self.x_edges, x) - 1
+        row = bisect_right(self.y_edges, y) - 1
+        return self.grid.get((column, row))
+
+    def nearest_screen_index(self, x, y):
+        """Index of the screen containing a point, or the closest one to it"""
+        index = self.screen_index_at(x, y)
+        if index is not None:
+            return index
+
+        def distance(rect):
+            dx = max(rect[0] - x, 0, x - rect[2] + 1)
+            dy = max(rect[1] - y, 0, y - rect[3] + 1)
+            return dx * dx + dy * dy
+
+        rects = self._bounds()
+        return min(range(len(rects)), key=lambda i: distance(rects[i]))
+
+    def bounds_at(self, x, y):
+        """(left, top, right, bottom) of the available area nearest to a point"""
+        return self._bounds()[self.nearest_screen_index(x, y)]
+
+    def geometry_at(self, x, y):
+        """Available geometry of the screen nearest to a point as a QRect"""
+        left, top, right, bottom = self.bounds_at(x, y)
+        return QRect(left, top, right - left, bottom - top)
+
+    def clamp(self, x, y, width, height, margin=0):
+        """Clamp a rectangle's top-left so it lies on the screen under its center"""
+        left, top, right, bottom = self.bounds_at(x + width // 2, y + height // 2)
+        x = max(left + margin, min(x, right - width - margin))
+        y = max(top + margin, min(y, bottom - height - margin))
+        return x, y
+
+    def random_position(self, width, height):
+        """Random top-left for a rectangle on any screen, weighted by screen area"""
+        rects = self._bounds()
+        areas = [(r[2] - r[0]) * (r[3] - r[1]) for r in rects]
+        left, top, right, bottom = self.rng.choices(rects, weights=areas)[0]
+        return (self.rng.randint(left, max(left, right - width)),
+                self.rng.randint(top, max(top, bottom - height)))
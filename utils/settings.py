@@ -0,0 +1,95 @@
+"""
+Typed, validated settings for Milk Mocha Pet
+"""
+from dataclasses import dataclass, field, fields, asdict, replace
+
+
+def _setting(default, minimum=None, maximum=None):
+    """A settings field with optional numeric bounds"""
+    return field(default=default, metadata={"min": minimum, "max": maximum})
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable snapshot of every setting, validated once when built
+
+    The single source of defaults. Read fields as plain attributes; a change
+    produces a new Settings object, never an edit of this one.
+    """
+
+    spawn_interval: int = _setting(10000, 1000, 3600000)  # Milliseconds between bottles
+    transparency: int = _setting(255, 100, 255)
+    last_position: tuple = (300, 300)
+    auto_spawn: bool = True
+    milk_mocha_speaking: bool = True
+    speaking_interval: int = _setting(15, 1, 60)  # Minutes
+    sleep_after_seconds: int = _setting(60, 5, 86400)
+    sad_after_seconds: int = _setting(300, 5, 86400)
+    pet_size: int = _setting(150, 50, 400)
+    animated_tray_icon: bool = False
+    stream_responses: bool = True
+    message_batch_size: int = _setting(5, 1, 20)
+    gemini_requests_per_minute: int = _setting(10, 1, 1000)
+    gemini_requests_per_day: int = _setting(1000, 1, 100000)
+    analytics_enabled: bool = True
+    stall_watchdog_enabled: bool = False  # Off by default: a watcher thread pings the GUI all session
+    leak_detector_enabled: bool = False  # Off by default: tracemalloc slows allocation
+    skin: str = ""  # Skin pack name from assets/skins, "" for the default character
+
+    @property
+    def speaking_interval_seconds(self):
+        return self.speaking_interval * 60
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from raw config data, replacing bad values with defaults"""
+        values = {}
+        for spec in fields(cls):
+            if spec.name not in data:
+                continue
+            try:
+                values[spec.name] = _coerce(spec, data[spec.name])
+            except (TypeError, ValueError):
+                print(f"⚠️ Invalid setting {spec.name}={data[spec.name]!r}, using {spec.default!r}")
+        return cls(**values)
+
+    def to_dict(self):
+        """Plain JSON-ready values"""
+        data = asdict(self)
+        data["last_position"] = list(self.last_position)
+        return data
+
+    def changed_fields(self, other):
+        """Names of the fields that differ from another Settings"""
+        return {spec.name for spec in fields(self) if getattr(self, spec.name) != getattr(other, spec.name)}
+
+    def with_values(self, **values):
+        return replace(self, **values)
+
+
+def _coerce(spec, value):
+    if spec.type in (bool, "bool"):
+        if not isinstance(value, (bool, int)):
+            raise TypeError(value)
+        return bool(value)
+    if spec.type in (int, "int"):
+        if isinstance(value, bool):
+            raise TypeError(value)
+        value = int(value)
+        minimum, maximum = spec.metadata.get("min"), spec.metadata.get("max")
+        if minimum is not None:
+            value = max(minimum, value)
+        if maximum is not None:
+            value = min(maximum, value)
+        return value
+    if spec.type in (str, "str"):
+        if not isinstance(value, str):
+            raise TypeError(value)
+        return value
+    if spec.name == "last_position":
+        x, y = value
+        return int(x), int(y)
+    return value
+
+
+DEFAULT_SETTINGS = Settings()
@@ -0,0 +1,181 @@
+"""
+Detects GUI event-loop stalls and records the code that caused them
+"""
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from utils.config import PACKAGE_ROOT, cache_path
+
+REPORT_FILE = "stall_report.txt"
+
+# A heartbeat is posted this often; a dispatch later than the threshold is a stall
+HEARTBEAT_INTERVAL_SECONDS = 0.2
+STALL_THRESHOLD_SECONDS = 0.1
+
+# While the GUI thread is stuck, its stack is sampled this often
+STALL_SAMPLE_SECONDS = 0.02
+
+# Stalls kept for the report; beyond this only the per-location totals grow
+MAX_STALLS = 500
+
+
+class Stall:
+    """One stall: how long the event loop was blocked and where it spent the time"""
+
+    __slots__ = ("started_at", "duration", "culprit", "stack")
+
+    def __init__(self, started_at, duration, culprit, stack):
+        self.started_at = started_at
+        self.duration = duration
+        self.culprit = culprit  # "file:line function" most often on top of the sampled stacks
+        self.stack = stack      # The sampled stack that had the culprit, outermost first
+
+
+def _frame_stack(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, frame.f_lineno, code.co_name))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _culprit(stack):
+    """The innermost frame in the app's own code, or the innermost frame at all"""
+    for filename, line, function in reversed(stack):
+        if filename.startswith(PACKAGE_ROOT) and "/benchmarks/" not in filename:
+            return f"{os.path.relpath(filename, PACKAGE_ROOT)}:{line} {function}"
+    if stack:
+        filename, line, function = stack[-1]
+        return f"{os.path.basename(filename)}:{line} {function}"
+    return "<no Python frames>"
+
+
+class StallWatchdog(QObject):
+    """Posts heartbeats through the Qt event loop and times their dispatch
+
+    A watcher thread emits a queued signal and waits for the GUI thread to
+    answer. If no answer comes within the threshold, it samples the GUI
+    thread's Python stack until one does, then records the stall with its
+    full duration, blamed on the code most often caught running.
+    """
+
+    heartbeat = pyqtSignal(int)
+
+    def __init__(self, threshold=STALL_THRESHOLD_SECONDS, interval=HEARTBEAT_INTERVAL_SECONDS,
+                 on_stall=None, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold
+        self.interval = interval
+        self.on_stall = on_stall  # Called from the watcher thread with each Stall
+        self.gui_thread_id = threading.get_ident()
+        self.stalls = []
+        self.totals = {}  # Culprit -> [count, total seconds, worst seconds]
+        self.max_lag = 0.0
+        self.beats = 0
+        self.answered = threading.Event()
+        self.running = False
+        self.thread = None
+        self.heartbeat.connect(self._answer)  # Queued: the watcher thread emits, the GUI thread answers
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.answered.set()
+        if self.thread:
+            self.thread.join(1.0)
+            self.thread = None
+
+    def _answer(self, seq):
+        self.answered.set()
+
+    def _run(self):
+        seq = 0
+        while self.running:
+            time.sleep(self.interval)
+            if not self.running:
+                break
+            seq += 1
+            self.answered.clear()
+            sent_at = time.perf_counter()
+            self.heartbeat.emit(seq)
+            if self.answered.wait(self.threshold) or not self.running:
+                self._note_lag(time.perf_counter() - sent_at)
+                continue
+            # Stalled: sample the GUI thread until the heartbeat gets through
+            samples = Counter()
+            stacks = {}
+            while self.running:
+                frame = sys._current_frames().get(self.gui_thread_id)
+                stack = _frame_stack(frame)
+                frame = None
+                culprit = _culprit(stack)
+                samples[culprit] += 1
+                stacks.setdefault(culprit, stack)
+                if self.answered.wait(STALL_SAMPLE_SECONDS):
+                    break
+            lag = time.perf_counter() - sent_at
+            self._note_lag(lag)
+            if self.running and samples:
+                culprit = samples.most_common(1)[0][0]
+                self._record(Stall(time.time() - lag, lag, culprit, stacks[culprit]))
+
+    def _note_lag(self, lag):
+        self.beats += 1
+        self.max_lag = max(self.max_lag, lag)
+
+    def _record(self, stall):
+        if len(self.stalls) < MAX_STALLS:
+            self.stalls.append(stall)
+        total = self.totals.setdefault(stall.culprit, [0, 0.0, 0.0])
+        total[0] += 1
+        total[1] += stall.duration
+        total[2] = max(total[2], stall.duration)
+        print(f"🐢 GUI stalled {stall.duration * 1000:.0f} ms in {stall.culprit}")
+        if self.on_stall:
+            try:
+                self.on_stall(stall)
+            except Exception as e:
+                print(f"❌ Error recording stall: {e}")
+
+    def ranked(self):
+        """[(culprit, count, total seconds, worst seconds)], most total stall time first"""
+        rows = [(culprit, count, total, worst) for culprit, (count, total, worst) in self.totals.items()]
+        return sorted(rows, key=lambda row: -row[2])
+
+    def report(self, limit=10):
+        """Plain-text ranking of the code behind the worst stalls"""
+        if not self.totals:
+            return f"No stalls over {self.threshold * 1000:.0f} ms ({self.beats} heartbeats)."
+        lines = [f"GUI stalls over {self.threshold * 1000:.0f} ms "
+                 f"({self.beats} heartbeats, worst lag {self.max_lag * 1000:.0f} ms):",
+                 f"{'total ms':>9}{'count':>7}{'worst ms':>10}  code"]
+        for culprit, count, total, worst in self.ranked()[:limit]:
+            lines.append(f"{total * 1000:>9.0f}{count:>7}{worst * 1000:>10.0f}  {culprit}")
+        worst = max(self.stalls, key=lambda stall: stall.duration, default=None)
+        if worst:
+            lines.append("")
+            lines.append(f"Worst stall ({worst.duration * 1000:.0f} ms), GUI thread stack:")
+            for filename, line, function in worst.stack:
+                lines.append(f"  {filename}:{line} {function}")
+        return "\n".join(lines)
+
+    def write_report(self, path=None):
+        """Save the report if there was anything to report; returns the path or None"""
+        if not self.totals:
+            return None
+        path = path or cache_path(REPORT_FILE)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.report() + "\n")
+        return path
@@ -1,20 +1,19 @@
 """
 Simple user activity detection for Milk Mocha Pet
 """
-import time
-import random
-from datetime import datetime
+from utils.clock import system_clock
 
 
 class UserActivityDetector:
     """Simple user activity detector for determining when to show messages"""
     
-    def __init__(self):
-        self.last_check_time = time.time()
+    def __init__(self, clock=system_clock):
+        self.clock = clock
+        self.last_check_time = clock.time()
     
     def should_show_message(self, last_message_time, interval):
         """Determine if we should show a message based on timing"""
-        current_time = time.time()
+        current_time = self.clock.time()
         
         # If no previous message, always allow
         if not last_message_time:
@@ -26,7 +25,7 @@ class UserActivityDetector:
     
     def get_time_context(self):
         """Get the current time context (morning, afternoon, evening, night)"""
-        current_hour = datetime.now().hour
+        current_hour = self.clock.now().hour
         
         if 6 <= current_hour < 12:
             return "morning"
@@ -49,4 +48,4 @@ class UserActivityDetector:
         }
         
         # Return a random context for the current time
-        return random.choice(contexts.get(time_context, ["general"]))
+        return self.clock.random.choice(contexts.get(time_context, ["general"]))